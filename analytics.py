@@ -0,0 +1,266 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from database import flush_session_heartbeats, insert_analytics_events
+
+# --- Session Heartbeat Tracker ---
+# Heartbeats arrive every 30s per open tab. Instead of two writes per heartbeat,
+# we keep the latest heartbeat per session in memory and write them all in one
+# batched upsert, so DB load follows the flush interval, not the number of users.
+# The session's latest analytics event rides along the same way (drop-off analysis).
+
+HEARTBEAT_FLUSH_SECONDS = float(os.getenv("HEARTBEAT_FLUSH_SECONDS", 30))
+HEARTBEAT_FLUSH_MAX = int(os.getenv("HEARTBEAT_FLUSH_MAX", 500))
+SEEN_SESSIONS_MAX = int(os.getenv("SEEN_SESSIONS_MAX", 100000))
+
+def _utc_now_str():
+    # Same format as SQL CURRENT_TIMESTAMP so durations compare cleanly
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+class SessionTracker:
+    def __init__(self, flush_interval=HEARTBEAT_FLUSH_SECONDS, max_pending=HEARTBEAT_FLUSH_MAX, max_seen=SEEN_SESSIONS_MAX):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_seen = max_seen
+        self._pending = {}
+        self._seen = OrderedDict()  # Sessions this process has already seen (bounded LRU)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self.stats = {
+            "heartbeats": 0,
+            "flushes": 0,
+            "rows_flushed": 0,
+            "flush_failures": 0,
+            "last_flush_rows": 0,
+            "last_flush_seconds": 0.0,
+            "flush_seconds_total": 0.0,
+        }
+
+    def touch(self, session_id, ip=None, user_agent=None, location=None, lat=None, lon=None):
+        """Records a heartbeat. Returns True the first time this process sees session_id."""
+        now = _utc_now_str()
+        with self._lock:
+            self.stats["heartbeats"] += 1
+            is_new = session_id not in self._seen
+            self._seen[session_id] = True
+            self._seen.move_to_end(session_id)
+            while len(self._seen) > self.max_seen:
+                self._seen.popitem(last=False)
+
+            entry = self._pending_entry(session_id, now)
+            entry["last_heartbeat"] = now
+            # Fill in what an entry created by set_location()/note_event() didn't know
+            for key, value in (("ip", ip), ("user_agent", user_agent), ("location", location), ("lat", lat), ("lon", lon)):
+                if entry[key] is None:
+                    entry[key] = value
+        return is_new
+
+    def _pending_entry(self, session_id, now):
+        # Caller holds self._lock
+        entry = self._pending.get(session_id)
+        if not entry:
+            entry = self._pending[session_id] = {
+                "ip": None,
+                "user_agent": None,
+                "location": None,
+                "lat": None,
+                "lon": None,
+                "start_time": now,
+                "last_heartbeat": now,
+                "last_event_type": None,
+                "last_event_at": None,
+            }
+        return entry
+
+    def set_location(self, session_id, location, lat, lon):
+        # Resolved off the request path; picked up by the next flush
+        now = _utc_now_str()
+        with self._lock:
+            entry = self._pending_entry(session_id, now)
+            entry["location"] = location
+            entry["lat"] = lat
+            entry["lon"] = lon
+
+    def note_event(self, session_id, event_type):
+        """Remembers the session's latest analytics event until the next flush."""
+        at = _utc_now_str()
+        with self._lock:
+            entry = self._pending_entry(session_id, at)
+            if entry["last_event_at"] is None or at >= entry["last_event_at"]:
+                entry["last_event_type"] = event_type
+                entry["last_event_at"] = at
+
+    def due(self):
+        with self._lock:
+            backlog = len(self._pending)
+        if not backlog:
+            return False
+        return backlog >= self.max_pending or time.monotonic() - self._last_flush >= self.flush_interval
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                batch = self._pending
+                self._pending = {}
+            self._last_flush = time.monotonic()
+            if not batch:
+                return 0
+
+            rows = [
+                (sid, e["ip"], e["user_agent"], e["location"], e["lat"], e["lon"], e["start_time"], e["last_heartbeat"],
+                 e["last_event_type"], e["last_event_at"])
+                for sid, e in batch.items()
+            ]
+            start = time.perf_counter()
+            try:
+                flush_session_heartbeats(rows)
+            except Exception as e:
+                print(f"Heartbeat flush failed ({len(rows)} sessions): {e}")
+                with self._lock:
+                    self.stats["flush_failures"] += 1
+                    # Put the batch back; newer heartbeats received meanwhile win
+                    for sid, entry in batch.items():
+                        if sid in self._pending:
+                            newer = self._pending[sid]
+                            newer["start_time"] = entry["start_time"]
+                            for key in ("ip", "user_agent", "location", "lat", "lon"):
+                                if newer.get(key) is None:
+                                    newer[key] = entry[key]
+                            if newer["last_event_at"] is None:
+                                newer["last_event_type"] = entry["last_event_type"]
+                                newer["last_event_at"] = entry["last_event_at"]
+                        else:
+                            self._pending[sid] = entry
+                return 0
+            elapsed = time.perf_counter() - start
+
+            with self._lock:
+                self.stats["flushes"] += 1
+                self.stats["rows_flushed"] += len(rows)
+                self.stats["last_flush_rows"] = len(rows)
+                self.stats["last_flush_seconds"] = round(elapsed, 4)
+                self.stats["flush_seconds_total"] += elapsed
+            return len(rows)
+
+    async def run(self, tick=1.0):
+        # Background loop: flush every flush_interval seconds, or sooner once max_pending builds up
+        while True:
+            await asyncio.sleep(tick)
+            if self.due():
+                await asyncio.to_thread(self.flush)
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats["backlog"] = len(self._pending)
+        stats["flush_seconds_total"] = round(stats["flush_seconds_total"], 4)
+        return stats
+
+session_tracker = SessionTracker()
+
+# --- Analytics Event Pipeline ---
+# /api/analytics/event only enqueues; a background writer drains the queue with
+# multi-row inserts. When the queue is full we either drop the oldest event
+# ("drop_oldest") or refuse the new one so the endpoint can answer 503 ("reject").
+
+EVENT_QUEUE_MAX = int(os.getenv("EVENT_QUEUE_MAX", 10000))
+EVENT_BATCH_SIZE = int(os.getenv("EVENT_BATCH_SIZE", 500))
+EVENT_LINGER_SECONDS = float(os.getenv("EVENT_LINGER_SECONDS", 2))
+EVENT_QUEUE_POLICY = os.getenv("EVENT_QUEUE_POLICY", "drop_oldest")
+
+class EventPipeline:
+    def __init__(self, max_queue=EVENT_QUEUE_MAX, batch_size=EVENT_BATCH_SIZE, linger=EVENT_LINGER_SECONDS, policy=EVENT_QUEUE_POLICY):
+        if policy not in ("drop_oldest", "reject"):
+            raise ValueError(f"Unknown EVENT_QUEUE_POLICY: {policy}")
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.linger = linger
+        self.policy = policy
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._oldest_at = None
+        self.stats = {
+            "enqueued": 0,
+            "flushed": 0,
+            "dropped": 0,
+            "rejected": 0,
+            "batches": 0,
+            "flush_failures": 0,
+            "last_batch_seconds": 0.0,
+        }
+
+    def enqueue(self, session_id, event_type, details=""):
+        """Returns False if the event was refused (queue full and policy is 'reject')."""
+        event = (session_id, event_type, details, _utc_now_str())
+        with self._lock:
+            if len(self._queue) >= self.max_queue:
+                if self.policy == "reject":
+                    self.stats["rejected"] += 1
+                    return False
+                self._queue.popleft()
+                self.stats["dropped"] += 1
+            if not self._queue:
+                self._oldest_at = time.monotonic()
+            self._queue.append(event)
+            self.stats["enqueued"] += 1
+        return True
+
+    def due(self):
+        with self._lock:
+            if not self._queue:
+                return False
+            return len(self._queue) >= self.batch_size or time.monotonic() - self._oldest_at >= self.linger
+
+    def flush(self):
+        """Drains everything currently queued, batch_size rows per insert."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                    self._oldest_at = time.monotonic() if self._queue else None
+                if not batch:
+                    return written
+
+                start = time.perf_counter()
+                try:
+                    insert_analytics_events(batch)
+                except Exception as e:
+                    print(f"Event flush failed ({len(batch)} events): {e}")
+                    with self._lock:
+                        self.stats["flush_failures"] += 1
+                        # Requeue at the front, as far as capacity allows
+                        room = self.max_queue - len(self._queue)
+                        keep = batch[len(batch) - room:] if room < len(batch) else batch
+                        self.stats["dropped"] += len(batch) - len(keep)
+                        self._queue.extendleft(reversed(keep))
+                        if self._queue:
+                            self._oldest_at = time.monotonic()
+                    return written
+
+                written += len(batch)
+                with self._lock:
+                    self.stats["batches"] += 1
+                    self.stats["flushed"] += len(batch)
+                    self.stats["last_batch_seconds"] = round(time.perf_counter() - start, 4)
+
+    async def run(self):
+        tick = max(0.05, min(self.linger / 4, 1.0))
+        while True:
+            await asyncio.sleep(tick)
+            if self.due():
+                await asyncio.to_thread(self.flush)
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats["queued"] = len(self._queue)
+            stats["policy"] = self.policy
+        return stats
+
+event_pipeline = EventPipeline()
@@ -0,0 +1,113 @@
+"""
+Compares the chat prompt built from the full representatives dump with the
+retrieval-based prompt (top-k reps within a token budget).
+
+    python benchmarks/bench_chat_context.py          # prompt size + build time
+    python benchmarks/bench_chat_context.py --live   # also end-to-end Gemini latency (needs GOOGLE_API_KEY)
+"""
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rep_context import render_rep_line, CHAT_CONTEXT_TOP_K, CHAT_CONTEXT_TOKEN_BUDGET
+from retrieval import RepresentativeIndex, estimate_tokens
+
+STATES = ["Uttar Pradesh", "Maharashtra", "West Bengal", "Bihar", "Tamil Nadu", "Madhya Pradesh",
+          "Karnataka", "Gujarat", "Rajasthan", "Andhra Pradesh", "Odisha", "Kerala", "Telangana"]
+PARTIES = ["BJP", "INC", "SP", "AITC", "DMK", "TDP", "JD(U)", "SHS(UBT)", "NCP(SP)", "CPI(M)"]
+QUERIES = [
+    "Who is my MP in Varanasi?",
+    "Which party does the Thiruvananthapuram MP belong to?",
+    "List the INC MPs from Kerala",
+    "Who represents Bombay North?",
+    "What has the Prime Minister done for housing?",
+]
+
+def synthetic_reps(n=543, seed=18):
+    rng = random.Random(seed)
+    reps = [
+        {"id": 1, "name": "Narendra Modi", "role": "Prime Minister", "party": "BJP", "constituency": "Varanasi",
+         "state": "Uttar Pradesh", "bio": "India's 14th Prime Minister. Launched PM Awas Yojana (Housing)."},
+        {"id": 2, "name": "Shashi Tharoor", "role": "MP", "party": "INC", "constituency": "Thiruvananthapuram",
+         "state": "Kerala", "bio": "Diplomat, author, and politician."},
+        {"id": 3, "name": "Piyush Goyal", "role": "MP (Lok Sabha)", "party": "BJP", "constituency": "Mumbai North",
+         "state": "Maharashtra", "bio": "Member of the 18th Lok Sabha"},
+    ]
+    for i in range(len(reps) + 1, n + 1):
+        state = rng.choice(STATES)
+        reps.append({
+            "id": i,
+            "name": f"Member {i} {rng.choice(['Kumar', 'Singh', 'Devi', 'Reddy', 'Patil', 'Das'])}",
+            "role": "MP (Lok Sabha)",
+            "party": rng.choice(PARTIES),
+            "constituency": f"Constituency {i}",
+            "state": state,
+            "bio": "Member of the 18th Lok Sabha",
+        })
+    return reps
+
+def load_reps():
+    if "--db" in sys.argv:
+        from database import get_all_representatives
+        return get_all_representatives()
+    return synthetic_reps()
+
+def build_prompt(context_str, query):
+    return f"You are 'CitizenConnect'...\nData: {context_str}\n\nUser: {query}\nResponse:"
+
+def timed(fn, repeat=200):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+def main():
+    reps = load_reps()
+    index = RepresentativeIndex()
+    start = time.perf_counter()
+    index.sync(reps)
+    print(f"{len(reps)} reps, index build {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    def full_context():
+        return "Reps:\n" + "".join(render_rep_line(rep) for rep in reps)
+
+    def retrieved_context(query):
+        block = "Reps:\n"
+        used = estimate_tokens(block)
+        for _, rep in index.search(query, CHAT_CONTEXT_TOP_K):
+            line = render_rep_line(rep)
+            if used + estimate_tokens(line) > CHAT_CONTEXT_TOKEN_BUDGET:
+                break
+            block += line
+            used += estimate_tokens(line)
+        return block
+
+    full = full_context()
+    print(f"\n{'query':<55} {'full tok':>9} {'top-k tok':>10} {'full ms':>8} {'top-k ms':>9}")
+    prompts = []
+    for query in QUERIES:
+        retrieved = retrieved_context(query)
+        prompts.append((query, build_prompt(full, query), build_prompt(retrieved, query)))
+        print(f"{query[:55]:<55} {estimate_tokens(full):>9} {estimate_tokens(retrieved):>10} "
+              f"{timed(full_context):>8.3f} {timed(lambda: retrieved_context(query)):>9.3f}")
+
+    if "--live" in sys.argv:
+        from google import genai
+        client = genai.Client(api_key=os.environ["GOOGLE_API_KEY"])
+        print(f"\n{'query':<55} {'full s':>8} {'top-k s':>8}")
+        for query, full_prompt, small_prompt in prompts:
+            latencies = []
+            for prompt in (full_prompt, small_prompt):
+                start = time.perf_counter()
+                client.models.generate_content(model='gemini-1.5-flash', contents=prompt)
+                latencies.append(time.perf_counter() - start)
+            print(f"{query[:55]:<55} {latencies[0]:>8.2f} {latencies[1]:>8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Import time of main (what every worker spawn and cold start pays), from
+python -X importtime, plus a regression check that the heavy dependencies
+main defers to first use stay out of the import path.
+
+    python benchmarks/bench_import.py                 # median over 5 runs, top modules
+    python benchmarks/bench_import.py --check         # exit 1 if a deferred module is imported
+    python benchmarks/bench_import.py --check --max-ms 900   # ...or if main takes longer
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded on first use (llm.get_genai_client, geo.get_geolocator, main.get_scheduler, ...)
+DEFERRED = ["google.genai", "geopy", "apscheduler", "bcrypt", "tenacity", "requests", "httpx", "lxml", "cryptography", "uvicorn"]
+
+def import_profile():
+    """{module: (self_us, cumulative_us)} for one fresh `import main`."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.exit(f"import main failed:\n{result.stderr[-2000:]}")
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--check", action="store_true", help="fail if a deferred module is imported")
+    parser.add_argument("--max-ms", type=float, help="with --check, also fail above this median")
+    args = parser.parse_args()
+
+    import_profile()  # Warm the bytecode cache so runs compare like with like
+    runs = [import_profile() for _ in range(args.runs)]
+    totals = [run["main"][1] / 1000 for run in runs]
+    median = statistics.median(totals)
+    print(f"import main: median {median:.1f} ms, min {min(totals):.1f} ms over {args.runs} runs")
+
+    last = runs[-1]
+    top_level = {name: cumulative for name, (_, cumulative) in last.items() if "." not in name and name != "main"}
+    print("\nSlowest top-level imports (cumulative ms, last run):")
+    for name, cumulative in sorted(top_level.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {cumulative / 1000:8.1f}  {name}")
+
+    if not args.check:
+        return 0
+    failures = []
+    for prefix in DEFERRED:
+        loaded = sorted(name for name in last if name == prefix or name.startswith(prefix + "."))
+        if loaded:
+            failures.append(f"{prefix} is imported by main ({', '.join(loaded[:3])}...)")
+    if args.max_ms is not None and median > args.max_ms:
+        failures.append(f"median {median:.1f} ms exceeds budget {args.max_ms} ms")
+    print()
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if not failures:
+        print(f"ok   none of {', '.join(DEFERRED)} imported")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
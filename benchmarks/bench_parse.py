@@ -0,0 +1,175 @@
+"""
+Parse time and peak memory of the Lok Sabha list parser (html_tables + lxml)
+against the previous BeautifulSoup/html.parser walk, on a synthetic page laid out
+like the real one (a section per state, two-row headers, party and alliance cells
+with rowspan) or on a saved copy of the page.
+
+    python benchmarks/bench_parse.py                 # synthetic 543-MP page
+    python benchmarks/bench_parse.py lok_sabha.html  # saved copy of the real page
+
+On the synthetic page the parsed rows are also checked against the generated ones,
+which is where the old parser's rowspan misalignment shows.
+
+The comparison arm needs beautifulsoup4, which the app itself no longer depends
+on (it is not in requirements.txt). Install it for the benchmark only:
+
+    pip install beautifulsoup4
+
+Without it, that arm is reported as skipped.
+"""
+import multiprocessing
+import os
+import random
+import resource
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+RUNS = 5
+STATES = ["Andhra Pradesh", "Assam", "Bihar", "Gujarat", "Karnataka", "Kerala", "Madhya Pradesh",
+          "Maharashtra", "Odisha", "Punjab", "Rajasthan", "Tamil Nadu", "Telangana", "Uttar Pradesh", "West Bengal"]
+PARTIES = [("Bharatiya Janata Party", "NDA"), ("Indian National Congress", "INDIA"), ("Samajwadi Party", "INDIA"),
+           ("All India Trinamool Congress", "INDIA"), ("Telugu Desam Party", "NDA"), ("Dravida Munnetra Kazhagam", "INDIA")]
+
+def synthetic_page(seats=543, seed=7):
+    """(html, expected MP dicts). Runs of same-party MPs share rowspan'd party/alliance cells."""
+    rng = random.Random(seed)
+    per_state = [seats // len(STATES)] * len(STATES)
+    for i in range(seats % len(STATES)):
+        per_state[i] += 1
+    parts, expected, number = ['<html><head><style>.x{color:red}</style></head><body><div class="mw-parser-output">'], [], 0
+    parts.append('<p>' + "Lorem ipsum dolor sit amet. " * 200 + '</p>')
+    for state, count in zip(STATES, per_state):
+        parts.append(f'<div class="mw-heading mw-heading3"><h3 id="{state.replace(" ", "_")}">{state}</h3>'
+                     f'<span class="mw-editsection">[<a href="#">edit</a>]</span></div>')
+        parts.append('<table class="wikitable sortable"><tbody>'
+                     '<tr><th colspan="2">Constituency</th><th rowspan="2">Name</th>'
+                     '<th colspan="2" rowspan="2">Party</th><th rowspan="2">Alliance</th></tr>'
+                     '<tr><th>No.</th><th>Name</th></tr>')
+        rows = []
+        while len(rows) < count:
+            party, alliance = rng.choice(PARTIES)
+            rows.extend([(party, alliance)] * min(rng.randint(1, 4), count - len(rows)))
+        run_left = 0
+        for i, (party, alliance) in enumerate(rows):
+            number += 1
+            constituency = f"{state.split()[0]}pur {i + 1}"
+            name = f"Member {number} {rng.choice(['Sharma', 'Reddy', 'Nair', 'Das', 'Patil'])}"
+            cells = [f'<td>{i + 1}</td><th scope="row"><a href="#">{constituency}</a></th>'
+                     f'<td><span class="sortkey">{name.split()[-1]}</span><a href="#">{name}</a>'
+                     f'<sup class="reference"><a href="#">[{number % 9 + 1}]</a></sup></td>']
+            if run_left == 0:
+                run_left = 1
+                while i + run_left < len(rows) and rows[i + run_left] == (party, alliance):
+                    run_left += 1
+                span = f' rowspan="{run_left}"' if run_left > 1 else ""
+                cells.append(f'<td{span} style="background-color:#FF9933"></td><td{span}>{party}</td><td{span}>{alliance}</td>')
+            run_left -= 1
+            parts.append("<tr>" + "".join(cells) + "</tr>")
+            expected.append({"name": name, "constituency": constituency, "party": party, "state": state,
+                             "role": "MP (Lok Sabha)"})
+        parts.append("</tbody></table>")
+    # References and navboxes make up most of the real page's weight
+    parts.append('<h2>References</h2><ol class="references">')
+    for i in range(800):
+        parts.append(f'<li id="cite_note-{i}"><span class="reference-text"><cite class="citation web">'
+                     f'<a rel="nofollow" class="external text" href="https://example.org/results/{i}">'
+                     f'General Election 2024 results, constituency {i}</a>. <i>Election Commission of India</i>. '
+                     f'Retrieved 4 June 2024.</cite><span title="ctx_ver=Z39.88-2004&amp;rft.btitle={i}"></span>'
+                     f'</span></li>' + " " * 300)
+    parts.append('</ol><table class="navbox"><tr><td>' + '<a href="#">Lok Sabha</a> · ' * 2000 + '</td></tr></table>')
+    parts.append("</div></body></html>")
+    return "".join(parts), expected
+
+def parse_previous(html):
+    # The BeautifulSoup walk ingest_mps_wiki used before html_tables (for comparison)
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    mps = []
+    for table in soup.find_all('table', {'class': 'wikitable'}):
+        rows = table.find_all('tr')
+        if not rows:
+            continue
+        headers = [th.text.strip().lower() for th in rows[0].find_all('th')]
+        idx_const = idx_name = idx_party = -1
+        for i, h in enumerate(headers):
+            if "constituency" in h: idx_const = i
+            elif "member" in h or "name" in h: idx_name = i
+            elif "party" in h: idx_party = i
+        if idx_const == -1 or idx_name == -1:
+            continue
+        prev = table.find_previous(['h2', 'h3', 'h4'])
+        state_name = prev.text.strip().replace('[edit]', '') if prev else "Unknown"
+        for row in rows[1:]:
+            cols = row.find_all(['td', 'th'])
+            if len(cols) <= max(idx_const, idx_name, idx_party):
+                continue
+            name = cols[idx_name].text.strip().split("[")[0]
+            party = cols[idx_party].text.strip().split("[")[0] if idx_party != -1 else "Unknown"
+            mps.append({"name": name, "constituency": cols[idx_const].text.strip(), "party": party,
+                        "state": state_name, "role": "MP (Lok Sabha)"})
+    return mps
+
+def parse_current(html):
+    from ingest_mps_wiki import iter_members
+    return list(iter_members(html))
+
+PARSERS = {"html_tables (lxml)": parse_current, "previous (bs4 html.parser)": parse_previous}
+
+def _measure(name, html, queue):
+    # Fresh process per parser, so peak RSS growth is attributable to it
+    parse = PARSERS[name]
+    try:
+        parse(html[:2000])  # Import costs out of the measurement
+    except ImportError as e:
+        queue.put(e)
+        return
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    timings = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        mps = parse(html)
+        timings.append((time.perf_counter() - started) * 1000)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before
+    queue.put((timings, peak, mps))
+
+def measure(name, html):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_measure, args=(name, html, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+def main():
+    os.environ.pop("DATABASE_URL", None)  # ingest_mps_wiki imports database; nothing is written
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], encoding="utf-8") as f:
+            html, expected = f.read(), None
+        print(f"{sys.argv[1]}: {len(html) / 1e6:.1f} MB")
+    else:
+        html, expected = synthetic_page()
+        print(f"Synthetic page: {len(expected)} MPs, {len(html) / 1e6:.1f} MB")
+
+    for name in PARSERS:
+        try:
+            timings, peak_kb, mps = measure(name, html)
+        except ImportError as e:
+            print(f"{name}: skipped ({e}; pip install beautifulsoup4 to compare)")
+            continue
+        line = (f"{name:28} median {statistics.median(timings):7.1f} ms  min {min(timings):7.1f} ms  "
+                f"peak RSS +{peak_kb / 1024:5.1f} MB  rows {len(mps)}")
+        if expected is not None:
+            # Only the fields both parsers produce (wiki_url is newer than the bs4 walk)
+            wrong = sum(1 for got, want in zip(mps, expected) if {k: got.get(k) for k in want} != want)
+            wrong += abs(len(mps) - len(expected))
+            line += f"  mismatched {wrong}"
+        print(line)
+
+if __name__ == "__main__":
+    main()
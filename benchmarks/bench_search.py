@@ -0,0 +1,100 @@
+"""
+Search latency over a synthetic 50k-row representatives table (MPs, MLAs and
+councillors), including misspelled queries.
+
+    python benchmarks/bench_search.py            # temporary SQLite database (FTS5)
+    DATABASE_URL=... python benchmarks/bench_search.py --postgres   # pg_trgm (writes to that DB!)
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if "--postgres" not in sys.argv:
+    os.environ.pop("DATABASE_URL", None)
+    os.chdir(tempfile.mkdtemp())  # citizenconnect.db is created in the working directory
+
+import database
+from search import search_representatives, get_search_backend
+
+ROWS = 50000
+SYLLABLES = ["ra", "ma", "pur", "nag", "ga", "bad", "va", "ka", "li", "shi", "dha", "nan", "ko", "ta", "ban",
+             "ga", "la", "sa", "ri", "jay", "ha", "mun", "ten", "dur", "gar", "hi", "pat", "an", "ur", "vel"]
+FIRST = ["Amit", "Rahul", "Priya", "Sunita", "Arjun", "Kavita", "Ravi", "Meena", "Suresh", "Anita", "Vijay",
+         "Lakshmi", "Deepak", "Pooja", "Manoj", "Rekha", "Sanjay", "Geeta", "Anil", "Usha", "Rajesh", "Nirmala",
+         "Mohan", "Shobha", "Prakash", "Asha", "Ganesh", "Lata", "Dinesh", "Savita", "Harish", "Kiran"]
+LAST = ["Sharma", "Gandhi", "Reddy", "Patil", "Das", "Nair", "Singh", "Yadav", "Iyer", "Banerjee", "Khan",
+        "Gowda", "Verma", "Mishra", "Pillai", "Chatterjee", "Joshi", "Kulkarni", "Menon", "Rao", "Pandey",
+        "Chauhan", "Thakur", "Bhat", "Naidu", "Mehta", "Desai", "Shetty", "Bose", "Saxena", "Tiwari", "Ghosh"]
+STATES = ["Uttar Pradesh", "Kerala", "Gujarat", "Maharashtra", "Karnataka", "Assam", "Madhya Pradesh",
+          "Bihar", "Rajasthan", "Tamil Nadu", "Andhra Pradesh", "Punjab", "West Bengal", "Odisha", "Telangana"]
+PARTIES = ["BJP", "INC", "SP", "AITC", "DMK", "TDP", "AAP", "CPI(M)", "SHS", "NCP", "BSP", "JD(U)"]
+CITIES = 700           # ~ one Lok Sabha seat each
+SEATS_PER_CITY = 7     # assembly constituencies
+QUERIES = ["varanasi", "Varansi", "tharoor", "thiruvanantapuram", "gujrat", "BJP", "Madhya Pradesh", "Banerji"]
+
+def place_names(rng, n):
+    names = set()
+    while len(names) < n:
+        names.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize())
+    return sorted(names)
+
+def typo(rng, word):
+    i = rng.randrange(1, len(word) - 1)
+    return word[:i] + word[i + 1:] if rng.random() < 0.5 else word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+def seed(n=ROWS, seed=50):
+    """
+    Roughly the shape of the real table: one MP per city, a handful of MLAs
+    and the rest ward councillors ("<City> Ward <n>").
+    """
+    rng = random.Random(seed)
+    database.init_db()
+    cities = place_names(rng, CITIES)
+    seats = place_names(rng, CITIES * SEATS_PER_CITY + CITIES)
+    seats = [s for s in seats if s not in set(cities)][:CITIES * SEATS_PER_CITY]
+    wards = (n - CITIES - len(seats)) // CITIES
+    rows = []
+    person = lambda: f"{rng.choice(FIRST)} {rng.choice(LAST)}"
+    for c, city in enumerate(cities):
+        state = STATES[c % len(STATES)]
+        rows.append((person(), "MP (Lok Sabha)", rng.choice(PARTIES), city, state, ""))
+        for seat in seats[c * SEATS_PER_CITY:(c + 1) * SEATS_PER_CITY]:
+            rows.append((person(), "MLA", rng.choice(PARTIES), seat, state, ""))
+        for ward in range(1, wards + 1):
+            rows.append((person(), "Councillor", rng.choice(PARTIES), f"{city} Ward {ward}", state, ""))
+    with database.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany("INSERT INTO representatives (name, role, party, constituency, state, bio) VALUES (?, ?, ?, ?, ?, ?)", rows)
+        conn.commit()
+    # Exact and misspelled look-ups of generated seats and people
+    picks = rng.sample(rows, 40)
+    queries = list(QUERIES)
+    for i, (name, _, _, constituency, _, _) in enumerate(picks):
+        target = constituency.split(" Ward ")[0] if i % 2 else name
+        queries.append(target if i % 4 < 2 else " ".join(typo(rng, w) if len(w) > 3 else w for w in target.split()))
+    return len(rows), queries
+
+def main():
+    print("Seeding...")
+    rows, queries = seed()
+    print(f"Backend: {get_search_backend()}")
+    search_representatives(queries[0])  # Warm-up: loads the representatives context / lexicon
+    samples = []
+    for _ in range(10):
+        for query in queries:
+            for offset in (0, 20):
+                start = time.perf_counter()
+                search_representatives(query, limit=20, offset=offset)
+                samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    p = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))]
+    print(f"{len(samples)} searches over {rows} rows: p50 {p(0.5):.2f} ms, p95 {p(0.95):.2f} ms, p99 {p(0.99):.2f} ms, max {samples[-1]:.2f} ms")
+    for query in queries[:4] + queries[-4:]:
+        print(f"  {query!r}: {[r['name'] + ' / ' + r['constituency'] for r in search_representatives(query, limit=3)]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from database import get_cached_chat_response, save_cached_chat_response
+from retrieval import PLACE_ALIASES
+
+# --- Chat Answer Cache ---
+# Many citizens ask the same question in slightly different words. Answers are cached
+# under the normalised query plus the representatives-context version, so any change
+# to the representatives table naturally starts a fresh cache generation.
+
+CHAT_CACHE_TTL = float(os.getenv("CHAT_CACHE_TTL", 6 * 3600))
+CHAT_CACHE_SIZE = int(os.getenv("CHAT_CACHE_SIZE", 2000))
+CHAT_CACHE_PERSIST = os.getenv("CHAT_CACHE_PERSIST", "0") == "1"
+
+# Common romanised Hindi words -> English, so "mera sansad kaun hai" and
+# "who is my mp" land on the same key
+TRANSLITERATIONS = {
+    "kaun": "who",
+    "kon": "who",
+    "hai": "is",
+    "mera": "my",
+    "meri": "my",
+    "mere": "my",
+    "hamara": "our",
+    "sansad": "mp",
+    "saansad": "mp",
+    "vidhayak": "mla",
+    "pradhan": "prime",
+    "mantri": "minister",
+    "kya": "what",
+    "kahan": "where",
+    "kaha": "where",
+    "ka": "of",
+    "ki": "of",
+    "ke": "of",
+    "se": "from",
+    "mein": "in",
+}
+
+_PUNCT_RE = re.compile(r"[^\w\s&]")
+
+def normalize_query(query):
+    words = _PUNCT_RE.sub(" ", (query or "").lower()).split()
+    normalised = []
+    for word in words:
+        word = TRANSLITERATIONS.get(word, word)
+        normalised.extend(PLACE_ALIASES.get(word, word).split())
+    return " ".join(normalised)
+
+def make_cache_key(query, context_version):
+    return hashlib.sha256(f"{context_version}|{normalize_query(query)}".encode("utf-8")).hexdigest()
+
+class ChatResponseCache:
+    def __init__(self, max_size=CHAT_CACHE_SIZE, ttl=CHAT_CACHE_TTL, persist=CHAT_CACHE_PERSIST):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.persist = persist
+        self._entries = OrderedDict()  # key -> (response, expires_at)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "db_hits": 0, "misses": 0, "stores": 0}
+
+    def _put_memory(self, key, response, expires_at):
+        with self._lock:
+            self._entries[key] = (response, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get(self, query, context_version):
+        key = make_cache_key(query, context_version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > time.time():
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry[0]
+            if entry:
+                del self._entries[key]
+
+        if self.persist:
+            try:
+                row = get_cached_chat_response(key, time.time() - self.ttl)
+            except Exception as e:
+                print(f"Chat cache read error: {e}")
+                row = None
+            if row:
+                self._put_memory(key, row['response'], row['created_at'] + self.ttl)
+                with self._lock:
+                    self.stats["db_hits"] += 1
+                return row['response']
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, query, context_version, response):
+        key = make_cache_key(query, context_version)
+        now = time.time()
+        self._put_memory(key, response, now + self.ttl)
+        with self._lock:
+            self.stats["stores"] += 1
+        if self.persist:
+            try:
+                save_cached_chat_response(key, response, now)
+            except Exception as e:
+                print(f"Chat cache write error: {e}")
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats["size"] = len(self._entries)
+        lookups = stats["hits"] + stats["db_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["hits"] + stats["db_hits"]) / lookups, 3) if lookups else 0.0
+        return stats
+
+chat_cache = ChatResponseCache()
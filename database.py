@@ -1,17 +1,24 @@
 import sqlite3
+import hashlib
 import json
-from datetime import datetime
 import os
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timedelta, timezone
 import psycopg2
-from psycopg2.extras import RealDictCursor
-from datetime import datetime
+from psycopg2.extras import RealDictCursor, execute_values
+from migrations import apply_migrations
 
 # --- Database Connection & Adapter ---
 
 class SQLiteConnection:
     def __init__(self, db_file):
-        self.conn = sqlite3.connect(db_file)
+        # Pooled connections are handed between request threads, one user at a time.
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
+        self.pool = None
+        self.last_used = time.monotonic()
 
     def cursor(self):
         return self.conn.cursor()
@@ -19,8 +26,29 @@ class SQLiteConnection:
     def commit(self):
         self.conn.commit()
 
+    def rollback(self):
+        self.conn.rollback()
+
+    def ping(self):
+        try:
+            self.conn.execute("SELECT 1")
+            return True
+        except Exception:
+            return False
+
     def close(self):
-        self.conn.close()
+        # Pooled connections go back to the pool instead of being torn down
+        if self.pool is not None:
+            self.pool.release(self)
+        else:
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
 
 class PostgresCursorProxy:
     def __init__(self, cursor):
@@ -53,9 +81,16 @@ class PostgresCursorProxy:
     def rowcount(self):
         return self.cursor.rowcount
 
+    def execute_values(self, sql, rows, page_size=500, fetch=False):
+        # Multi-row VALUES insert in one round trip per page (sql uses a single %s for the rows).
+        # fetch=True returns the RETURNING rows of every page.
+        return execute_values(self.cursor, sql, rows, page_size=page_size, fetch=fetch)
+
 class PostgresConnection:
     def __init__(self, db_url):
         self.conn = psycopg2.connect(db_url, cursor_factory=RealDictCursor)
+        self.pool = None
+        self.last_used = time.monotonic()
 
     def cursor(self):
         return PostgresCursorProxy(self.conn.cursor())
@@ -63,141 +98,255 @@ class PostgresConnection:
     def commit(self):
         self.conn.commit()
 
+    def rollback(self):
+        self.conn.rollback()
+
+    def ping(self):
+        if self.conn.closed:
+            return False
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            self.conn.rollback()
+            return True
+        except Exception:
+            return False
+
     def close(self):
-        self.conn.close()
+        # Pooled connections go back to the pool instead of being torn down
+        if self.pool is not None:
+            self.pool.release(self)
+        else:
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+# --- Connection Pool ---
+
+class PoolTimeout(Exception):
+    pass
+
+class ConnectionPool:
+    """
+    Bounded pool of SQLiteConnection/PostgresConnection objects.
+    Connections are checked out by get_db_connection() and handed back on close()
+    (or when the `with` block exits), so a TLS handshake + auth is paid once per
+    connection instead of once per query.
+    """
+
+    def __init__(self, factory, min_size=1, max_size=10, timeout=30.0, max_idle=300.0, ping_after=30.0):
+        self.factory = factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle      # Idle connections older than this are recycled
+        self.ping_after = ping_after  # Only health-check connections idle for longer than this
+        self._idle = deque()
+        self._size = 0                # Open connections (idle + checked out)
+        self._cond = threading.Condition()
+        self.stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "timeouts": 0,
+            "created": 0,
+            "recycled": 0,
+            "failed_health_checks": 0,
+        }
+
+    def acquire(self):
+        start = time.monotonic()
+        deadline = start + self.timeout
+        waited = False
+        while True:
+            conn = None
+            with self._cond:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.stats["timeouts"] += 1
+                        raise PoolTimeout(f"No database connection available after {self.timeout}s")
+                    waited = True
+                    self._cond.wait(remaining)
+                if self._idle:
+                    # LIFO: reuse the most recently used (warmest) connection
+                    conn = self._idle.pop()
+                else:
+                    self._size += 1
+
+            if conn is None:
+                try:
+                    conn = self.factory()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                conn.pool = self
+                with self._cond:
+                    self.stats["created"] += 1
+            elif not self._is_usable(conn):
+                self._discard(conn)
+                continue
+
+            wait = time.monotonic() - start
+            with self._cond:
+                self.stats["checkouts"] += 1
+                if waited:
+                    self.stats["waits"] += 1
+                self.stats["wait_seconds_total"] += wait
+                self.stats["wait_seconds_max"] = max(self.stats["wait_seconds_max"], wait)
+            return conn
+
+    def _is_usable(self, conn):
+        idle_for = time.monotonic() - conn.last_used
+        if idle_for > self.max_idle and self._size > self.min_size:
+            with self._cond:
+                self.stats["recycled"] += 1
+            return False
+        if idle_for > self.ping_after and not conn.ping():
+            with self._cond:
+                self.stats["failed_health_checks"] += 1
+            return False
+        return True
+
+    def release(self, conn):
+        try:
+            # Drop any half-finished transaction (no round trip if idle)
+            conn.rollback()
+        except Exception:
+            self._discard(conn)
+            return
+        conn.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(conn)
+            self._cond.notify()
+
+    def _discard(self, conn):
+        conn.pool = None
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def close_all(self):
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+        for conn in idle:
+            self._discard(conn)
+
+    def get_stats(self):
+        with self._cond:
+            stats = dict(self.stats)
+            stats["size"] = self._size
+            stats["idle"] = len(self._idle)
+            stats["in_use"] = self._size - len(self._idle)
+            stats["max_size"] = self.max_size
+        stats["wait_seconds_total"] = round(stats["wait_seconds_total"], 4)
+        stats["wait_seconds_max"] = round(stats["wait_seconds_max"], 4)
+        return stats
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                db_url = os.getenv("DATABASE_URL")
+                if db_url:
+                    factory = lambda: PostgresConnection(db_url)
+                else:
+                    factory = lambda: SQLiteConnection("citizenconnect.db")
+                _pool = ConnectionPool(
+                    factory,
+                    min_size=int(os.getenv("DB_POOL_MIN", 1)),
+                    max_size=int(os.getenv("DB_POOL_MAX", 10)),
+                    timeout=float(os.getenv("DB_POOL_TIMEOUT", 30)),
+                    max_idle=float(os.getenv("DB_POOL_MAX_IDLE", 300)),
+                )
+    return _pool
 
 def get_db_connection():
-    db_url = os.getenv("DATABASE_URL")
-    if db_url:
-        return PostgresConnection(db_url)
-    return SQLiteConnection("citizenconnect.db")
-
-def init_db():
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Note: SQLite and Postgres have slightly different DDL (AutoInc vs SERIAL).
-    # For a robust hybrid, we'd use SQLAlchemy. 
-    # For this quick migration, we use a "compatible enough" approach or separate logic.
-    # However, 'CREATE TABLE IF NOT EXISTS' with simple types often works for both (mostly).
-    # TEXT, INTEGER, REAL are standard. 
-    # PRIMARY KEY might need 'SERIAL' in PG vs 'INTEGER PRIMARY KEY AUTOINCREMENT' in SQLite.
-    
-    # We will assume the Schema is initialized Manually or via script for PG to avoid DDL hell here.
-    # But let's try a best-effort standard SQL.
-    
-    is_postgres = os.getenv("DATABASE_URL") is not None
-    
-    # Users/Reps Table
-    # PG: id SERIAL PRIMARY KEY
-    # SQ: id INTEGER PRIMARY KEY AUTOINCREMENT
-    pk_type = "SERIAL PRIMARY KEY" if is_postgres else "INTEGER PRIMARY KEY AUTOINCREMENT"
-    
-    cursor.execute(f'''
-    CREATE TABLE IF NOT EXISTS representatives (
-        id {pk_type},
-        name TEXT NOT NULL,
-        role TEXT NOT NULL,
-        party TEXT,
-        constituency TEXT,
-        state TEXT,
-        bio TEXT,
-        years_in_office INTEGER,
-        funds_spent_crores REAL,
-        funds_total_crores REAL,
-        attendance_percentage INTEGER
+    """
+    Checks a connection out of the shared pool. Use as a context manager
+    (`with get_db_connection() as conn:`) so it is always returned, even on errors.
+    """
+    return get_pool().acquire()
+
+def get_pool_stats():
+    return get_pool().get_stats()
+
+def close_pool():
+    if _pool is not None:
+        _pool.close_all()
+
+# --- Core Representatives ---
+# Seeded into an empty table, and patched back in (with their rich data) on existing
+# databases. init_db records a hash of this list in app_state once applied, so later
+# boots skip the seed and patch queries until the list itself changes.
+
+CORE_REPRESENTATIVES = [
+    (
+        "Narendra Modi", "Prime Minister", "BJP", "Varanasi", "Uttar Pradesh",
+        "India's 14th Prime Minister, focus on economic development and national security. Led BJP to third consecutive term in 2024. Launched initiatives like PM Awas Yojana (Housing).",
+        10, 50.5, 50.5, 98,
+        '["3rd Term as PM", "G20 Presidency", "Digital India Expansion"]',
+        "https://upload.wikimedia.org/wikipedia/commons/thumb/8/80/Prime_Minister_Narendra_Modi_in_New_Delhi_on_June_09%2C_2024_%28cropeed%29.jpg/440px-Prime_Minister_Narendra_Modi_in_New_Delhi_on_June_09%2C_2024_%28cropeed%29.jpg",
+        '[{"headline": "PM Modi inaugurates new infrastructure projects", "date": "2024-12-20"}, {"headline": "Address to the nation on Republic Day", "date": "2025-01-26"}]',
+        '["PMO India", "The Hindu", "ANI"]'
+    ),
+    (
+        "Rahul Gandhi", "Leader of Opposition", "INC", "Rae Bareli", "Uttar Pradesh",
+        "Leader of the Opposition in Lok Sabha (2024-). Spearheaded Bharat Jodo Yatra. Focus on social justice and caste census advocacy. Won from Wayanad and Rae Bareli in 2024.",
+        20, 12.0, 15.0, 85,
+        '["Bharat Jodo Yatra", "Leader of Opposition 2024", "Caste Census Advocacy"]',
+        "https://upload.wikimedia.org/wikipedia/commons/thumb/6/6e/Rahul_Gandhi_2024.jpg/440px-Rahul_Gandhi_2024.jpg",
+        '[{"headline": "Rahul Gandhi speaks on unemployment in Lok Sabha", "date": "2024-12-15"}, {"headline": "Bharat Jodo Nyay Yatra concludes", "date": "2024-03-20"}]',
+        '["INC India", "The Indian Express", "NDTV"]'
+    ),
+    (
+        "Amit Shah", "Home Minister", "BJP", "Gandhinagar", "Gujarat",
+        "Union Home Minister and Minister of Cooperation. Key strategist for BJP. Oversaw abrogation of Article 370 and new criminal laws. Longest serving Home Minister.",
+        5, 25.0, 25.0, 92,
+        '["Abrogation of Article 370", "New Criminal Laws", "Cooperation Ministry"]',
+        "https://upload.wikimedia.org/wikipedia/commons/thumb/8/88/Amit_Shah_in_New_Delhi_on_June_09%2C_2024_%28cropped%29.jpg/440px-Amit_Shah_in_New_Delhi_on_June_09%2C_2024_%28cropped%29.jpg",
+        '[{"headline": "Amit Shah reviews security situation in J&K", "date": "2024-12-22"}, {"headline": "New criminal laws to be implemented", "date": "2024-07-01"}]',
+        '["MHA", "Times of India", "News18"]'
+    ),
+    (
+        "Shashi Tharoor", "MP", "INC", "Thiruvananthapuram", "Kerala",
+        "Diplomat, author, and politician. Chairman of Parliamentary Committee on External Affairs. Former UN Under-Secretary-General. Known for literary works and articulate speeches.",
+        15, 8.5, 10.0, 90,
+        '["Sahitya Akademi Award", "Chairman External Affairs", "Diplomatic Service"]',
+        "https://upload.wikimedia.org/wikipedia/commons/thumb/b/b3/Shashi_Tharoor_in_2024_%28cropped%29.jpg/440px-Shashi_Tharoor_in_2024_%28cropped%29.jpg",
+        '[{"headline": "Tharoor discusses foreign policy challenges", "date": "2024-11-10"}, {"headline": "Launch of new book on Indian politics", "date": "2024-10-05"}]',
+        '["Shashi Tharoor Official", "The Print", "Hindustan Times"]'
     )
-    ''')
-    
-
-
-    # Migration for existing table (idempotent)
-    try:
-        cursor.execute("ALTER TABLE representatives ADD COLUMN achievements TEXT")
-    except Exception:
-        pass 
-
-    try:
-        cursor.execute("ALTER TABLE representatives ADD COLUMN image_url TEXT")
-    except Exception:
-        pass
-
-    try:
-        cursor.execute("ALTER TABLE representatives ADD COLUMN news TEXT")
-    except Exception:
-        pass
-
-    try:
-        cursor.execute("ALTER TABLE representatives ADD COLUMN sources TEXT")
-    except Exception:
-        pass
-
-    try:
-        cursor.execute("ALTER TABLE representatives ADD COLUMN funds_spent_crores REAL")
-    except Exception:
-        pass
+]
+CORE_REPRESENTATIVES_HASH = hashlib.sha256(json.dumps(CORE_REPRESENTATIVES).encode("utf-8")).hexdigest()[:16]
 
-    try:
-        cursor.execute("ALTER TABLE representatives ADD COLUMN funds_total_crores REAL")
-    except Exception:
-        pass
-
-    try:
-        cursor.execute("ALTER TABLE representatives ADD COLUMN attendance_percentage INTEGER")
-    except Exception:
-        pass
-
-    conn.commit()
-    
-    conn.commit()
-
-    # --- Analytics Tables ---
-    # Chat History
-    cursor.execute(f'''
-    CREATE TABLE IF NOT EXISTS chat_history (
-        id {pk_type},
-        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        user_query TEXT,
-        ai_response TEXT,
-        rating INTEGER
-    )
-    ''')
-    
-    # User Sessions
-    # session_id matches client-side UUID
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS user_sessions (
-        session_id TEXT PRIMARY KEY,
-        start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        last_heartbeat TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        duration_seconds REAL DEFAULT 0,
-        ip_address TEXT,
-        user_agent TEXT,
-        location TEXT,
-        latitude REAL,
-        longitude REAL
-    )
-    ''')
-    
-    # Analytics Events
-    cursor.execute(f'''
-    CREATE TABLE IF NOT EXISTS analytics_events (
-        id {pk_type},
-        session_id TEXT,
-        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        event_type TEXT,
-        details TEXT
-    )
-    ''')
+def _seed_core_representatives(conn, cursor, is_postgres):
+    """Seeds an empty table, else patches the core reps in. Returns True if representatives changed."""
+    reps_changed = False
 
-    conn.commit()
-    
     # --- SEED DATA (If Empty) ---
     print("Checking if database needs seeding...")
     # Use alias 'inc' (item count) to be safe across drivers
     cursor.execute("SELECT COUNT(*) as inc FROM representatives")
     count_res = cursor.fetchone()
-    
+
     # Handle PG vs SQLite return type
     try:
         if is_postgres:
@@ -213,45 +362,8 @@ def init_db():
 
     if count == 0:
         print("Seeding database with initial representatives...")
-        rps = [
-            (
-                "Narendra Modi", "Prime Minister", "BJP", "Varanasi", "Uttar Pradesh",
-                "India's 14th Prime Minister, focus on economic development and national security. Led BJP to third consecutive term in 2024. Launched initiatives like PM Awas Yojana (Housing).",
-                10, 50.5, 50.5, 98,
-                '["3rd Term as PM", "G20 Presidency", "Digital India Expansion"]',
-                "https://upload.wikimedia.org/wikipedia/commons/thumb/8/80/Prime_Minister_Narendra_Modi_in_New_Delhi_on_June_09%2C_2024_%28cropeed%29.jpg/440px-Prime_Minister_Narendra_Modi_in_New_Delhi_on_June_09%2C_2024_%28cropeed%29.jpg",
-                '[{"headline": "PM Modi inaugurates new infrastructure projects", "date": "2024-12-20"}, {"headline": "Address to the nation on Republic Day", "date": "2025-01-26"}]',
-                '["PMO India", "The Hindu", "ANI"]'
-            ),
-            (
-                "Rahul Gandhi", "Leader of Opposition", "INC", "Rae Bareli", "Uttar Pradesh",
-                "Leader of the Opposition in Lok Sabha (2024-). Spearheaded Bharat Jodo Yatra. Focus on social justice and caste census advocacy. Won from Wayanad and Rae Bareli in 2024.",
-                20, 12.0, 15.0, 85,
-                '["Bharat Jodo Yatra", "Leader of Opposition 2024", "Caste Census Advocacy"]',
-                "https://upload.wikimedia.org/wikipedia/commons/thumb/6/6e/Rahul_Gandhi_2024.jpg/440px-Rahul_Gandhi_2024.jpg",
-                '[{"headline": "Rahul Gandhi speaks on unemployment in Lok Sabha", "date": "2024-12-15"}, {"headline": "Bharat Jodo Nyay Yatra concludes", "date": "2024-03-20"}]',
-                '["INC India", "The Indian Express", "NDTV"]'
-            ),
-            (
-                "Amit Shah", "Home Minister", "BJP", "Gandhinagar", "Gujarat",
-                "Union Home Minister and Minister of Cooperation. Key strategist for BJP. Oversaw abrogation of Article 370 and new criminal laws. Longest serving Home Minister.",
-                5, 25.0, 25.0, 92,
-                '["Abrogation of Article 370", "New Criminal Laws", "Cooperation Ministry"]',
-                "https://upload.wikimedia.org/wikipedia/commons/thumb/8/88/Amit_Shah_in_New_Delhi_on_June_09%2C_2024_%28cropped%29.jpg/440px-Amit_Shah_in_New_Delhi_on_June_09%2C_2024_%28cropped%29.jpg",
-                '[{"headline": "Amit Shah reviews security situation in J&K", "date": "2024-12-22"}, {"headline": "New criminal laws to be implemented", "date": "2024-07-01"}]',
-                '["MHA", "Times of India", "News18"]'
-            ),
-            (
-                "Shashi Tharoor", "MP", "INC", "Thiruvananthapuram", "Kerala",
-                "Diplomat, author, and politician. Chairman of Parliamentary Committee on External Affairs. Former UN Under-Secretary-General. Known for literary works and articulate speeches.",
-                15, 8.5, 10.0, 90,
-                '["Sahitya Akademi Award", "Chairman External Affairs", "Diplomatic Service"]',
-                "https://upload.wikimedia.org/wikipedia/commons/thumb/b/b3/Shashi_Tharoor_in_2024_%28cropped%29.jpg/440px-Shashi_Tharoor_in_2024_%28cropped%29.jpg",
-                '[{"headline": "Tharoor discusses foreign policy challenges", "date": "2024-11-10"}, {"headline": "Launch of new book on Indian politics", "date": "2024-10-05"}]',
-                '["Shashi Tharoor Official", "The Print", "Hindustan Times"]'
-            ) 
-        ]
-        
+        rps = CORE_REPRESENTATIVES
+    
         # Postgres uses %s, SQLite uses ?
         if is_postgres:
             insert_sql = """
@@ -263,75 +375,40 @@ def init_db():
             INSERT INTO representatives (name, role, party, constituency, state, bio, years_in_office, funds_spent_crores, funds_total_crores, attendance_percentage, achievements, image_url, news, sources)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """
-            
+        
         for rp in rps:
             cursor.execute(insert_sql, rp)
-            
+        
         conn.commit()
+        reps_changed = True
         print("Seeding complete.")
 
     else:
         # Patch Update: Ensure Real Representatives exist and have rich data
         print("Verifying core representatives...")
-        
+    
         # FORCE CLEANUP: Remove broken dummy data (empty party, etc) to ensure clean demo
         try:
             # Delete entries where party is missing or empty, which causes the UI bug
             cursor.execute("DELETE FROM representatives WHERE party IS NULL OR party = ''")
+            if cursor.rowcount:
+                reps_changed = True
             conn.commit()
             print("Cleaned up broken/dummy data.")
         except Exception as e:
             print(f"Cleanup warning: {e}")
 
-        # We'll define the core reps with their full data
-        core_reps = [
-            (
-                "Narendra Modi", "Prime Minister", "BJP", "Varanasi", "Uttar Pradesh",
-                "India's 14th Prime Minister, focus on economic development and national security. Led BJP to third consecutive term in 2024. Launched initiatives like PM Awas Yojana (Housing).",
-                10, 50.5, 50.5, 98,
-                '["3rd Term as PM", "G20 Presidency", "Digital India Expansion"]',
-                "https://upload.wikimedia.org/wikipedia/commons/thumb/8/80/Prime_Minister_Narendra_Modi_in_New_Delhi_on_June_09%2C_2024_%28cropeed%29.jpg/440px-Prime_Minister_Narendra_Modi_in_New_Delhi_on_June_09%2C_2024_%28cropeed%29.jpg",
-                '[{"headline": "PM Modi inaugurates new infrastructure projects", "date": "2024-12-20"}, {"headline": "Address to the nation on Republic Day", "date": "2025-01-26"}]',
-                '["PMO India", "The Hindu", "ANI"]'
-            ),
-            (
-                "Rahul Gandhi", "Leader of Opposition", "INC", "Rae Bareli", "Uttar Pradesh",
-                "Leader of the Opposition in Lok Sabha (2024-). Spearheaded Bharat Jodo Yatra. Focus on social justice and caste census advocacy. Won from Wayanad and Rae Bareli in 2024.",
-                20, 12.0, 15.0, 85,
-                '["Bharat Jodo Yatra", "Leader of Opposition 2024", "Caste Census Advocacy"]',
-                "https://upload.wikimedia.org/wikipedia/commons/thumb/6/6e/Rahul_Gandhi_2024.jpg/440px-Rahul_Gandhi_2024.jpg",
-                '[{"headline": "Rahul Gandhi speaks on unemployment in Lok Sabha", "date": "2024-12-15"}, {"headline": "Bharat Jodo Nyay Yatra concludes", "date": "2024-03-20"}]',
-                '["INC India", "The Indian Express", "NDTV"]'
-            ),
-            (
-                "Amit Shah", "Home Minister", "BJP", "Gandhinagar", "Gujarat",
-                "Union Home Minister and Minister of Cooperation. Key strategist for BJP. Oversaw abrogation of Article 370 and new criminal laws. Longest serving Home Minister.",
-                5, 25.0, 25.0, 92,
-                '["Abrogation of Article 370", "New Criminal Laws", "Cooperation Ministry"]',
-                "https://upload.wikimedia.org/wikipedia/commons/thumb/8/88/Amit_Shah_in_New_Delhi_on_June_09%2C_2024_%28cropped%29.jpg/440px-Amit_Shah_in_New_Delhi_on_June_09%2C_2024_%28cropped%29.jpg",
-                '[{"headline": "Amit Shah reviews security situation in J&K", "date": "2024-12-22"}, {"headline": "New criminal laws to be implemented", "date": "2024-07-01"}]',
-                '["MHA", "Times of India", "News18"]'
-            ),
-            (
-                "Shashi Tharoor", "MP", "INC", "Thiruvananthapuram", "Kerala",
-                "Diplomat, author, and politician. Chairman of Parliamentary Committee on External Affairs. Former UN Under-Secretary-General. Known for literary works and articulate speeches.",
-                15, 8.5, 10.0, 90,
-                '["Sahitya Akademi Award", "Chairman External Affairs", "Diplomatic Service"]',
-                "https://upload.wikimedia.org/wikipedia/commons/thumb/b/b3/Shashi_Tharoor_in_2024_%28cropped%29.jpg/440px-Shashi_Tharoor_in_2024_%28cropped%29.jpg",
-                '[{"headline": "Tharoor discusses foreign policy challenges", "date": "2024-11-10"}, {"headline": "Launch of new book on Indian politics", "date": "2024-10-05"}]',
-                '["Shashi Tharoor Official", "The Print", "Hindustan Times"]'
-            )
-        ]
+        core_reps = CORE_REPRESENTATIVES
 
         if is_postgres:
-            check_sql = "SELECT id FROM representatives WHERE name = %s"
+            check_sql = "SELECT id, image_url, news, sources FROM representatives WHERE name = %s"
             insert_sql = """
             INSERT INTO representatives (name, role, party, constituency, state, bio, years_in_office, funds_spent_crores, funds_total_crores, attendance_percentage, achievements, image_url, news, sources)
             VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
             """
             update_sql = "UPDATE representatives SET image_url = %s, news = %s, sources = %s WHERE name = %s"
         else:
-            check_sql = "SELECT id FROM representatives WHERE name = ?"
+            check_sql = "SELECT id, image_url, news, sources FROM representatives WHERE name = ?"
             insert_sql = """
             INSERT INTO representatives (name, role, party, constituency, state, bio, years_in_office, funds_spent_crores, funds_total_crores, attendance_percentage, achievements, image_url, news, sources)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
@@ -342,103 +419,303 @@ def init_db():
             name = rp[0]
             cursor.execute(check_sql, (name,))
             existing = cursor.fetchone()
-            
+        
             if existing:
-                # Update with new rich data if it exists
+                # Update with new rich data if it exists and differs
                 # indices: 11=image_url, 12=news, 13=sources. name is 0.
-                cursor.execute(update_sql, (rp[11], rp[12], rp[13], name))
+                if (existing['image_url'], existing['news'], existing['sources']) != (rp[11], rp[12], rp[13]):
+                    cursor.execute(update_sql, (rp[11], rp[12], rp[13], name))
+                    reps_changed = True
             else:
                 # Insert
                 cursor.execute(insert_sql, rp)
-                
+                reps_changed = True
+            
         conn.commit()
 
-    conn.close()
+    return reps_changed
+
+def init_db():
+    """Applies pending migrations and the core representatives seed. Returns per-phase timings in ms."""
+    timings = {}
+    with get_db_connection() as conn:
+        is_postgres = os.getenv("DATABASE_URL") is not None
+
+        # --- Schema ---
+        # Tables, columns and indexes live in migrations/ (see migrate.py)
+        started = time.perf_counter()
+        applied = apply_migrations(conn, is_postgres)
+        timings["migrations"] = round((time.perf_counter() - started) * 1000, 1)
+        # Migrations may rewrite representatives (e.g. removing duplicates)
+        reps_changed = bool(applied)
+
+        # --- Seed / Core Reps Patch ---
+        # Skipped while app_state holds the hash of the current CORE_REPRESENTATIVES
+        started = time.perf_counter()
+        cursor = conn.cursor()
+        cursor.execute("SELECT value FROM app_state WHERE key = ?", ("core_representatives",))
+        row = cursor.fetchone()
+        if row and row['value'] == CORE_REPRESENTATIVES_HASH:
+            print("Core representatives up to date, skipping seed.")
+            conn.commit()
+        else:
+            if _seed_core_representatives(conn, cursor, is_postgres):
+                reps_changed = True
+            cursor.execute('''
+                INSERT INTO app_state (key, value, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+            ''', ("core_representatives", CORE_REPRESENTATIVES_HASH, time.time()))
+            conn.commit()
+        timings["seed"] = round((time.perf_counter() - started) * 1000, 1)
+
+    if reps_changed:
+        bump_data_version("representatives")
     print("Database initialized.")
+    return timings
+
+# --- Data Versions ---
+# Caches built from a table (e.g. the chat prompt's representatives block) register a
+# listener here. Writers call bump_data_version() after committing: listeners in this
+# process fire immediately, other processes notice the new version when they poll.
+
+_data_listeners = {}
+
+def on_data_changed(name, callback):
+    _data_listeners.setdefault(name, []).append(callback)
+
+def get_data_version(name):
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT version FROM data_versions WHERE name = ?", (name,))
+        row = cursor.fetchone()
+    return row['version'] if row else 0
+
+def bump_data_version(name):
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO data_versions (name, version) VALUES (?, 1)
+            ON CONFLICT (name) DO UPDATE SET version = data_versions.version + 1
+        ''', (name,))
+        conn.commit()
+    for callback in _data_listeners.get(name, []):
+        try:
+            callback()
+        except Exception as e:
+            print(f"Data change listener error ({name}): {e}")
+
+_NEWER_EVENT = "(excluded.last_event_at IS NOT NULL AND (user_sessions.last_event_at IS NULL OR excluded.last_event_at >= user_sessions.last_event_at))"
+LAST_EVENT_UPSERT = f"""
+                last_event_type = CASE WHEN {_NEWER_EVENT} THEN excluded.last_event_type ELSE user_sessions.last_event_type END,
+                last_event_at = CASE WHEN {_NEWER_EVENT} THEN excluded.last_event_at ELSE user_sessions.last_event_at END"""
+
+def flush_session_heartbeats(rows):
+    """
+    Batched upsert of buffered heartbeats.
+    rows: (session_id, ip, user_agent, location, lat, lon, start_time, last_heartbeat, last_event_type, last_event_at)
+    start_time only applies to sessions not yet in the table; the last event only
+    replaces a stored one that is older.
+    """
+    if not rows:
+        return 0
 
-def create_session(session_id, ip=None, user_agent=None, location=None, lat=None, lon=None):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     is_postgres = os.getenv("DATABASE_URL") is not None
-    
-    if is_postgres:
-        sql = """
-        INSERT INTO user_sessions (session_id, ip_address, user_agent, location, latitude, longitude) 
-        VALUES (?, ?, ?, ?, ?, ?)
-        ON CONFLICT (session_id) DO NOTHING
-        """
-    else:
-        sql = "INSERT OR IGNORE INTO user_sessions (session_id, ip_address, user_agent, location, latitude, longitude) VALUES (?, ?, ?, ?, ?, ?)"
-        
-    cursor.execute(sql, (session_id, ip, user_agent, location, lat, lon))
-    conn.commit()
-    conn.close()
 
-def update_session_heartbeat(session_id):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        if is_postgres:
+            sql = f"""
+            INSERT INTO user_sessions (session_id, ip_address, user_agent, location, latitude, longitude, start_time, last_heartbeat, last_event_type, last_event_at)
+            VALUES %s
+            ON CONFLICT (session_id) DO UPDATE SET
+                last_heartbeat = EXCLUDED.last_heartbeat,
+                duration_seconds = EXTRACT(EPOCH FROM (EXCLUDED.last_heartbeat - user_sessions.start_time)),
+                ip_address = COALESCE(user_sessions.ip_address, EXCLUDED.ip_address),
+                user_agent = COALESCE(user_sessions.user_agent, EXCLUDED.user_agent),
+                location = COALESCE(EXCLUDED.location, user_sessions.location),
+                latitude = COALESCE(EXCLUDED.latitude, user_sessions.latitude),
+                longitude = COALESCE(EXCLUDED.longitude, user_sessions.longitude),
+                {LAST_EVENT_UPSERT}
+            RETURNING session_id, (xmax = 0) AS inserted
+            """
+            for attempt in range(2):
+                # FOR UPDATE locks the sessions that exist; whether a session is new comes
+                # from the upsert itself, as another worker may insert it after this read
+                previous = _read_sessions_for_update(cursor, {row[0] for row in rows}, is_postgres)
+                returned = cursor.execute_values(sql, rows, fetch=True)
+                inserted = {row['session_id'] for row in returned if row['inserted']}
+                raced = {row['session_id'] for row in returned if not row['inserted']} - previous.keys()
+                if not raced or attempt:
+                    break
+                # Lost an insert race: those rows' state before this update is unknown.
+                # Redo the flush; the re-read finds and locks them.
+                conn.rollback()
+        else:
+            sql = f"""
+            INSERT INTO user_sessions (session_id, ip_address, user_agent, location, latitude, longitude, start_time, last_heartbeat, last_event_type, last_event_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (session_id) DO UPDATE SET
+                last_heartbeat = excluded.last_heartbeat,
+                duration_seconds = (strftime('%s', excluded.last_heartbeat) - strftime('%s', user_sessions.start_time)),
+                ip_address = COALESCE(user_sessions.ip_address, excluded.ip_address),
+                user_agent = COALESCE(user_sessions.user_agent, excluded.user_agent),
+                location = COALESCE(excluded.location, user_sessions.location),
+                latitude = COALESCE(excluded.latitude, user_sessions.latitude),
+                longitude = COALESCE(excluded.longitude, user_sessions.longitude),
+                {LAST_EVENT_UPSERT}
+            """
+            # Take the write lock before reading, so no other worker can insert or
+            # update these sessions between the read and the upsert
+            cursor.execute("BEGIN IMMEDIATE")
+            previous = _read_sessions_for_update(cursor, {row[0] for row in rows}, is_postgres)
+            cursor.executemany(sql, rows)
+            inserted = {row[0] for row in rows} - previous.keys()
+        _update_session_rollups(cursor, previous, rows, inserted)
+        conn.commit()
+    return len(rows)
+
+def _as_datetime(value):
+    # TIMESTAMP columns come back as datetime (Postgres) or 'YYYY-MM-DD HH:MM:SS' text (SQLite)
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    return datetime.strptime(str(value)[:19], '%Y-%m-%d %H:%M:%S')
+
+def _read_sessions_for_update(cursor, session_ids, is_postgres):
+    # Current state of the sessions about to be upserted, so rollups get exact deltas
+    previous = {}
+    ids = list(session_ids)
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        cursor.execute(
+            f"SELECT session_id, start_time, duration_seconds, location FROM user_sessions WHERE session_id IN ({','.join('?' * len(chunk))})"
+            + (" FOR UPDATE" if is_postgres else ""),
+            chunk,
+        )
+        for row in cursor.fetchall():
+            previous[row['session_id']] = dict(row)
+    return previous
+
+def _update_session_rollups(cursor, previous, rows, inserted):
+    """
+    Applies the change each upserted heartbeat row made to user_sessions to the daily
+    rollups. inserted: the session_ids the upsert created.
+    """
+    sessions, durations, locations = Counter(), Counter(), Counter()
+    coords = {}
+    for sid, _, _, location, lat, lon, start_time, last_heartbeat, *_ in rows:
+        old = previous.get(sid)
+        if old is None and sid not in inserted:
+            continue  # Updated, but its previous state wasn't read: no exact delta
+        if sid in inserted:
+            start = _as_datetime(start_time)
+            day = start.strftime('%Y-%m-%d')
+            sessions[day] += 1  # Inserted with duration 0; the next heartbeat adds it
+            new_location = location
+        else:
+            start = _as_datetime(old['start_time'])
+            day = start.strftime('%Y-%m-%d')
+            durations[day] += (_as_datetime(last_heartbeat) - start).total_seconds() - (old['duration_seconds'] or 0)
+            new_location = location if location is not None else old['location']
+            if old['location'] is not None and old['location'] != new_location:
+                locations[(day, old['location'])] -= 1
+        if new_location is not None and (old is None or old['location'] != new_location):
+            locations[(day, new_location)] += 1
+            if lat is not None:
+                coords[(day, new_location)] = (lat, lon)
+
+    for day in set(sessions) | set(durations):
+        cursor.execute('''
+            INSERT INTO rollup_sessions_daily (day, sessions, duration_seconds) VALUES (?, ?, ?)
+            ON CONFLICT (day) DO UPDATE SET
+                sessions = rollup_sessions_daily.sessions + excluded.sessions,
+                duration_seconds = rollup_sessions_daily.duration_seconds + excluded.duration_seconds
+        ''', (day, sessions[day], durations[day]))
+    for (day, location), delta in locations.items():
+        if not delta:
+            continue
+        lat, lon = coords.get((day, location), (None, None))
+        cursor.execute('''
+            INSERT INTO rollup_locations_daily (day, location, latitude, longitude, sessions) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (day, location) DO UPDATE SET
+                sessions = rollup_locations_daily.sessions + excluded.sessions,
+                latitude = COALESCE(excluded.latitude, rollup_locations_daily.latitude),
+                longitude = COALESCE(excluded.longitude, rollup_locations_daily.longitude)
+        ''', (day, location, lat, lon, delta))
+
+def get_ip_location(ip):
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT location, latitude, longitude, success, resolved_at FROM ip_locations WHERE ip_address = ?", (ip,))
+        row = cursor.fetchone()
+    return dict(row) if row else None
+
+def save_ip_location(ip, location, lat, lon, success, resolved_at):
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        # Same upsert syntax works on Postgres and SQLite >= 3.24
+        cursor.execute('''
+            INSERT INTO ip_locations (ip_address, location, latitude, longitude, success, resolved_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (ip_address) DO UPDATE SET
+                location = excluded.location,
+                latitude = excluded.latitude,
+                longitude = excluded.longitude,
+                success = excluded.success,
+                resolved_at = excluded.resolved_at
+        ''', (ip, location, lat, lon, 1 if success else 0, resolved_at))
+        conn.commit()
+
+def insert_analytics_events(rows):
+    """
+    Multi-row insert for the event pipeline, one transaction per batch.
+    rows: (session_id, event_type, details, timestamp)
+    """
+    if not rows:
+        return 0
+
     is_postgres = os.getenv("DATABASE_URL") is not None
-    
-    if is_postgres:
-        # Postgres: EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - start_time))
-        # Note: We need to cast timestamp to standard if needed, but CURRENT_TIMESTAMP works.
-        sql = '''
-            UPDATE user_sessions 
-            SET last_heartbeat = CURRENT_TIMESTAMP,
-                duration_seconds = EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - start_time))
-            WHERE session_id = ?
-        '''
-    else:
-        # SQLite: strftime('%s', ...)
-        sql = '''
-            UPDATE user_sessions 
-            SET last_heartbeat = CURRENT_TIMESTAMP,
-                duration_seconds = (strftime('%s', CURRENT_TIMESTAMP) - strftime('%s', start_time))
-            WHERE session_id = ?
-        '''
-
-    cursor.execute(sql, (session_id,))
-    conn.commit()
-    conn.close()
-
-def log_analytics_event(session_id, event_type, details=""):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("INSERT INTO analytics_events (session_id, event_type, details) VALUES (?, ?, ?)", (session_id, event_type, details))
-    conn.commit()
-    conn.close()
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        if is_postgres:
+            cursor.execute_values("INSERT INTO analytics_events (session_id, event_type, details, timestamp) VALUES %s", rows)
+        else:
+            cursor.executemany("INSERT INTO analytics_events (session_id, event_type, details, timestamp) VALUES (?, ?, ?, ?)", rows)
+        # Hourly rollup in the same transaction, so it never disagrees with the raw table
+        hourly = Counter((_as_datetime(ts).strftime('%Y-%m-%d %H'), event_type) for _, event_type, _, ts in rows)
+        for (hour, event_type), events in hourly.items():
+            cursor.execute('''
+                INSERT INTO rollup_events_hourly (hour, event_type, events) VALUES (?, ?, ?)
+                ON CONFLICT (hour, event_type) DO UPDATE SET events = rollup_events_hourly.events + excluded.events
+            ''', (hour, event_type or "", events))
+        conn.commit()
+    return len(rows)
+
+def _utc_day_bounds(day=None):
+    # ('YYYY-MM-DD', 'YYYY-MM-DD' of the next day), for range scans over text buckets
+    day = day or datetime.now(timezone.utc).date()
+    return day.strftime('%Y-%m-%d'), (day + timedelta(days=1)).strftime('%Y-%m-%d')
 
 def get_daily_stats():
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    is_postgres = os.getenv("DATABASE_URL") is not None
-    
-    if is_postgres:
-        date_q = "start_time::date = CURRENT_DATE"
-        date_q_ts = "timestamp::date = CURRENT_DATE"
-    else:
-        date_q = "date(start_time) = date('now')"
-        date_q_ts = "date(timestamp) = date('now')"
-    
-    # 1. New Users Today
-    cursor.execute(f"SELECT COUNT(*) as count FROM user_sessions WHERE {date_q}")
-    new_users = cursor.fetchone()['count'] if is_postgres else cursor.fetchone()[0]
-    
-    # 2. Avg Session Duration
-    cursor.execute(f"SELECT AVG(duration_seconds) as avg FROM user_sessions WHERE {date_q}")
-    row = cursor.fetchone()
-    # Postgres returns dictionary in RealDictCursor, SQLite row/tuple
-    val = row['avg'] if is_postgres and row else (row[0] if row else 0)
-    avg_duration = val or 0
-    
-    # 3. Top Actions
-    cursor.execute(f"SELECT event_type, COUNT(*) as count FROM analytics_events WHERE {date_q_ts} GROUP BY event_type ORDER BY count DESC LIMIT 5")
-    top_actions = [dict(row) for row in cursor.fetchall()]
+    # Read from the rollups: a handful of rows instead of a scan of the raw tables
+    today, tomorrow = _utc_day_bounds()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+
+        # 1. New Users Today / 2. Avg Session Duration
+        cursor.execute("SELECT sessions, duration_seconds FROM rollup_sessions_daily WHERE day = ?", (today,))
+        row = cursor.fetchone()
+        new_users = row['sessions'] if row else 0
+        avg_duration = row['duration_seconds'] / row['sessions'] if row and row['sessions'] else 0
+
+        # 3. Top Actions
+        cursor.execute('''
+            SELECT event_type, SUM(events) as count FROM rollup_events_hourly
+            WHERE hour >= ? AND hour < ?
+            GROUP BY event_type ORDER BY count DESC LIMIT 5
+        ''', (today, tomorrow))
+        top_actions = [dict(row) for row in cursor.fetchall()]
 
-    conn.close()
     return {
         "new_users": new_users,
         "avg_duration": round(avg_duration, 2),
@@ -446,99 +723,218 @@ def get_daily_stats():
     }
 
 def get_advanced_stats():
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    is_postgres = os.getenv("DATABASE_URL") is not None
-    
-    if is_postgres:
-        # Postgres uses TO_CHAR for formatting and CURRENT_DATE
-        date_q = "timestamp::date = CURRENT_DATE"
-        hour_q = "TO_CHAR(timestamp, 'HH24') as hour"
-    else:
-        # SQLite uses strftime and date('now')
-        date_q = "date(timestamp) = date('now')"
-        hour_q = "strftime('%H', timestamp) as hour"
-    
-    # 1. Traffic by Hour (Today)
-    cursor.execute(f"SELECT {hour_q}, COUNT(*) as count FROM analytics_events WHERE {date_q} GROUP BY hour ORDER BY hour")
-    traffic_by_hour = [dict(row) for row in cursor.fetchall()]
-    
-    # 2. Top Locations
-    cursor.execute("SELECT location, latitude, longitude, COUNT(*) as count FROM user_sessions WHERE location IS NOT NULL GROUP BY location ORDER BY count DESC LIMIT 10")
-    top_locations = [dict(row) for row in cursor.fetchall()]
-
-    # 3. Drop-off Points (Last event in session)
-    # We find the max timestamp for each session, then get the event type
-    cursor.execute('''
-        SELECT event_type, COUNT(*) as count 
-        FROM analytics_events 
-        WHERE (session_id, timestamp) IN (
-            SELECT session_id, MAX(timestamp) 
-            FROM analytics_events 
-            GROUP BY session_id
-        )
-        GROUP BY event_type 
-        ORDER BY count DESC 
-        LIMIT 5
-    ''')
-    drop_offs = [dict(row) for row in cursor.fetchall()]
+    today, tomorrow = _utc_day_bounds()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+
+        # 1. Traffic by Hour (Today)
+        cursor.execute('''
+            SELECT hour, SUM(events) as count FROM rollup_events_hourly
+            WHERE hour >= ? AND hour < ?
+            GROUP BY hour ORDER BY hour
+        ''', (today, tomorrow))
+        traffic_by_hour = [{"hour": row['hour'][-2:], "count": row['count']} for row in cursor.fetchall()]
+
+        # 2. Top Locations (all time)
+        cursor.execute('''
+            SELECT location, MAX(latitude) as latitude, MAX(longitude) as longitude, SUM(sessions) as count
+            FROM rollup_locations_daily
+            GROUP BY location HAVING SUM(sessions) > 0
+            ORDER BY count DESC LIMIT 10
+        ''')
+        top_locations = [dict(row) for row in cursor.fetchall()]
+
+        # 3. Drop-off Points (Last event in session, kept on user_sessions by the heartbeat flush)
+        cursor.execute('''
+            SELECT last_event_type as event_type, COUNT(*) as count
+            FROM user_sessions
+            WHERE last_event_type IS NOT NULL
+            GROUP BY last_event_type
+            ORDER BY count DESC
+            LIMIT 5
+        ''')
+        drop_offs = [dict(row) for row in cursor.fetchall()]
     
 
     
-    conn.close()
     return {
         "traffic_by_hour": traffic_by_hour,
         "top_locations": top_locations,
         "drop_offs": drop_offs
     }
 
+def _rebuild_analytics_rollups(cursor, is_postgres):
+    if is_postgres:
+        hour_expr = "TO_CHAR(timestamp, 'YYYY-MM-DD HH24')"
+        day_expr = "TO_CHAR(start_time, 'YYYY-MM-DD')"
+    else:
+        hour_expr = "strftime('%Y-%m-%d %H', timestamp)"
+        day_expr = "strftime('%Y-%m-%d', start_time)"
+
+    for table in ("rollup_events_hourly", "rollup_sessions_daily", "rollup_locations_daily"):
+        cursor.execute(f"DELETE FROM {table}")
+    cursor.execute(f'''
+        INSERT INTO rollup_events_hourly (hour, event_type, events)
+        SELECT {hour_expr}, COALESCE(event_type, ''), COUNT(*) FROM analytics_events
+        WHERE timestamp IS NOT NULL
+        GROUP BY {hour_expr}, COALESCE(event_type, '')
+    ''')
+    cursor.execute(f'''
+        INSERT INTO rollup_sessions_daily (day, sessions, duration_seconds)
+        SELECT {day_expr}, COUNT(*), COALESCE(SUM(duration_seconds), 0) FROM user_sessions
+        WHERE start_time IS NOT NULL
+        GROUP BY {day_expr}
+    ''')
+    cursor.execute(f'''
+        INSERT INTO rollup_locations_daily (day, location, latitude, longitude, sessions)
+        SELECT {day_expr}, location, MAX(latitude), MAX(longitude), COUNT(*) FROM user_sessions
+        WHERE start_time IS NOT NULL AND location IS NOT NULL
+        GROUP BY {day_expr}, location
+    ''')
+
+def rebuild_analytics_rollups():
+    """
+    Recomputes every rollup table from analytics_events and user_sessions, in one
+    transaction. Safe to re-run; heartbeats or events flushed while it runs may be
+    counted twice or missed for the current hour, so prefer a quiet moment.
+    """
+    is_postgres = os.getenv("DATABASE_URL") is not None
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        _rebuild_analytics_rollups(cursor, is_postgres)
+        conn.commit()
+        counts = {}
+        for table in ("rollup_events_hourly", "rollup_sessions_daily", "rollup_locations_daily"):
+            cursor.execute(f"SELECT COUNT(*) as n FROM {table}")
+            counts[table] = cursor.fetchone()['n']
+    return counts
+
 def get_recent_chats(limit=10):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT timestamp, user_query, ai_response, rating FROM chat_history ORDER BY timestamp DESC LIMIT ?", (limit,))
-    chats = [dict(row) for row in cursor.fetchall()]
-    conn.close()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT timestamp, user_query, ai_response, rating FROM chat_history ORDER BY timestamp DESC LIMIT ?", (limit,))
+        chats = [dict(row) for row in cursor.fetchall()]
     return chats
 
-
-def get_representative_by_location(constituency):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM representatives WHERE constituency LIKE ?", (f"%{constituency}%",))
-    reps = cursor.fetchall()
-    conn.close()
+def get_representatives_by_pincode(pincode):
+    """
+    Offline PIN lookup: one primary-key hit on pincodes joined to representatives.
+    Returns None when the PIN isn't in the table (caller falls back to live geocoding).
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT district, state, constituency FROM pincodes WHERE pincode = ?", (pincode,))
+        pin = cursor.fetchone()
+        if not pin or not pin['constituency']:
+            return None
+        cursor.execute("SELECT * FROM representatives WHERE constituency = ?", (pin['constituency'],))
+        reps = cursor.fetchall()
     return [dict(row) for row in reps]
 
+def get_constituency_centroids():
+    # Approximate constituency centres from the PIN codes mapped to them
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT constituency, state, AVG(latitude) as latitude, AVG(longitude) as longitude
+            FROM pincodes
+            WHERE constituency IS NOT NULL AND latitude IS NOT NULL AND longitude IS NOT NULL
+            GROUP BY constituency, state
+        ''')
+        rows = cursor.fetchall()
+    return [dict(row) for row in rows]
+
 def get_all_representatives():
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM representatives")
-    reps = cursor.fetchall()
-    conn.close()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM representatives")
+        reps = cursor.fetchall()
     return [dict(row) for row in reps]
 
 def save_chat_interaction(user_query, ai_response):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("INSERT INTO chat_history (user_query, ai_response) VALUES (?, ?)", (user_query, ai_response))
-    chat_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        if os.getenv("DATABASE_URL") is not None:
+            # lastrowid is always None through PostgresCursorProxy
+            cursor.execute("INSERT INTO chat_history (user_query, ai_response) VALUES (?, ?) RETURNING id", (user_query, ai_response))
+            chat_id = cursor.fetchone()['id']
+        else:
+            cursor.execute("INSERT INTO chat_history (user_query, ai_response) VALUES (?, ?)", (user_query, ai_response))
+            chat_id = cursor.lastrowid
+        conn.commit()
     return chat_id
 
+def get_cached_chat_response(cache_key, min_created_at):
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT response, created_at FROM chat_cache WHERE cache_key = ? AND created_at > ?", (cache_key, min_created_at))
+        row = cursor.fetchone()
+    return dict(row) if row else None
+
+def save_cached_chat_response(cache_key, response, created_at):
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO chat_cache (cache_key, response, created_at) VALUES (?, ?, ?)
+            ON CONFLICT (cache_key) DO UPDATE SET response = excluded.response, created_at = excluded.created_at
+        ''', (cache_key, response, created_at))
+        conn.commit()
+
+def get_cached_local_reps(location_key):
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT data, fetched_at FROM local_reps_cache WHERE location_key = ?", (location_key,))
+        row = cursor.fetchone()
+    if not row:
+        return None
+    return {"data": json.loads(row['data']), "fetched_at": row['fetched_at']}
+
+def save_cached_local_reps(location_key, data, fetched_at):
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO local_reps_cache (location_key, data, fetched_at) VALUES (?, ?, ?)
+            ON CONFLICT (location_key) DO UPDATE SET data = excluded.data, fetched_at = excluded.fetched_at
+        ''', (location_key, json.dumps(data), fetched_at))
+        conn.commit()
+
 def update_chat_rating(chat_id, rating):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("UPDATE chat_history SET rating = ? WHERE id = ?", (rating, chat_id))
-    conn.commit()
-    conn.close()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE chat_history SET rating = ? WHERE id = ?", (rating, chat_id))
+        conn.commit()
 
 def get_high_quality_chats():
     # Retrieve chats with 5-star ratings for few-shot learning
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT user_query, ai_response FROM chat_history WHERE rating = 5 ORDER BY id DESC LIMIT 5")
-    chats = cursor.fetchall()
-    conn.close()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT user_query, ai_response FROM chat_history WHERE rating = 5 ORDER BY id DESC LIMIT 5")
+        chats = cursor.fetchall()
     return [dict(row) for row in chats]
+
+REPRESENTATIVE_EDITABLE_FIELDS = (
+    "name", "role", "party", "constituency", "state", "bio", "years_in_office",
+    "funds_spent_crores", "funds_total_crores", "attendance_percentage",
+    "achievements", "image_url", "news", "sources",
+)
+
+class DuplicateRepresentative(Exception):
+    """An edit would give a representative the (name, constituency) of another one."""
+
+def update_representative(rep_id, fields):
+    updates = {k: v for k, v in fields.items() if k in REPRESENTATIVE_EDITABLE_FIELDS}
+    if not updates:
+        return False
+    assignments = ", ".join(f"{k} = ?" for k in updates)
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"UPDATE representatives SET {assignments} WHERE id = ?", (*updates.values(), rep_id))
+        except (sqlite3.IntegrityError, psycopg2.IntegrityError) as e:
+            # uq_representatives_name_constituency (migration 0007)
+            raise DuplicateRepresentative(str(e)) from e
+        changed = cursor.rowcount > 0
+        conn.commit()
+    if changed:
+        bump_data_version("representatives")
+    return changed
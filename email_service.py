@@ -1,48 +1,60 @@
+import asyncio
 import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import os
 from datetime import datetime, timedelta
-import psycopg2
 from database import get_db_connection
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# --- Daily Report ---
+# The report's database queries and SMTP conversation are blocking, so the whole job
+# runs on a dedicated single-thread executor instead of the event loop that serves
+# API requests. One SMTP connection delivers to every recipient, and the run has a
+# time budget: each socket operation gets at most what is left of it, so a hung
+# server can't hold the executor (and the next report) indefinitely.
+
 SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
 SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
 SMTP_USER = os.getenv("SMTP_USER")
 SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "1") != "0"  # Off only for a local stand-in server
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", 30))  # Per connect/command
+REPORT_TIMEOUT = float(os.getenv("REPORT_TIMEOUT", 120))  # Whole report, queries included
 ADMIN_EMAIL = "medha@example.com" # Replace with user's actual email if known, or use env var
-TARGET_EMAIL = os.getenv("TARGET_EMAIL", SMTP_USER) # Default to sending to self if not specified
+TARGET_EMAIL = os.getenv("TARGET_EMAIL", SMTP_USER) # Default to sending to self if not specified; comma-separated for several
+
+_report_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="daily-report")
 
 def get_daily_stats():
     """Fetch statistics for the past 24 hours."""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    
     yesterday = datetime.now() - timedelta(days=1)
     
-    # Total Chats
-    cur.execute("SELECT COUNT(*) FROM chat_history WHERE timestamp > %s", (yesterday,))
-    total_chats = cur.fetchone()['count']
+    with get_db_connection() as conn:
+        cur = conn.cursor()
     
-    # Active Users (unique sessions)
-    cur.execute("SELECT COUNT(DISTINCT session_id) FROM analytics_events WHERE timestamp > %s", (yesterday,))
-    active_users = cur.fetchone()['count']
+        # Total Chats
+        cur.execute("SELECT COUNT(*) AS count FROM chat_history WHERE timestamp > ?", (yesterday,))
+        total_chats = cur.fetchone()['count']
     
-    # Top 5 Queries
-    cur.execute("""
-        SELECT user_query, COUNT(*) as freq 
-        FROM chat_history 
-        WHERE timestamp > %s 
-        GROUP BY user_query 
-        ORDER BY freq DESC 
-        LIMIT 5
-    """, (yesterday,))
-    top_queries = cur.fetchall()
+        # Active Users (unique sessions)
+        cur.execute("SELECT COUNT(DISTINCT session_id) AS count FROM analytics_events WHERE timestamp > ?", (yesterday,))
+        active_users = cur.fetchone()['count']
     
-    conn.close()
+        # Top 5 Queries
+        cur.execute("""
+            SELECT user_query, COUNT(*) as freq 
+            FROM chat_history 
+            WHERE timestamp > ? 
+            GROUP BY user_query 
+            ORDER BY freq DESC 
+            LIMIT 5
+        """, (yesterday,))
+        top_queries = cur.fetchall()
     
     return {
         "total_chats": total_chats,
@@ -70,27 +82,65 @@ def format_email_body(stats):
     body += "</ul>"
     return body
 
-async def send_daily_report():
-    print("Generating daily report...")
-    try:
-        stats = get_daily_stats()
-        html_body = format_email_body(stats)
-        
+def recipients():
+    return [addr.strip() for addr in (TARGET_EMAIL or "").split(",") if addr.strip()]
+
+def build_messages(stats):
+    html_body = format_email_body(stats)
+    messages = []
+    for to in recipients():
+        # One message per recipient, so addresses aren't disclosed to each other
         msg = MIMEMultipart()
         msg['From'] = SMTP_USER
-        msg['To'] = TARGET_EMAIL
+        msg['To'] = to
         msg['Subject'] = f"CitizenConnect Daily Analytics - {stats['date']}"
-        
         msg.attach(MIMEText(html_body, 'html'))
-        
-        print(f"Connecting to SMTP: {SMTP_SERVER}:{SMTP_PORT}")
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
+        messages.append(msg)
+    return messages
+
+def deliver(messages, deadline):
+    """Sends `messages` over one SMTP connection. Returns how many were accepted."""
+    def remaining():
+        left = deadline - time.monotonic()
+        if left <= 0:
+            raise TimeoutError("report time budget exhausted")
+        return min(SMTP_TIMEOUT, left)
+
+    print(f"Connecting to SMTP: {SMTP_SERVER}:{SMTP_PORT}")
+    sent = 0
+    with smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=remaining()) as server:
+        if SMTP_STARTTLS:
             server.starttls()
+        if SMTP_USER and SMTP_PASSWORD:
             server.login(SMTP_USER, SMTP_PASSWORD)
-            server.send_message(msg)
-            
-        print("Daily report sent successfully.")
-        return True
+        for msg in messages:
+            server.sock.settimeout(remaining())
+            try:
+                server.send_message(msg)
+                sent += 1
+            except smtplib.SMTPRecipientsRefused as e:
+                # One bad address shouldn't cost the others their report
+                print(f"Daily report not delivered to {msg['To']}: {e}")
+    return sent
+
+def _run_daily_report(deadline):
+    stats = get_daily_stats()
+    messages = build_messages(stats)
+    if not messages:
+        print("No TARGET_EMAIL configured; daily report not sent.")
+        return False
+    sent = deliver(messages, deadline)
+    print(f"Daily report sent to {sent}/{len(messages)} recipients.")
+    return sent > 0
+
+async def send_daily_report():
+    print("Generating daily report...")
+    deadline = time.monotonic() + REPORT_TIMEOUT
+    try:
+        loop = asyncio.get_running_loop()
+        # Small grace over the budget: the worker gives up on its own at the deadline
+        return await asyncio.wait_for(
+            loop.run_in_executor(_report_executor, _run_daily_report, deadline), REPORT_TIMEOUT + 5)
     except Exception as e:
-        print(f"Failed to send daily report: {e}")
+        print(f"Failed to send daily report: {e!r}")
         return False
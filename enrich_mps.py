@@ -0,0 +1,294 @@
+import asyncio
+import gzip
+import hashlib
+import os
+import re
+import sys
+import time
+from urllib.parse import unquote, urlsplit
+import httpx
+from dotenv import load_dotenv
+from lxml import html as lxml_html
+from database import get_db_connection, bump_data_version
+from html_tables import cell_text
+from ingest_mps_wiki import MP_ROLE, MP_BIO
+
+load_dotenv()
+
+# --- MP Profile Enrichment ---
+# Second stage of the Lok Sabha ingest: the list page only gives name, party and
+# constituency, so each MP's own article (wiki_url, saved by ingest_mps_wiki) is
+# fetched for a bio paragraph, the infobox portrait and the years served in the Lok
+# Sabha. Article revisions are looked up 50 titles per API call, and the rendered
+# HTML of a revision is cached on disk under a key of URL and revision ID: a revision
+# never changes, so re-runs only download articles edited since the last one.
+# Downloads share a bounded connection pool and a per-host request rate.
+#
+#   python enrich_mps.py              # enrich every scraped MP with an article link
+#   python enrich_mps.py --limit 20   # first 20 only
+
+ENRICH_CONCURRENCY = int(os.getenv("ENRICH_CONCURRENCY", 8))
+ENRICH_HOST_RPS = float(os.getenv("ENRICH_HOST_RPS", 15))  # Per host, across all workers
+ENRICH_TIMEOUT = float(os.getenv("ENRICH_TIMEOUT", 20))
+ENRICH_RETRIES = 3
+ENRICH_CACHE_DIR = os.getenv("ENRICH_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "wiki"))
+TITLES_PER_QUERY = 50  # MediaWiki API limit for anonymous clients
+BIO_MAX_CHARS = 500
+REQUEST_HEADERS = {
+    # Wikimedia asks API clients to identify themselves
+    "User-Agent": "CitizenConnect/1.0 (MP profile enrichment; https://github.com/DevDotKP/CitizenConnect)"
+}
+_YEAR_RE = re.compile(r"\b(19\d\d|20\d\d)\b")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s")
+_OFFICE_SECTION_RE = re.compile(r"lok sabha|member of parliament", re.I)
+
+class HostRateLimiter:
+    """Spaces requests to each host at least 1/rps seconds apart."""
+    def __init__(self, rps):
+        self.interval = 1.0 / rps if rps > 0 else 0.0
+        self._next = {}  # host -> earliest start of its next request
+        self._lock = asyncio.Lock()
+
+    async def wait(self, host):
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+# --- Response Cache ---
+
+def _cache_path(url, revision_id):
+    key = hashlib.sha256(f"{url}@{revision_id}".encode()).hexdigest()
+    return os.path.join(ENRICH_CACHE_DIR, key[:2], key + ".html.gz")
+
+def cache_get(url, revision_id):
+    try:
+        with gzip.open(_cache_path(url, revision_id), "rt", encoding="utf-8") as f:
+            return f.read()
+    except (OSError, EOFError):
+        return None
+
+def cache_put(url, revision_id, text):
+    path = _cache_path(url, revision_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)  # Readers never see a partial file
+
+# --- Fetching ---
+
+def article_title(wiki_url):
+    """(api endpoint, page title) for a /wiki/ article URL."""
+    parts = urlsplit(wiki_url)
+    title = unquote(parts.path.split("/wiki/", 1)[1]).replace("_", " ")
+    return f"{parts.scheme}://{parts.netloc}/w/api.php", title
+
+async def _get(client, limiter, semaphore, url, params):
+    host = urlsplit(url).netloc
+    for attempt in range(ENRICH_RETRIES):
+        async with semaphore:
+            await limiter.wait(host)
+            try:
+                response = await client.get(url, params=params)
+            except httpx.TransportError as e:
+                error, delay = e, 2 ** attempt
+            else:
+                if response.status_code != 429 and response.status_code < 500:
+                    response.raise_for_status()
+                    return response.json()
+                error = httpx.HTTPStatusError(f"HTTP {response.status_code}", request=response.request, response=response)
+                retry_after = response.headers.get("Retry-After", "")
+                delay = min(float(retry_after), 60) if retry_after.isdigit() else 2 ** attempt
+        # Back off outside the semaphore so other workers keep going
+        await asyncio.sleep(delay)
+    raise error
+
+async def lookup_revisions(client, limiter, semaphore, api, titles):
+    """{title: latest revision ID} for existing pages, following normalization and redirects."""
+    revisions = {}
+    for start in range(0, len(titles), TITLES_PER_QUERY):
+        batch = titles[start:start + TITLES_PER_QUERY]
+        data = await _get(client, limiter, semaphore, api, {
+            "action": "query", "prop": "revisions", "rvprop": "ids", "redirects": 1,
+            "titles": "|".join(batch), "format": "json", "formatversion": 2,
+        })
+        query = data.get("query", {})
+        resolved = {}
+        for mapping in ("normalized", "redirects"):
+            for item in query.get(mapping, []):
+                resolved[item["from"]] = item["to"]
+        latest = {page["title"]: page["revisions"][0]["revid"]
+                  for page in query.get("pages", []) if page.get("revisions")}
+        for title in batch:
+            target = title
+            for _ in range(3):  # normalized -> redirect -> normalized
+                target = resolved.get(target, target)
+            if target in latest:
+                revisions[title] = latest[target]
+    return revisions
+
+async def fetch_article(client, limiter, semaphore, api, revision_id, stats):
+    """Rendered HTML of one revision, from the disk cache when it's there."""
+    text = cache_get(api, revision_id)
+    if text is not None:
+        stats["cached"] += 1
+        return text
+    data = await _get(client, limiter, semaphore, api, {
+        "action": "parse", "oldid": revision_id, "prop": "text",
+        "disablelimitreport": 1, "format": "json", "formatversion": 2,
+    })
+    text = data["parse"]["text"]
+    cache_put(api, revision_id, text)
+    stats["fetched"] += 1
+    return text
+
+# --- Extraction ---
+
+def _image_src(infobox):
+    images = infobox.xpath(".//td[contains(@class, 'infobox-image')]//img") or [
+        img for img in infobox.iter("img") if int(img.get("width") or 0) >= 100  # Not flags and icons
+    ]
+    if not images:
+        return None
+    src = images[0].get("src")
+    return "https:" + src if src and src.startswith("//") else src
+
+def _office_years(infobox, current_year):
+    # Infobox rows under a "Member of Parliament, Lok Sabha" header: "In office 2014 – 2019",
+    # "Assumed office 4 June 2024", "Incumbent". Overlapping terms are merged.
+    terms, in_section = [], False
+    for tr in infobox.iter("tr"):
+        header = tr.xpath("./th[@colspan or contains(@class, 'infobox-header')]")
+        if header:
+            in_section = bool(_OFFICE_SECTION_RE.search(cell_text(header[0])))
+            continue
+        text = cell_text(tr)
+        if not in_section or "office" not in text.lower():
+            continue
+        years = [int(y) for y in _YEAR_RE.findall(text)]
+        if len(years) >= 2:
+            terms.append((years[0], years[-1]))
+        elif years:
+            terms.append((years[0], current_year))
+    total, last_end = 0, None
+    for start, end in sorted(terms):
+        if last_end is not None and start < last_end:
+            start = last_end
+        if end > start:
+            total += end - start
+            last_end = end
+    return total if terms else None
+
+def _bio(root):
+    for p in root.iter("p"):
+        if next(p.iterancestors("table"), None) is not None:
+            continue
+        text = cell_text(p)
+        if len(text) < 40:
+            continue
+        if len(text) <= BIO_MAX_CHARS:
+            return text
+        cut = [m.start() for m in _SENTENCE_END_RE.finditer(text, 0, BIO_MAX_CHARS)]
+        return text[:cut[-1]] if cut else text[:BIO_MAX_CHARS].rsplit(" ", 1)[0] + "…"
+    return None
+
+def extract_profile(article_html, current_year=None):
+    """{"bio", "image_url", "years_in_office"} from an article's HTML; None for what it lacks."""
+    root = lxml_html.fromstring(article_html)
+    infobox = next(iter(root.xpath("//table[contains(concat(' ', @class, ' '), ' infobox ')]")), None)
+    return {
+        "bio": _bio(root),
+        "image_url": _image_src(infobox) if infobox is not None else None,
+        "years_in_office": _office_years(infobox, current_year or time.gmtime().tm_year) if infobox is not None else None,
+    }
+
+# --- Pipeline ---
+
+async def crawl(urls):
+    """{wiki_url: profile dict} for every article that could be fetched, plus stats."""
+    stats = {"pages": len(urls), "fetched": 0, "cached": 0, "failed": 0}
+    by_api = {}
+    for url in urls:
+        api, title = article_title(url)
+        by_api.setdefault(api, {})[title] = url
+
+    limiter = HostRateLimiter(ENRICH_HOST_RPS)
+    semaphore = asyncio.Semaphore(ENRICH_CONCURRENCY)
+    limits = httpx.Limits(max_connections=ENRICH_CONCURRENCY, max_keepalive_connections=ENRICH_CONCURRENCY)
+    profiles = {}
+    async with httpx.AsyncClient(headers=REQUEST_HEADERS, timeout=ENRICH_TIMEOUT, limits=limits,
+                                 follow_redirects=True) as client:
+        async def enrich_one(api, url, revision_id):
+            try:
+                text = await fetch_article(client, limiter, semaphore, api, revision_id, stats)
+                profiles[url] = await asyncio.to_thread(extract_profile, text)
+            except Exception as e:
+                stats["failed"] += 1
+                print(f"Enrichment: {url} failed ({e})")
+
+        jobs = []
+        for api, titles in by_api.items():
+            revisions = await lookup_revisions(client, limiter, semaphore, api, list(titles))
+            stats["failed"] += len(titles) - len(revisions)  # Missing or deleted articles
+            jobs.extend(enrich_one(api, titles[title], rev) for title, rev in revisions.items())
+        await asyncio.gather(*jobs)
+    return profiles, stats
+
+def _merge(row, profile):
+    # Curated values win: bio and image only replace the list-ingest placeholders.
+    # Years come from the article every time, as they change with each term.
+    bio = profile["bio"] if profile["bio"] and row['bio'] in (None, "", MP_BIO) else row['bio']
+    image_url = row['image_url'] or profile["image_url"]
+    years = profile["years_in_office"] if profile["years_in_office"] is not None else row['years_in_office']
+    return bio, image_url, years
+
+def enrich_representatives(limit=None):
+    """Fetches, extracts and bulk-updates the scraped MPs' profiles. Returns counts."""
+    started = time.perf_counter()
+    is_postgres = os.getenv("DATABASE_URL") is not None
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT id, wiki_url, bio, image_url, years_in_office FROM representatives
+            WHERE role = ? AND wiki_url IS NOT NULL ORDER BY id
+        ''', (MP_ROLE,))
+        rows = [dict(row) for row in cursor.fetchall()]
+    if limit:
+        rows = rows[:limit]
+    print(f"Enriching {len(rows)} MP profiles...")
+
+    profiles, stats = asyncio.run(crawl(sorted({row['wiki_url'] for row in rows})))
+    updates = []
+    for row in rows:
+        profile = profiles.get(row['wiki_url'])
+        if profile is None:
+            continue
+        merged = _merge(row, profile)
+        if merged != (row['bio'], row['image_url'], row['years_in_office']):
+            updates.append(merged + (row['id'],))
+
+    if updates:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            if is_postgres:
+                cursor.execute_values('''
+                    UPDATE representatives AS r SET bio = v.bio, image_url = v.image_url, years_in_office = v.years
+                    FROM (VALUES %s) AS v(bio, image_url, years, id) WHERE r.id = v.id
+                ''', updates)
+            else:
+                cursor.executemany(
+                    "UPDATE representatives SET bio = ?, image_url = ?, years_in_office = ? WHERE id = ?", updates)
+            conn.commit()
+        bump_data_version("representatives")
+
+    stats["updated"] = len(updates)
+    stats["seconds"] = round(time.perf_counter() - started, 1)
+    print(f"Enrichment: {stats}")
+    return stats
+
+if __name__ == "__main__":
+    limit = int(sys.argv[sys.argv.index("--limit") + 1]) if "--limit" in sys.argv else None
+    enrich_representatives(limit=limit)
@@ -0,0 +1,244 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from database import get_ip_location, save_ip_location, get_constituency_centroids
+
+# --- IP Geolocation ---
+# Lookups hit ip-api.com, which is slow (up to 2s) and rate limited, so results are
+# kept in a bounded LRU with TTL, backed by the ip_locations table across restarts.
+# Failures are cached too (for a shorter time) so a bad IP isn't retried every heartbeat.
+
+IP_GEO_TTL = float(os.getenv("IP_GEO_TTL", 7 * 24 * 3600))
+IP_GEO_NEGATIVE_TTL = float(os.getenv("IP_GEO_NEGATIVE_TTL", 600))
+IP_GEO_CACHE_SIZE = int(os.getenv("IP_GEO_CACHE_SIZE", 10000))
+
+UNKNOWN_LOCATION = ("Unknown", None, None)
+
+def fetch_ip_location(ip):
+    """Live ip-api.com lookup. Returns ((location, lat, lon), success)."""
+    if ip in ["127.0.0.1", "::1"]:
+        return ("Localhost, Dev", 20.5937, 78.9629), True # Mock (India center)
+    try:
+        import requests  # Deferred: only needed on a cache miss
+        res = requests.get(f"http://ip-api.com/json/{ip}", timeout=2)
+        if res.status_code == 200:
+            data = res.json()
+            if data['status'] == 'success':
+                loc_str = f"{data['city']}, {data['country']}"
+                return (loc_str, data['lat'], data['lon']), True
+    except Exception:
+        pass
+    return UNKNOWN_LOCATION, False
+
+class IPLocationCache:
+    def __init__(self, max_size=IP_GEO_CACHE_SIZE, ttl=IP_GEO_TTL, negative_ttl=IP_GEO_NEGATIVE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries = OrderedDict()  # ip -> (value, expires_at)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "db_hits": 0, "misses": 0, "failures": 0}
+
+    def _get_memory(self, ip):
+        with self._lock:
+            entry = self._entries.get(ip)
+            if not entry:
+                return None
+            value, expires_at = entry
+            if expires_at < time.time():
+                del self._entries[ip]
+                return None
+            self._entries.move_to_end(ip)
+            self.stats["hits"] += 1
+            return value
+
+    def _put_memory(self, ip, value, expires_at):
+        with self._lock:
+            self._entries[ip] = (value, expires_at)
+            self._entries.move_to_end(ip)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def lookup(self, ip):
+        value = self._get_memory(ip)
+        if value is not None:
+            return value
+
+        # Persisted tier
+        try:
+            row = get_ip_location(ip)
+        except Exception as e:
+            print(f"IP cache read error: {e}")
+            row = None
+        if row and row['resolved_at']:
+            ttl = self.ttl if row['success'] else self.negative_ttl
+            expires_at = row['resolved_at'] + ttl
+            if expires_at > time.time():
+                value = (row['location'], row['latitude'], row['longitude']) if row['success'] else UNKNOWN_LOCATION
+                self._put_memory(ip, value, expires_at)
+                with self._lock:
+                    self.stats["db_hits"] += 1
+                return value
+
+        # Live lookup
+        value, success = fetch_ip_location(ip)
+        now = time.time()
+        with self._lock:
+            self.stats["misses"] += 1
+            if not success:
+                self.stats["failures"] += 1
+        self._put_memory(ip, value, now + (self.ttl if success else self.negative_ttl))
+        try:
+            save_ip_location(ip, value[0], value[1], value[2], success, now)
+        except Exception as e:
+            print(f"IP cache write error: {e}")
+        return value
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats["size"] = len(self._entries)
+        return stats
+
+ip_location_cache = IPLocationCache()
+
+# --- Reverse Geocoding ---
+
+@functools.lru_cache(maxsize=None)
+def get_geolocator():
+    """Shared Nominatim client (geopy is imported on first use)."""
+    from geopy.geocoders import Nominatim
+    return Nominatim(user_agent="citizen_connect_app")
+
+# --- Constituency Locator ---
+# Maps lat/lon straight to a Lok Sabha constituency without a reverse-geocoding round
+# trip. With a boundaries GeoJSON (CONSTITUENCY_GEOJSON) it does point-in-polygon over
+# a coarse grid of bounding boxes; otherwise it falls back to the nearest constituency
+# centroid, with centroids averaged from the pincodes table.
+
+CONSTITUENCY_GEOJSON = os.getenv("CONSTITUENCY_GEOJSON", "data/constituencies.geojson")
+GRID_CELL_DEGREES = 0.5
+CENTROID_MAX_DEGREES = 1.0  # Beyond this the nearest centroid is probably not ours
+
+NAME_KEYS = ("pc_name", "PC_NAME", "constituency", "name", "NAME")
+STATE_KEYS = ("st_name", "ST_NAME", "state", "STATE", "state_name")
+
+def _first_property(props, keys):
+    for key in keys:
+        if props.get(key):
+            return str(props[key]).strip()
+    return ""
+
+def _point_in_ring(x, y, ring):
+    # Ray casting; ring is a list of [lon, lat]
+    inside = False
+    j = len(ring) - 1
+    for i in range(len(ring)):
+        xi, yi = ring[i][0], ring[i][1]
+        xj, yj = ring[j][0], ring[j][1]
+        if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+def _point_in_polygon(x, y, polygon):
+    # polygon = [outer ring, *holes]
+    if not _point_in_ring(x, y, polygon[0]):
+        return False
+    return not any(_point_in_ring(x, y, hole) for hole in polygon[1:])
+
+class ConstituencyLocator:
+    def __init__(self, cell=GRID_CELL_DEGREES):
+        self.cell = cell
+        self._shapes = []     # (name, state, bbox, [polygon, ...])
+        self._centroids = []  # (name, state, lat, lon)
+        self._grid = {}       # (ix, iy) -> [index into _shapes or _centroids]
+        self.mode = None
+
+    def _cell(self, lat, lon):
+        return int(lon // self.cell), int(lat // self.cell)
+
+    def load_geojson(self, path):
+        with open(path, encoding="utf-8") as f:
+            features = json.load(f).get("features", [])
+
+        shapes, grid = [], {}
+        for feature in features:
+            geometry = feature.get("geometry") or {}
+            if geometry.get("type") == "Polygon":
+                polygons = [geometry["coordinates"]]
+            elif geometry.get("type") == "MultiPolygon":
+                polygons = geometry["coordinates"]
+            else:
+                continue
+            props = feature.get("properties") or {}
+            xs = [p[0] for polygon in polygons for p in polygon[0]]
+            ys = [p[1] for polygon in polygons for p in polygon[0]]
+            bbox = (min(xs), min(ys), max(xs), max(ys))
+            index = len(shapes)
+            shapes.append((_first_property(props, NAME_KEYS), _first_property(props, STATE_KEYS), bbox, polygons))
+            for ix in range(int(bbox[0] // self.cell), int(bbox[2] // self.cell) + 1):
+                for iy in range(int(bbox[1] // self.cell), int(bbox[3] // self.cell) + 1):
+                    grid.setdefault((ix, iy), []).append(index)
+
+        self._shapes, self._grid, self.mode = shapes, grid, "polygons"
+        return len(shapes)
+
+    def load_centroids(self, rows):
+        centroids, grid = [], {}
+        for row in rows:
+            if row['latitude'] is None or row['longitude'] is None:
+                continue
+            index = len(centroids)
+            centroids.append((row['constituency'], row['state'], row['latitude'], row['longitude']))
+            grid.setdefault(self._cell(row['latitude'], row['longitude']), []).append(index)
+        self._centroids, self._grid, self.mode = centroids, grid, "centroids"
+        return len(centroids)
+
+    def load(self):
+        """Boundaries if available, else pincode centroids. Returns the number of constituencies indexed."""
+        if os.path.exists(CONSTITUENCY_GEOJSON):
+            try:
+                count = self.load_geojson(CONSTITUENCY_GEOJSON)
+                print(f"Constituency locator: {count} boundaries from {CONSTITUENCY_GEOJSON}")
+                return count
+            except Exception as e:
+                print(f"Could not load {CONSTITUENCY_GEOJSON}: {e}")
+        count = self.load_centroids(get_constituency_centroids())
+        print(f"Constituency locator: {count} centroids from pincodes")
+        return count
+
+    def locate(self, lat, lon):
+        """Returns (constituency, state) or None."""
+        if self.mode == "polygons":
+            for index in self._grid.get(self._cell(lat, lon), []):
+                name, state, bbox, polygons = self._shapes[index]
+                if bbox[0] <= lon <= bbox[2] and bbox[1] <= lat <= bbox[3]:
+                    if any(_point_in_polygon(lon, lat, polygon) for polygon in polygons):
+                        return name, state
+            return None
+
+        if self.mode == "centroids":
+            # Search outward ring by ring; stop once the ring is farther than the best hit
+            ix, iy = self._cell(lat, lon)
+            best, best_dist = None, CENTROID_MAX_DEGREES ** 2
+            max_rings = int(CENTROID_MAX_DEGREES // self.cell) + 1
+            for ring in range(max_rings + 1):
+                if best is not None and ((ring - 1) * self.cell) ** 2 > best_dist:
+                    break
+                for dx in range(-ring, ring + 1):
+                    for dy in range(-ring, ring + 1):
+                        if max(abs(dx), abs(dy)) != ring:
+                            continue
+                        for index in self._grid.get((ix + dx, iy + dy), []):
+                            name, state, clat, clon = self._centroids[index]
+                            dist = (clat - lat) ** 2 + (clon - lon) ** 2
+                            if dist < best_dist:
+                                best, best_dist = (name, state), dist
+            return best
+        return None
+
+constituency_locator = ConstituencyLocator()
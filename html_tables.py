@@ -0,0 +1,141 @@
+import io
+import re
+from lxml import etree
+
+# --- HTML Table Parsing ---
+# Streaming table reader for scraped pages (ingest_mps_wiki). lxml's C parser walks
+# the document once with iterparse; each table is handed out with the text of the
+# heading that precedes it, then cleared so memory stays flat on long list pages.
+# Rows come out as a grid: a cell with rowspan/colspan is repeated into every
+# position it covers, so column indexes stay aligned with the header row.
+
+HEADING_TAGS = ("h2", "h3", "h4")
+MAX_SPAN = 1000  # Guard against absurd span attributes
+_WS_RE = re.compile(r"\s+")
+
+def _is_skipped(el):
+    # Footnote markers, inline styles/scripts, sort keys and hidden spans aren't cell text
+    if not isinstance(el.tag, str):
+        return True  # Comments, processing instructions
+    if el.tag in ("style", "script"):
+        return True
+    classes = el.get("class") or ""
+    if el.tag == "sup" and "reference" in classes:
+        return True
+    if "sortkey" in classes or "mw-editsection" in classes:
+        return True
+    return "display:none" in (el.get("style") or "").replace(" ", "")
+
+def _collect_text(el, out):
+    if el.text:
+        out.append(el.text)
+    for child in el:
+        if not _is_skipped(child):
+            if child.tag == "br":
+                out.append(" ")
+            _collect_text(child, out)
+        if child.tail:
+            out.append(child.tail)
+
+def cell_text(el):
+    """Visible text of an element, whitespace collapsed."""
+    out = []
+    _collect_text(el, out)
+    return _WS_RE.sub(" ", "".join(out)).strip()
+
+def cell_link(el):
+    """href of the first link in an element, ignoring footnote anchors and red links."""
+    for a in el.iter("a"):
+        href = a.get("href")
+        if href and not href.startswith("#") and "new" not in (a.get("class") or "").split():
+            return href
+    return None
+
+def _span(value):
+    if value is None:
+        return 1
+    try:
+        return min(max(int(value), 1), MAX_SPAN)
+    except (TypeError, ValueError):
+        return 1  # Missing, malformed, or 0 ("to the end of the section")
+
+def _has_class(el, names):
+    classes = (el.get("class") or "").split()
+    return any(name in classes for name in names)
+
+def _table_rows(table):
+    # Own rows only (a nested table's rows belong to it), through any row groups
+    for child in table:
+        if child.tag == "tr":
+            yield child
+        elif child.tag in ("thead", "tbody", "tfoot"):
+            yield from (row for row in child if row.tag == "tr")
+
+def iter_rows(table, links=False):
+    """
+    Yields (cells, is_header) for each row of `table`, with rowspan/colspan expanded.
+    is_header is True when the row has only <th> cells (row headers don't count).
+    With links=True each cell is (text, href of its first link or None).
+    """
+    empty = ("", None) if links else ""
+    carried = {}  # column -> (rows still covered, text) from spans in earlier rows
+    for tr in _table_rows(table):
+        cells = [cell for cell in tr if cell.tag in ("th", "td")]
+        row, below, col = [], {}, 0
+
+        def take_carried():
+            nonlocal col
+            remaining, value = carried[col]
+            row.append(value)
+            if remaining > 1:
+                below[col] = (remaining - 1, value)
+            col += 1
+
+        for cell in cells:
+            while col in carried:
+                take_carried()
+            value = (cell_text(cell), cell_link(cell)) if links else cell_text(cell)
+            rowspan = _span(cell.get("rowspan"))
+            for _ in range(_span(cell.get("colspan"))):
+                row.append(value)
+                if rowspan > 1:
+                    below[col] = (rowspan - 1, value)
+                col += 1
+        # Spans from above that sit after this row's last cell
+        for column in sorted(c for c in carried if c >= col):
+            row.extend([empty] * (column - col))
+            col = column
+            take_carried()
+
+        carried = below
+        if row:
+            yield row, bool(cells) and all(cell.tag == "th" for cell in cells)
+
+def heading_text(el):
+    # Current markup: <div class="mw-heading"><h2>State</h2><span class="mw-editsection">;
+    # older pages wrap the title in <span class="mw-headline"> inside the heading
+    headline = el.find(".//span[@class='mw-headline']")
+    return cell_text(headline if headline is not None else el).replace("[edit]", "").strip()
+
+def iter_tables(html, classes=("wikitable",)):
+    """
+    Yields (heading, table) for every <table> with one of `classes`, in document
+    order. heading is the text of the nearest preceding h2-h4 ("" if none).
+    Consume the table (e.g. with iter_rows) before advancing: it is cleared afterwards.
+    """
+    if isinstance(html, str):
+        html = html.encode("utf-8")
+    heading = ""
+    for _, el in etree.iterparse(io.BytesIO(html), events=("end",), tag=("table",) + HEADING_TAGS,
+                                 html=True, recover=True, encoding="utf-8"):
+        if el.tag in HEADING_TAGS:
+            heading = heading_text(el)
+            continue
+        if _has_class(el, classes):
+            yield heading, el
+        if next(el.iterancestors("table"), None) is None:
+            # Done with this top-level table: free it and everything before it
+            el.clear(keep_tail=True)
+            parent = el.getparent()
+            while parent is not None and el.getprevious() is not None:
+                del parent[0]
@@ -1,158 +1,288 @@
+import re
+import sys
+import time
+from urllib.parse import urljoin
 import requests
-from bs4 import BeautifulSoup
 import os
-import psycopg2
 from dotenv import load_dotenv
+from database import get_db_connection, bump_data_version
+from html_tables import iter_tables, iter_rows
 
-# Load env to get DATABASE_URL
+# Load env to get DATABASE_URL (SQLite is used when it isn't set)
 load_dotenv()
-DATABASE_URL = os.getenv("DATABASE_URL")
 
-if not DATABASE_URL:
-    print("Error: DATABASE_URL not found in .env")
-    exit(1)
+# Re-runs are change-aware (see sync_from_wikipedia): the page's ETag, Last-Modified
+# and revision ID are kept in ingest_sources, the page is fetched conditionally, and
+# when it did change only the differing rows are written.
+#
+#   python ingest_mps_wiki.py          # conditional sync (also runs as a scheduled job)
+#   python ingest_mps_wiki.py --full   # unconditional fetch and upsert of every row
+#
+# Either way the MPs' own articles are then crawled for bio, photo and years in
+# office (enrich_mps.py); --no-enrich skips that stage.
 
-def get_db_connection():
-    return psycopg2.connect(DATABASE_URL)
+LOK_SABHA_URL = os.getenv("WIKI_LOK_SABHA_URL", "https://en.wikipedia.org/wiki/List_of_members_of_the_18th_Lok_Sabha")
+SOURCE_NAME = "wiki_lok_sabha_18"
+REQUEST_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+MP_ROLE = "MP (Lok Sabha)"
+MP_BIO = "Member of the 18th Lok Sabha"
+# A scrape that would delete more than this share of the ingested MPs is more likely
+# a changed page layout than a changed House; deletes are skipped (and logged) then.
+SYNC_MAX_DELETE_FRACTION = float(os.getenv("WIKI_SYNC_MAX_DELETE_FRACTION", 0.1))
+_REVISION_RE = re.compile(r'"wgRevisionId"\s*:\s*(\d+)')
 
 def scrape_wikipedia():
-    url = "https://en.wikipedia.org/wiki/List_of_members_of_the_18th_Lok_Sabha"
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-    }
-    
-    print(f"Fetching {url}...")
-    response = requests.get(url, headers=headers)
+    print(f"Fetching {LOK_SABHA_URL}...")
+    response = requests.get(LOK_SABHA_URL, headers=REQUEST_HEADERS, timeout=30)
     if response.status_code != 200:
         print(f"Failed to fetch page: {response.status_code}")
         return []
+    return parse_members(response.text)
 
-    soup = BeautifulSoup(response.text, 'html.parser')
-    
-    mps = []
-    
-    # The page usually separates MPs by state in headers (h2 or h3) followed by a table
-    # Or one giant table. 
-    # Current structure of "List of members of the 18th Lok Sabha":
-    # It lists states sections and then tables.
-    
-    # Let's find all tables with class 'wikitable'
-    tables = soup.find_all('table', {'class': 'wikitable'})
-    
-    print(f"Found {len(tables)} tables.")
-    
-    for table in tables:
-        # Try to identify state from the preceding header
-        # This is heuristics based.
-        # Alternatively, sometimes the state is in the table or the table is just the list.
-        # On this specific page, tables usually correspond to states or "Nominated".
-        
-        # Iterating rows
-        rows = table.find_all('tr')
-        if not rows: 
-            continue
-            
-        # Check headers to see if it looks like an MP list
-        headers = [th.text.strip().lower() for th in rows[0].find_all('th')]
-        
-        # We look for "constituency", "name" or "member", "party"
-        has_constituency = any("constituency" in h for h in headers)
-        has_name = any("member" in h or "name" in h for h in headers)
-        
-        if not has_constituency or not has_name:
-            continue
-
-        # Map column indices
-        idx_const = -1
-        idx_name = -1
-        idx_party = -1
-        
-        for i, h in enumerate(headers):
-            if "constituency" in h: idx_const = i
-            elif "member" in h or "name" in h: idx_name = i
-            elif "party" in h: idx_party = i
-            
-        if idx_const == -1 or idx_name == -1:
-            continue
-            
-        # State inference: usually the heading before the table
-        state_name = "Unknown"
-        prev = table.find_previous(['h2', 'h3', 'h4'])
-        if prev:
-            state_name = prev.text.strip().replace('[edit]', '')
-
-        for row in rows[1:]:
-            cols = row.find_all(['td', 'th'])
-            # Sometimes 1st col is number, so we use mapped indices
-            # But indices from th might not match td if there are rowspans. 
-            # Wikipedia tables are tricky with rowspans (usually for Party or State).
-            # For 18th Lok Sabha page, usually simple tables per state.
-            
-            if len(cols) <= max(idx_const, idx_name, idx_party):
+def member_columns(headers):
+    """(constituency, name, party) column indexes from an MP list's header row, or None."""
+    idx_const = idx_name = idx_party = -1
+    # A header spanning several columns (e.g. Constituency: No. | Name) maps to its last one
+    for i, h in enumerate(h.lower() for h in headers):
+        if "constituency" in h: idx_const = i
+        elif "member" in h or "name" in h: idx_name = i
+        elif "party" in h: idx_party = i
+    if idx_const == -1 or idx_name == -1:
+        return None
+    return idx_const, idx_name, idx_party
+
+def iter_members(html):
+    """Yields an MP dict per row of every MP list table (one per state) on the page."""
+    for state_name, table in iter_tables(html, classes=("wikitable",)):
+        columns = None
+        for cells, is_header in iter_rows(table, links=True):
+            if is_header:
+                if columns is None:
+                    # First header row decides; a second one holds sub-headers
+                    columns = member_columns([text for text, _ in cells])
+                    if columns is None:
+                        break  # Not an MP list
                 continue
-                
-            try:
-                constituency = cols[idx_const].text.strip()
-                name = cols[idx_name].text.strip()
-                party = cols[idx_party].text.strip() if idx_party != -1 else "Unknown"
-                
-                # Cleanup
-                if "[" in name: name = name.split("[")[0]
-                if "[" in party: party = party.split("[")[0]
-                
-                mps.append({
-                    "name": name,
-                    "constituency": constituency,
-                    "party": party,
-                    "state": state_name,
-                    "role": "MP (Lok Sabha)"
-                })
-            except Exception as e:
-                # print(f"Skipping row: {e}")
-                pass
+            if columns is None:
+                break  # No header row to map columns from
+            idx_const, idx_name, idx_party = columns
+            if len(cells) <= max(columns):
+                continue
+            name, name_href = cells[idx_name]
+            name = name.split("[")[0].strip()
+            constituency = cells[idx_const][0].strip()
+            if not name or not constituency or name.lower().startswith("vacant"):
+                continue  # Vacant seats ("Vacant", "Vacant since ...") have no member
+            yield {
+                "name": name,
+                "constituency": constituency,
+                "party": cells[idx_party][0].split("[")[0].strip() if idx_party != -1 else "Unknown",
+                "state": state_name or "Unknown",
+                "role": MP_ROLE,
+                # The MP's own article (used by enrich_mps), when the name is linked
+                "wiki_url": urljoin(LOK_SABHA_URL, name_href) if name_href and "/wiki/" in name_href else None,
+            }
 
+def parse_members(html):
+    mps = list(iter_members(html))
     print(f"Scraped {len(mps)} MPs.")
     return mps
 
+def _upsert_mps(cursor, mps, is_postgres):
+    """
+    One upsert statement keyed on the unique (name, constituency). New MPs are
+    inserted with placeholder stats; for existing ones only the scraped party, state
+    and article link are refreshed, so curated fields (role, bio, image, news) survive.
+    Returns (inserted, changed) where changed counts inserted + updated rows.
+    """
+    # A key may appear only once per statement (Postgres refuses to update a row twice)
+    unique = {(mp['name'], mp['constituency']): mp for mp in mps}
+    rows = [
+        (mp['name'], mp['role'], mp['party'], mp['constituency'], mp['state'], mp.get('wiki_url'), MP_BIO, 0, 0.0, 5.0, 0)
+        for mp in unique.values()
+    ]
+    if not rows:
+        return 0, 0
+
+    if is_postgres:
+        # Whole list as a single page: one round trip. Rows the WHERE filters out
+        # (nothing changed) return nothing; xmax = 0 marks a fresh insert.
+        returned = cursor.execute_values("""
+            INSERT INTO representatives (name, role, party, constituency, state, wiki_url, bio, years_in_office, funds_spent_crores, funds_total_crores, attendance_percentage)
+            VALUES %s
+            ON CONFLICT (name, constituency) DO UPDATE SET
+                party = EXCLUDED.party, state = EXCLUDED.state,
+                wiki_url = COALESCE(EXCLUDED.wiki_url, representatives.wiki_url)
+            WHERE representatives.party IS DISTINCT FROM EXCLUDED.party
+               OR representatives.state IS DISTINCT FROM EXCLUDED.state
+               OR (EXCLUDED.wiki_url IS NOT NULL AND representatives.wiki_url IS DISTINCT FROM EXCLUDED.wiki_url)
+            RETURNING (xmax = 0) AS inserted
+        """, rows, page_size=len(rows), fetch=True)
+        return sum(1 for row in returned if row['inserted']), len(returned)
+
+    cursor.execute("SELECT COUNT(*) AS n FROM representatives")
+    before = cursor.fetchone()['n']
+    cursor.executemany("""
+        INSERT INTO representatives (name, role, party, constituency, state, wiki_url, bio, years_in_office, funds_spent_crores, funds_total_crores, attendance_percentage)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (name, constituency) DO UPDATE SET
+            party = excluded.party, state = excluded.state,
+            wiki_url = COALESCE(excluded.wiki_url, representatives.wiki_url)
+        WHERE representatives.party IS NOT excluded.party
+           OR representatives.state IS NOT excluded.state
+           OR (excluded.wiki_url IS NOT NULL AND representatives.wiki_url IS NOT excluded.wiki_url)
+    """, rows)
+    # rowcount sums inserted and updated rows; skipped upserts don't count
+    changed = cursor.rowcount
+    cursor.execute("SELECT COUNT(*) AS n FROM representatives")
+    return cursor.fetchone()['n'] - before, changed
+
 def ingest_data(mps):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    print("Inserting data into database...")
-    count = 0
-    for mp in mps:
-        try:
-            # Check if exists (by name and constituency)
-            cursor.execute("SELECT id FROM representatives WHERE name = %s AND constituency = %s", (mp['name'], mp['constituency']))
-            if cursor.fetchone():
-                continue
-                
-            cursor.execute("""
-                INSERT INTO representatives (name, role, party, constituency, state, bio, years_in_office, funds_spent_crores, funds_total_crores, attendance_percentage)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
-                mp['name'], 
-                mp['role'], 
-                mp['party'], 
-                mp['constituency'], 
-                mp['state'], 
-                "Member of the 18th Lok Sabha", 
-                0, 0.0, 5.0, 0
-            ))
-            count += 1
-        except Exception as e:
-            print(f"Error inserting {mp['name']}: {e}")
-            conn.rollback()
-    
-    conn.commit()
-    conn.close()
-    print(f"Inserted {count} new MPs.")
+    """Bulk upsert of the whole list in one statement. Returns {"inserted", "updated", "unchanged"}."""
+    is_postgres = os.getenv("DATABASE_URL") is not None
+    total = len({(mp['name'], mp['constituency']) for mp in mps})
+
+    print(f"Upserting {total} MPs...")
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        inserted, changed = _upsert_mps(cursor, mps, is_postgres)
+        conn.commit()
+
+    counts = {"inserted": inserted, "updated": changed - inserted, "unchanged": total - changed}
+    print(f"Inserted {counts['inserted']}, updated {counts['updated']}, unchanged {counts['unchanged']} MPs.")
+
+    if changed:
+        # Tell running servers to rebuild their representatives caches
+        bump_data_version("representatives")
+    return counts
+
+# --- Change-aware sync ---
+
+def diff_members(current, mps):
+    """
+    Row-level diff of the scraped list against current representatives rows.
+    Returns (changed MPs to upsert, ids of ingested MPs no longer listed, unchanged count).
+    Only rows this ingester owns (role MP_ROLE) are ever deleted.
+    """
+    existing = {(row['name'], row['constituency']): row for row in current}
+    scraped = {(mp['name'], mp['constituency']): mp for mp in mps}
+    changed = [
+        mp for key, mp in scraped.items()
+        if key not in existing
+        or (existing[key]['party'], existing[key]['state']) != (mp['party'], mp['state'])
+        or (mp.get('wiki_url') and existing[key]['wiki_url'] != mp['wiki_url'])
+    ]
+    stale = [row['id'] for key, row in existing.items() if row['role'] == MP_ROLE and key not in scraped]
+    return changed, stale, len(scraped) - len(changed)
+
+def sync_data(mps):
+    """Applies only the inserts, updates and deletes that bring the table in line with `mps`."""
+    is_postgres = os.getenv("DATABASE_URL") is not None
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, name, role, party, constituency, state, wiki_url FROM representatives")
+        changed, stale, unchanged = diff_members(cursor.fetchall(), mps)
+
+        owned = sum(1 for mp in mps if mp['role'] == MP_ROLE) + len(stale)
+        if stale and len(stale) > SYNC_MAX_DELETE_FRACTION * owned:
+            print(f"Refusing to delete {len(stale)} of {owned} MPs (over {SYNC_MAX_DELETE_FRACTION:.0%}); "
+                  f"check the parser. Applying inserts and updates only.")
+            stale = []
+
+        inserted, upserted = _upsert_mps(cursor, changed, is_postgres)
+        for i in range(0, len(stale), 500):
+            chunk = stale[i:i + 500]
+            cursor.execute(f"DELETE FROM representatives WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+        conn.commit()
+
+    counts = {"inserted": inserted, "updated": upserted - inserted, "deleted": len(stale),
+              "unchanged": unchanged + len(changed) - upserted}
+    print(f"Sync: inserted {counts['inserted']}, updated {counts['updated']}, "
+          f"deleted {counts['deleted']}, unchanged {counts['unchanged']} MPs.")
+    if upserted or stale:
+        bump_data_version("representatives")
+    return counts
+
+def get_source_state(source=SOURCE_NAME):
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT revision_id, etag, last_modified FROM ingest_sources WHERE source = ?", (source,))
+        row = cursor.fetchone()
+    return dict(row) if row else None
+
+def save_source_state(revision_id, etag, last_modified, changed, source=SOURCE_NAME):
+    now = time.time()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO ingest_sources (source, url, revision_id, etag, last_modified, checked_at, changed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (source) DO UPDATE SET
+                url = excluded.url, revision_id = excluded.revision_id, etag = excluded.etag,
+                last_modified = excluded.last_modified, checked_at = excluded.checked_at,
+                changed_at = COALESCE(excluded.changed_at, ingest_sources.changed_at)
+        ''', (source, LOK_SABHA_URL, revision_id, etag, last_modified, now, now if changed else None))
+        conn.commit()
+
+def fetch_if_changed(state):
+    """Conditional GET. Returns (html or None if not modified, {"revision_id", "etag", "last_modified"})."""
+    headers = dict(REQUEST_HEADERS)
+    if state and state['etag']:
+        headers["If-None-Match"] = state['etag']
+    if state and state['last_modified']:
+        headers["If-Modified-Since"] = state['last_modified']
+    response = requests.get(LOK_SABHA_URL, headers=headers, timeout=30)
+    if response.status_code == 304 and state:
+        return None, dict(state)
+    response.raise_for_status()
+    match = _REVISION_RE.search(response.text)
+    return response.text, {
+        "revision_id": int(match.group(1)) if match else None,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+
+def sync_from_wikipedia():
+    """
+    Conditional re-ingestion: nothing is parsed or written unless the page has a
+    new revision. Returns a status dict ("not_modified", "same_revision" or "synced"
+    with the row counts). Source state is saved only after a successful apply.
+    """
+    state = get_source_state()
+    print(f"Checking {LOK_SABHA_URL} for changes...")
+    html, meta = fetch_if_changed(state)
+    if html is None:
+        save_source_state(meta['revision_id'], meta['etag'], meta['last_modified'], changed=False)
+        print("Page not modified.")
+        return {"status": "not_modified"}
+    if state and meta['revision_id'] and meta['revision_id'] == state['revision_id']:
+        # Re-rendered (new ETag) but the same revision: the list can't have changed
+        save_source_state(meta['revision_id'], meta['etag'], meta['last_modified'], changed=False)
+        print(f"Revision {meta['revision_id']} already ingested.")
+        return {"status": "same_revision"}
+
+    mps = parse_members(html)
+    if not mps:
+        print("No MPs parsed; leaving the table and source state untouched.")
+        return {"status": "empty"}
+    counts = sync_data(mps)
+    save_source_state(meta['revision_id'], meta['etag'], meta['last_modified'], changed=True)
+    return {"status": "synced", "revision_id": meta['revision_id'], **counts}
 
 if __name__ == "__main__":
     from database import init_db
     print("Initializing Database Schema...")
     init_db()
     
-    data = scrape_wikipedia()
-    if data:
-        ingest_data(data)
+    if "--full" in sys.argv:
+        data = scrape_wikipedia()
+        if data:
+            ingest_data(data)
+    else:
+        sync_from_wikipedia()
+
+    if "--no-enrich" not in sys.argv:
+        from enrich_mps import enrich_representatives
+        enrich_representatives()
@@ -0,0 +1,141 @@
+import csv
+import os
+import sys
+from collections import Counter, defaultdict
+from dotenv import load_dotenv
+from database import init_db, get_db_connection
+
+# Loads a PIN code directory CSV (e.g. the India Post "All India Pincode Directory")
+# into the pincodes table so /api/representatives?search=NNNNNN needs no geocoder.
+#
+#   python ingest_pincodes.py pincodes.csv [constituency_map.csv]
+#
+# The India Post file has one row per post office (pincode, district, statename,
+# latitude, longitude, ...). It has no Lok Sabha constituency, so that comes from
+# (in order): a `constituency` column in the main CSV, an optional second CSV
+# mapping district,state -> constituency, or a district name that matches a
+# constituency in the representatives table.
+
+load_dotenv()
+
+# Accepted header spellings -> our column
+HEADER_ALIASES = {
+    "pincode": "pincode", "pin": "pincode", "pin_code": "pincode",
+    "district": "district", "districtname": "district",
+    "statename": "state", "state": "state", "state_name": "state",
+    "constituency": "constituency", "pc_name": "constituency", "lok_sabha_constituency": "constituency",
+    "latitude": "latitude", "lat": "latitude",
+    "longitude": "longitude", "lon": "longitude", "long": "longitude",
+}
+
+def _clean(value):
+    value = (value or "").strip()
+    return "" if value.upper() in ("NA", "N/A", "NULL") else value
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for raw in csv.DictReader(f):
+            row = {}
+            for key, value in raw.items():
+                column = HEADER_ALIASES.get((key or "").strip().lower())
+                if column:
+                    row[column] = _clean(value)
+            yield row
+
+def read_rows(path):
+    for row in read_csv(path):
+        if row.get("pincode", "").isdigit() and len(row["pincode"]) == 6:
+            yield row
+
+def load_constituency_map(path):
+    mapping = {}
+    for row in read_csv(path):
+        district = row.get("district", "").lower()
+        state = row.get("state", "").lower()
+        if district and row.get("constituency"):
+            mapping[(district, state)] = row["constituency"]
+            mapping.setdefault((district, ""), row["constituency"])
+    return mapping
+
+def aggregate(rows):
+    """Collapses post-office rows to one row per PIN (most common district/state, mean coordinates)."""
+    by_pin = defaultdict(list)
+    for row in rows:
+        by_pin[row["pincode"]].append(row)
+
+    for pincode, offices in by_pin.items():
+        district = Counter(o.get("district", "") for o in offices).most_common(1)[0][0]
+        state = Counter(o.get("state", "") for o in offices).most_common(1)[0][0]
+        constituencies = [o["constituency"] for o in offices if o.get("constituency")]
+        coords = [(_to_float(o.get("latitude")), _to_float(o.get("longitude"))) for o in offices]
+        coords = [(lat, lon) for lat, lon in coords if lat is not None and lon is not None]
+        yield {
+            "pincode": pincode,
+            "district": district.title(),
+            "state": state.title(),
+            "constituency": Counter(constituencies).most_common(1)[0][0] if constituencies else None,
+            "latitude": sum(c[0] for c in coords) / len(coords) if coords else None,
+            "longitude": sum(c[1] for c in coords) / len(coords) if coords else None,
+        }
+
+def resolve_constituencies(pins, constituency_map):
+    # Canonical constituency names as stored in representatives, so the lookup is an exact match
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT DISTINCT constituency FROM representatives WHERE constituency IS NOT NULL")
+        known = {row['constituency'].strip().lower(): row['constituency'] for row in cursor.fetchall()}
+
+    unresolved = 0
+    for pin in pins:
+        name = pin["constituency"]
+        if not name:
+            key = pin["district"].lower()
+            name = constituency_map.get((key, pin["state"].lower())) or constituency_map.get((key, "")) or key
+        pin["constituency"] = known.get((name or "").strip().lower())
+        if not pin["constituency"]:
+            unresolved += 1
+    return unresolved
+
+def ingest_pincodes(pins):
+    is_postgres = os.getenv("DATABASE_URL") is not None
+    rows = [(p["pincode"], p["district"], p["state"], p["constituency"], p["latitude"], p["longitude"]) for p in pins]
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        if is_postgres:
+            cursor.execute_values("""
+                INSERT INTO pincodes (pincode, district, state, constituency, latitude, longitude) VALUES %s
+                ON CONFLICT (pincode) DO UPDATE SET
+                    district = EXCLUDED.district, state = EXCLUDED.state, constituency = EXCLUDED.constituency,
+                    latitude = EXCLUDED.latitude, longitude = EXCLUDED.longitude
+            """, rows, page_size=1000)
+        else:
+            cursor.executemany("""
+                INSERT INTO pincodes (pincode, district, state, constituency, latitude, longitude) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (pincode) DO UPDATE SET
+                    district = excluded.district, state = excluded.state, constituency = excluded.constituency,
+                    latitude = excluded.latitude, longitude = excluded.longitude
+            """, rows)
+        conn.commit()
+    return len(rows)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python ingest_pincodes.py pincodes.csv [constituency_map.csv]")
+        sys.exit(1)
+
+    print("Initializing Database Schema...")
+    init_db()
+
+    constituency_map = load_constituency_map(sys.argv[2]) if len(sys.argv) > 2 else {}
+    pins = list(aggregate(read_rows(sys.argv[1])))
+    print(f"Read {len(pins)} PIN codes.")
+    unresolved = resolve_constituencies(pins, constituency_map)
+    count = ingest_pincodes(pins)
+    print(f"Loaded {count} PIN codes ({unresolved} without a matching constituency; those fall back to live geocoding).")
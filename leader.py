@@ -0,0 +1,134 @@
+import asyncio
+import os
+import psycopg2
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, every process leads (fine for local runs)
+    fcntl = None
+
+# --- Scheduler Leader Election ---
+# Every worker runs the app's lifespan, but scheduled jobs (the daily report, the Lok
+# Sabha sync) must run once per deployment, not once per process. Workers compete
+# for a lock that the OS or database drops as soon as its holder dies: a session
+# advisory lock on a dedicated Postgres connection, or an exclusive flock on a file
+# next to the SQLite database. The holder runs the scheduler; the others retry
+# every LEADER_CHECK_SECONDS and take over if the leader goes away. The leader
+# re-checks its lock on the same interval and pauses its jobs if it lost it.
+
+LEADER_LOCK_ID = 7316002  # Postgres advisory lock key (migrations use 7316001)
+LEADER_CHECK_SECONDS = float(os.getenv("LEADER_CHECK_SECONDS", 15))
+SCHEDULER_LOCK_FILE = os.getenv("SCHEDULER_LOCK_FILE", "citizenconnect.scheduler.lock")
+
+class PostgresLeaderLock:
+    def __init__(self, db_url, lock_id=LEADER_LOCK_ID):
+        self.db_url = db_url
+        self.lock_id = lock_id
+        self._conn = None
+
+    def try_acquire(self):
+        try:
+            if self._conn is None:
+                # Not pooled: the lock lives exactly as long as this session.
+                # Keepalives make a dead network show up as a failed check.
+                self._conn = psycopg2.connect(self.db_url, connect_timeout=10, keepalives=1,
+                                              keepalives_idle=30, keepalives_interval=10, keepalives_count=3)
+                self._conn.autocommit = True
+            with self._conn.cursor() as cur:
+                cur.execute("SELECT pg_try_advisory_lock(%s)", (self.lock_id,))
+                return cur.fetchone()[0]
+        except psycopg2.Error as e:
+            print(f"Leader election: Postgres lock unavailable ({e})")
+            self.release()
+            return False
+
+    def is_held(self):
+        if self._conn is None or self._conn.closed:
+            return False
+        try:
+            with self._conn.cursor() as cur:
+                cur.execute("""
+                    SELECT 1 FROM pg_locks
+                    WHERE locktype = 'advisory' AND pid = pg_backend_pid() AND objid = %s AND granted
+                """, (self.lock_id,))
+                return cur.fetchone() is not None
+        except psycopg2.Error:
+            return False
+
+    def release(self):
+        # Closing the session drops the lock
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except psycopg2.Error:
+                pass
+            self._conn = None
+
+class FileLeaderLock:
+    def __init__(self, path=SCHEDULER_LOCK_FILE):
+        self.path = path
+        self._fd = None
+
+    def try_acquire(self):
+        if fcntl is None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def is_held(self):
+        # flock is tied to the open file; only closing it (or exiting) gives it up
+        return fcntl is None or self._fd is not None
+
+    def release(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+class SchedulerLeader:
+    def __init__(self, lock=None):
+        if lock is None:
+            db_url = os.getenv("DATABASE_URL")
+            lock = PostgresLeaderLock(db_url) if db_url else FileLeaderLock()
+        self.lock = lock
+        self.is_leader = False
+        self.stats = {"elections_won": 0, "leadership_lost": 0}
+
+    def _check(self):
+        if self.is_leader:
+            if self.lock.is_held():
+                return True
+            self.lock.release()  # Start the next campaign from a fresh session
+        return self.lock.try_acquire()
+
+    async def run(self, on_elected, on_lost):
+        """Campaigns until cancelled, calling on_elected/on_lost on the event loop."""
+        try:
+            while True:
+                held = await asyncio.to_thread(self._check)
+                if held and not self.is_leader:
+                    self.is_leader = True
+                    self.stats["elections_won"] += 1
+                    print(f"Leader election: process {os.getpid()} runs the scheduled jobs.")
+                    on_elected()
+                elif not held and self.is_leader:
+                    self.is_leader = False
+                    self.stats["leadership_lost"] += 1
+                    print(f"Leader election: process {os.getpid()} lost the lock; pausing scheduled jobs.")
+                    on_lost()
+                await asyncio.sleep(LEADER_CHECK_SECONDS)
+        finally:
+            if self.is_leader:
+                self.is_leader = False
+                on_lost()
+            self.lock.release()
+
+    def get_stats(self):
+        return {"is_leader": self.is_leader, "pid": os.getpid(), "lock": type(self.lock).__name__, **self.stats}
+
+scheduler_leader = SchedulerLeader()
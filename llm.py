@@ -0,0 +1,90 @@
+import asyncio
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from security_utils import get_secret
+
+# --- Model Call Limiter ---
+# Caps in-flight Gemini calls per worker so a burst of chats queues here instead of
+# piling onto the API (and into 429s). Time spent waiting for a slot is tracked
+# separately from the model's own latency.
+
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", 4))
+
+class ModelCallLimiter:
+    def __init__(self, max_concurrency=GEMINI_MAX_CONCURRENCY):
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self.stats = {
+            "calls": 0,
+            "failures": 0,
+            "queue_wait_seconds_total": 0.0,
+            "queue_wait_seconds_max": 0.0,
+            "model_seconds_total": 0.0,
+            "model_seconds_max": 0.0,
+        }
+
+    @asynccontextmanager
+    async def slot(self):
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        started_at = time.perf_counter()
+        wait = started_at - queued_at
+        self.stats["queue_wait_seconds_total"] += wait
+        self.stats["queue_wait_seconds_max"] = max(self.stats["queue_wait_seconds_max"], wait)
+        self.in_flight += 1
+        try:
+            yield
+        except Exception:
+            self.stats["failures"] += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+            latency = time.perf_counter() - started_at
+            self.stats["calls"] += 1
+            self.stats["model_seconds_total"] += latency
+            self.stats["model_seconds_max"] = max(self.stats["model_seconds_max"], latency)
+
+    def get_stats(self):
+        stats = {k: round(v, 4) if isinstance(v, float) else v for k, v in self.stats.items()}
+        stats["in_flight"] = self.in_flight
+        stats["waiting"] = self.waiting
+        stats["max_concurrency"] = self.max_concurrency
+        if stats["calls"]:
+            stats["queue_wait_seconds_avg"] = round(self.stats["queue_wait_seconds_total"] / stats["calls"], 4)
+            stats["model_seconds_avg"] = round(self.stats["model_seconds_total"] / stats["calls"], 4)
+        return stats
+
+gemini_limiter = ModelCallLimiter()
+
+# --- Gemini Client ---
+# google.genai takes about half a second to import, so it is loaded and the client
+# built on first use (or by the startup warm-up) rather than when main is imported.
+
+_client = None
+_client_loaded = False
+_client_lock = threading.Lock()
+
+def get_genai_client():
+    """The shared google-genai client; None if GOOGLE_API_KEY is missing or the client can't be built."""
+    global _client, _client_loaded
+    if not _client_loaded:
+        with _client_lock:
+            if not _client_loaded:
+                api_key = get_secret("GOOGLE_API_KEY")
+                if api_key:
+                    try:
+                        from google import genai
+                        _client = genai.Client(api_key=api_key)
+                    except Exception as e:
+                        print(f"Error initializing Gemini Client: {e}")
+                _client_loaded = True
+    return _client
@@ -0,0 +1,105 @@
+import asyncio
+import os
+import re
+import time
+from collections import OrderedDict
+from database import get_cached_local_reps, save_cached_local_reps
+
+# --- Local Representatives Cache ---
+# MLA/Councillor answers come from a Gemini call and only change at elections, so
+# they are kept per normalised "district, state" in memory and in local_reps_cache.
+# Past LOCAL_REPS_TTL an entry is stale: it is still served, and one background
+# refresh is started. Concurrent misses for the same place share a single model call.
+# The memory tier is an LRU of the most recently asked-for places; the table keeps
+# the rest.
+
+LOCAL_REPS_TTL = float(os.getenv("LOCAL_REPS_TTL", 30 * 24 * 3600))
+LOCAL_REPS_MEMORY_MAX = int(os.getenv("LOCAL_REPS_MEMORY_MAX", 5000))
+
+def normalize_location(location_str):
+    text = re.sub(r"\bdistrict\b", " ", (location_str or "").lower())
+    parts = [" ".join(re.sub(r"[^\w\s]", " ", part).split()) for part in text.split(",")]
+    return ", ".join(part for part in parts if part)
+
+class LocalRepsCache:
+    def __init__(self, ttl=LOCAL_REPS_TTL, max_size=LOCAL_REPS_MEMORY_MAX):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()  # key -> (data, fetched_at), least recently used first
+        self._inflight = {}  # key -> asyncio.Task
+        self.stats = {"hits": 0, "db_hits": 0, "misses": 0, "stale_served": 0, "refreshes": 0, "coalesced": 0, "fetch_failures": 0}
+
+    async def get(self, location_str, fetch):
+        """fetch: coroutine function(location_str) -> dict or None (the model call)."""
+        key = normalize_location(location_str)
+        if not key:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is None:
+            try:
+                row = await asyncio.to_thread(get_cached_local_reps, key)
+            except Exception as e:
+                print(f"Local reps cache read error: {e}")
+                row = None
+            if row:
+                entry = (row['data'], row['fetched_at'])
+                self._remember(key, entry)
+                self.stats["db_hits"] += 1
+        else:
+            self._entries.move_to_end(key)
+            if time.time() - entry[1] <= self.ttl:
+                self.stats["hits"] += 1
+
+        if entry is not None:
+            if time.time() - entry[1] > self.ttl:
+                # Stale-while-revalidate
+                self.stats["stale_served"] += 1
+                if key not in self._inflight:
+                    self.stats["refreshes"] += 1
+                    self._start_fetch(key, location_str, fetch)
+            return entry[0]
+
+        self.stats["misses"] += 1
+        if key in self._inflight:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(self._inflight[key])
+        return await asyncio.shield(self._start_fetch(key, location_str, fetch))
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _start_fetch(self, key, location_str, fetch):
+        task = asyncio.create_task(self._fetch_and_store(key, location_str, fetch))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    async def _fetch_and_store(self, key, location_str, fetch):
+        try:
+            data = await fetch(location_str)
+        except Exception as e:
+            print(f"Local reps fetch error: {e}")
+            data = None
+        if not data:
+            self.stats["fetch_failures"] += 1
+            return None
+        fetched_at = time.time()
+        self._remember(key, (data, fetched_at))
+        try:
+            await asyncio.to_thread(save_cached_local_reps, key, data, fetched_at)
+        except Exception as e:
+            print(f"Local reps cache write error: {e}")
+        return data
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats["size"] = len(self._entries)
+        stats["max_size"] = self.max_size
+        stats["inflight"] = len(self._inflight)
+        return stats
+
+local_reps_cache = LocalRepsCache()
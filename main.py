@@ -1,40 +1,38 @@
 import os
-import uvicorn
-import requests
+import asyncio
+import functools
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException, Request, Depends, status
+from fastapi import FastAPI, HTTPException, Request, Depends, status, BackgroundTasks
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse, Response
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from pydantic import BaseModel
 from typing import Optional, List
-from google import genai
-from apscheduler.schedulers.background import BackgroundScheduler
 from database import (
-    get_all_representatives, 
-    get_representative_by_location, 
+    get_representatives_by_pincode,
     save_chat_interaction, 
     update_chat_rating, 
     get_high_quality_chats,
-    create_session,
-    update_session_heartbeat,
-    log_analytics_event,
     get_daily_stats,
     get_advanced_stats,
-    get_recent_chats
+    get_recent_chats,
+    update_representative,
+    DuplicateRepresentative
 )
 from email_service import send_daily_report
+from analytics import session_tracker, event_pipeline
+from geo import ip_location_cache, constituency_locator, get_geolocator
+from rep_context import rep_context
+from chat_cache import chat_cache
+from llm import gemini_limiter, get_genai_client
+from local_reps import local_reps_cache
+from search import search_representatives
+from startup import startup_report
+from leader import scheduler_leader
 from security_utils import get_secret
 from dotenv import load_dotenv
 import json
-import bcrypt
 import secrets
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
-
-# --- Scheduler ---
-scheduler = BackgroundScheduler()
-
-# --- Config ---
 
 # --- Config ---
 load_dotenv()
@@ -42,62 +40,80 @@ GOOGLE_API_KEY = get_secret("GOOGLE_API_KEY")
 
 if not GOOGLE_API_KEY:
     print("CRITICAL WARNING: GOOGLE_API_KEY is not set. Chatbot will fail.")
-    client = None
-else:
-    try:
-        client = genai.Client(api_key=GOOGLE_API_KEY)
-    except Exception as e:
-        print(f"Error initializing Gemini Client: {e}")
-        client = None
 
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from email_service import send_daily_report
-from geopy.geocoders import Nominatim
-from database import get_db_connection
+# Heavy clients (google.genai, geopy, apscheduler, bcrypt, tenacity) are imported on
+# first use through the providers below and in llm.py / geo.py, keeping worker
+# spawn fast. benchmarks/bench_import.py guards this.
 
-# Initialize Scheduler
-scheduler = AsyncIOScheduler()
-geolocator = Nominatim(user_agent="citizen_connect_app")
+from database import get_db_connection, get_pool_stats, close_pool
 
-# Global Context
-MP_CONTEXT = ""
+@functools.lru_cache(maxsize=None)
+def get_scheduler():
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+    return AsyncIOScheduler()
 
-def load_mp_context():
-    global MP_CONTEXT
+# Lok Sabha list re-sync; conditional, so an unchanged page costs one request (0 disables)
+WIKI_SYNC_HOURS = float(os.getenv("WIKI_SYNC_HOURS", 24))
+
+def sync_lok_sabha_members():
+    # Runs in the scheduler's thread pool; imported here to keep requests/httpx/lxml off the import path
+    from ingest_mps_wiki import sync_from_wikipedia
+    from enrich_mps import enrich_representatives
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute("SELECT name, constituency, state, party FROM representatives")
-        mps = cur.fetchall()
-        
-        context_list = []
-        for mp in mps:
-            context_list.append(f"{mp['name']} ({mp['party']}) - {mp['constituency']}, {mp['state']}")
-            
-        MP_CONTEXT = "List of 18th Lok Sabha MPs:\n" + "\n".join(context_list)
-        print(f"Loaded {len(mps)} MPs into context.")
-        conn.close()
+        print(f"Lok Sabha sync: {sync_from_wikipedia()}")
+        # Articles change independently of the list; unchanged revisions come from the disk cache
+        enrich_representatives()
     except Exception as e:
-        print(f"Error loading MP context: {e}")
+        print(f"Lok Sabha sync failed: {e}")
+
+def start_scheduled_jobs():
+    # This process won the scheduler lock (see leader.py)
+    scheduler = get_scheduler()
+    if scheduler.running:
+        scheduler.resume()
+        return
+    # Schedule Daily Report at 8:45 AM IST (03:15 UTC) [TEMPORARY FOR TODAY]
+    # IST is UTC+5:30. 8:45 AM IST = 03:15 AM UTC.
+    scheduler.add_job(send_daily_report, 'cron', hour=3, minute=15)
+    if WIKI_SYNC_HOURS > 0:
+        scheduler.add_job(sync_lok_sabha_members, 'interval', hours=WIKI_SYNC_HOURS, jitter=600)
+    scheduler.start()
+    print("Scheduler started. Daily email set for 03:15 UTC (8:45 AM IST).")
+
+def pause_scheduled_jobs():
+    scheduler = get_scheduler()
+    if scheduler.running:
+        scheduler.pause()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     try:
-        init_db()
-        load_mp_context()
-        
-        # Schedule Daily Report at 8:45 AM IST (03:15 UTC) [TEMPORARY FOR TODAY]
-        # IST is UTC+5:30. 8:45 AM IST = 03:15 AM UTC.
-        scheduler.add_job(send_daily_report, 'cron', hour=3, minute=15)
-        scheduler.start()
-        print("Scheduler started. Daily email set for 03:15 UTC (8:45 AM IST).")
-        
+        with startup_report.phase("init_db"):
+            for name, ms in init_db().items():
+                startup_report.record(f"init_db.{name}", ms)
     except Exception as e:
         print(f"Startup Error: {e}")
+
+    # Only the worker holding the scheduler lock runs the jobs; the rest stand by
+    leader_task = asyncio.create_task(scheduler_leader.run(start_scheduled_jobs, pause_scheduled_jobs))
+
+    heartbeat_task = asyncio.create_task(session_tracker.run())
+    event_task = asyncio.create_task(event_pipeline.run())
+    reps_watch_task = asyncio.create_task(rep_context.watch())
+    # Representatives context, locator and search lexicon build while requests are served
+    warm_task = asyncio.create_task(startup_report.warm_caches())
+    startup_report.mark_ready()
     yield
     # Shutdown
-    # (Optional: close connections if needed, though usually handled per request)
+    warm_task.cancel()
+    leader_task.cancel()
+    heartbeat_task.cancel()
+    event_task.cancel()
+    reps_watch_task.cancel()
+    session_tracker.flush()
+    event_pipeline.flush()
+    close_pool()
 
 app = FastAPI(lifespan=lifespan)
 security = HTTPBasic()
@@ -116,6 +132,7 @@ def verify_admin(credentials: HTTPBasicCredentials = Depends(security)):
     # Verify password against hash
     is_correct_password = False
     try:
+        import bcrypt
         if bcrypt.checkpw(credentials.password.encode('utf-8'), stored_hash.encode('utf-8')):
             is_correct_password = True
     except Exception as e:
@@ -146,45 +163,75 @@ class AnalyticsEvent(BaseModel):
 class AnalyticsHeartbeat(BaseModel):
     session_id: str
 
+class RepresentativeUpdate(BaseModel):
+    name: Optional[str] = None
+    role: Optional[str] = None
+    party: Optional[str] = None
+    constituency: Optional[str] = None
+    state: Optional[str] = None
+    bio: Optional[str] = None
+    years_in_office: Optional[int] = None
+    funds_spent_crores: Optional[float] = None
+    funds_total_crores: Optional[float] = None
+    attendance_percentage: Optional[int] = None
+    achievements: Optional[str] = None
+    image_url: Optional[str] = None
+    news: Optional[str] = None
+    sources: Optional[str] = None
+
 # --- Helpers ---
 def get_location_from_ip(ip):
-    if ip in ["127.0.0.1", "::1"]:
-        return "Localhost, Dev", 20.5937, 78.9629 # Mock (India center)
-    try:
-        res = requests.get(f"http://ip-api.com/json/{ip}", timeout=2)
-        if res.status_code == 200:
-            data = res.json()
-            if data['status'] == 'success':
-                loc_str = f"{data['city']}, {data['country']}"
-                return loc_str, data['lat'], data['lon']
-    except:
-        pass
-    return "Unknown", None, None
-
-# Helper for Retry
-@retry(
-    stop=stop_after_attempt(3), 
-    wait=wait_exponential(multiplier=1, min=2, max=10),
-    retry_error_callback=lambda retry_state: "RateLimitExceeded"
-)
-def generate_gemini_response(prompt):
+    # Cached (memory LRU -> ip_locations table -> ip-api.com)
+    return ip_location_cache.lookup(ip)
+
+def resolve_session_location(session_id, ip):
+    location, lat, lon = get_location_from_ip(ip)
+    session_tracker.set_location(session_id, location, lat, lon)
+
+async def _generate_gemini_response_once(prompt):
     # Remove internal system prompt wrapping. 
     # The caller (chat_endpoint) is responsible for constructing the full context/system prompt.
     print(f"DEBUG: Generating content with prompt length: {len(prompt)}")
     
-    return client.models.generate_content(
-        model='gemini-1.5-flash',
-        contents=prompt
-    )
+    # Async SDK call: retries back off with asyncio.sleep instead of blocking the event loop.
+    # The slot is taken per attempt so backoff doesn't hold a concurrency slot.
+    async with gemini_limiter.slot():
+        return await get_genai_client().aio.models.generate_content(
+            model='gemini-1.5-flash',
+            contents=prompt
+        )
+
+# Retry policy shared by /api/chat and /api/chat/stream (before its first token)
+GEMINI_ATTEMPTS = 3
+GEMINI_RETRY_MIN_WAIT = 2
+GEMINI_RETRY_MAX_WAIT = 10
+
+def _gemini_retry_wait(attempt):
+    # Same schedule as tenacity's wait_exponential(multiplier=1, min, max)
+    return min(max(2 ** (attempt - 1), GEMINI_RETRY_MIN_WAIT), GEMINI_RETRY_MAX_WAIT)
+
+# Helper for Retry (tenacity wrapper built on first call)
+@functools.lru_cache(maxsize=None)
+def _gemini_with_retry():
+    from tenacity import retry, stop_after_attempt, wait_exponential
+    return retry(
+        stop=stop_after_attempt(GEMINI_ATTEMPTS), 
+        wait=wait_exponential(multiplier=1, min=GEMINI_RETRY_MIN_WAIT, max=GEMINI_RETRY_MAX_WAIT),
+        retry_error_callback=lambda retry_state: "RateLimitExceeded"
+    )(_generate_gemini_response_once)
+
+async def generate_gemini_response(prompt):
+    return await _gemini_with_retry()(prompt)
 
 # --- API Endpoints ---
 
 # --- Helpers for Dynamic Data ---
-def fetch_dynamic_local_reps(location_str):
+async def fetch_dynamic_local_reps(location_str):
     """
     Uses Gemini to find the current MLA and Councillor for a specific location.
     Returns a dict with 'mla' and 'councillor'.
     """
+    client = get_genai_client()
     if not client:
         return None
         
@@ -194,10 +241,11 @@ def fetch_dynamic_local_reps(location_str):
         Return strictly a JSON object with keys: "mla_name", "mla_party", "councillor_name", "councillor_party".
         If unknown, use "Unknown". Do not add markdown.
         """
-        response = client.models.generate_content(
-            model='gemini-1.5-flash',
-            contents=prompt
-        )
+        async with gemini_limiter.slot():
+            response = await client.aio.models.generate_content(
+                model='gemini-1.5-flash',
+                contents=prompt
+            )
         if response.text:
             cleaned = response.text.replace('```json', '').replace('```', '').strip()
             return json.loads(cleaned)
@@ -207,13 +255,63 @@ def fetch_dynamic_local_reps(location_str):
 
 # --- API Endpoints ---
 
+REPS_CACHE_CONTROL = os.getenv("REPS_CACHE_CONTROL", "public, max-age=60, must-revalidate")
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+def accepts_gzip(accept_encoding):
+    """Whether an Accept-Encoding header allows gzip: listed (or "*") with q > 0."""
+    qualities = {}
+    for item in (accept_encoding or "").split(","):
+        coding, *params = item.split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qualities[coding] = q
+    q = qualities.get("gzip", qualities.get("x-gzip", qualities.get("*", 0.0)))
+    return q > 0
+
+def representatives_snapshot_response(request: Request):
+    # Pre-serialised in rep_context; rebuilt only when the table changes
+    snapshot = rep_context.snapshot()
+    headers = {"ETag": snapshot["etag"], "Cache-Control": REPS_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), snapshot["etag"]):
+        return Response(status_code=304, headers=headers)
+    if accepts_gzip(request.headers.get("accept-encoding")):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=snapshot["gzip"], media_type="application/json", headers=headers)
+    return Response(content=snapshot["body"], media_type="application/json", headers=headers)
+
 @app.get("/api/representatives")
-def get_representatives(search: Optional[str] = None):
+def get_representatives(request: Request, search: Optional[str] = None, limit: Optional[int] = None, offset: int = 0):
     if search:
         # Check for PIN Code (6 digits)
         if search.isdigit() and len(search) == 6:
+            # Offline PIN index first; live geocoding only for PINs we don't know
+            try:
+                reps = get_representatives_by_pincode(search)
+                if reps is not None:
+                    return reps
+            except Exception as e:
+                print(f"PIN Lookup Error: {e}")
+
             try:
-                location = geolocator.geocode(search + ", India")
+                location = get_geolocator().geocode(search + ", India")
                 if location:
                     # Use the address to find MP
                     # Nominatim address dict is complex, but display_name is usually "Area, City, State, PIN, Country"
@@ -226,16 +324,14 @@ def get_representatives(search: Optional[str] = None):
                     # Try finding rep by district/city (terms before state)
                     # This is heuristical.
                     found_reps = []
-                    conn = get_db_connection()
-                    cur = conn.cursor()
+                    with get_db_connection() as conn:
+                        cur = conn.cursor()
                     
-                    for term in terms:
-                         cur.execute("SELECT * FROM representatives WHERE constituency ILIKE %s OR state ILIKE %s", (f"%{term}%", f"%{term}%"))
-                         rows = cur.fetchall()
-                         if rows:
-                             found_reps.extend([dict(row) for row in rows])
-                             
-                    conn.close()
+                        for term in terms:
+                             cur.execute("SELECT * FROM representatives WHERE constituency ILIKE %s OR state ILIKE %s", (f"%{term}%", f"%{term}%"))
+                             rows = cur.fetchall()
+                             if rows:
+                                 found_reps.extend([dict(row) for row in rows])
                     
                     # Deduplicate by ID
                     seen = set()
@@ -249,19 +345,14 @@ def get_representatives(search: Optional[str] = None):
             except Exception as e:
                 print(f"PIN Search Error: {e}")
 
-        return get_representative_by_location(search)
-    return get_all_representatives()
+        # Every match unless the client pages (limit/offset)
+        limit = min(max(limit, 1), 100) if limit is not None else None
+        return search_representatives(search, limit=limit, offset=max(offset, 0))
+    return representatives_snapshot_response(request)
 
-@app.post("/api/chat")
-async def chat_endpoint(request: ChatRequest):
-    if not client:
-         raise HTTPException(status_code=500, detail="AI Service Config Missing")
-
-    context_str = ""
-    reps = get_all_representatives()
-    context_str += "Reps:\n"
-    for rep in reps:
-        context_str += f"- {rep['name']} ({rep['role']}, {rep['party']}) from {rep['constituency']}, {rep['state']}. Bio: {rep['bio']}\n"
+def build_chat_prompt(query):
+    # Only the reps relevant to this query, from an index rebuilt when the table changes
+    context_str = rep_context.for_query(query)
     
     good_chats = get_high_quality_chats()
     examples_str = ""
@@ -277,10 +368,47 @@ async def chat_endpoint(request: ChatRequest):
     Be concise, helpful, and non-partisan.
     """
     
-    full_prompt = f"{system_prompt}\n\nUser: {request.query}\nResponse:"
+    return f"{system_prompt}\n\nUser: {query}\nResponse:"
+
+def sse_event(data, event=None):
+    # One Server-Sent Events frame
+    frame = f"event: {event}\n" if event else ""
+    return frame + f"data: {json.dumps(data)}\n\n"
+
+def _stream_block_message(chunk):
+    # Safety stop or prompt block on a stream chunk, worded as /api/chat words them
+    feedback = getattr(chunk, 'prompt_feedback', None)
+    if feedback is not None and getattr(feedback, 'block_reason', None):
+        return f"Input info blocked. Reason: {feedback.block_reason}"
+    candidates = getattr(chunk, 'candidates', None)
+    if candidates and "SAFETY" in str(getattr(candidates[0], 'finish_reason', None) or ""):
+        return "I cannot answer this question as it may violate safety guidelines."
+    return None
+
+def lookup_cached_answer(query):
+    # (context version, cached answer or None). Blocking: may refresh rep_context and
+    # read the persisted cache tier, so callers run it in a thread.
+    context_version = rep_context.version()
+    return context_version, chat_cache.get(query, context_version)
+
+@app.post("/api/chat")
+async def chat_endpoint(request: ChatRequest):
+    client = get_genai_client()
+    if not client:
+         raise HTTPException(status_code=500, detail="AI Service Config Missing")
+
+    # DB work (context refresh, persisted cache tier, prompt examples, saving the
+    # interaction) runs in worker threads, keeping the event loop free for other requests
+    context_version, cached = await asyncio.to_thread(lookup_cached_answer, request.query)
+    if cached is not None:
+        # Still record the interaction so the answer can be rated
+        chat_id = await asyncio.to_thread(save_chat_interaction, request.query, cached)
+        return {"response": cached, "chat_id": chat_id, "cached": True}
+
+    full_prompt = await asyncio.to_thread(build_chat_prompt, request.query)
 
     try:
-        response = generate_gemini_response(full_prompt)
+        response = await generate_gemini_response(full_prompt)
         
         # Debugging: Print full response to logs
         print(f"DEBUG: Gemini Response: {response}")
@@ -303,9 +431,13 @@ async def chat_endpoint(request: ChatRequest):
                 print(f"DEBUG: Prompt Feedback Block: {pf.block_reason}")
                 return {"response": f"Input info blocked. Reason: {pf.block_reason}", "chat_id": 0}
 
+        # Only genuine answers are cached, never fallback/error text
+        cacheable = False
+
         # Check if response text is accessible directly
         if hasattr(response, 'text') and response.text:
              ai_text = response.text
+             cacheable = True
         else:
              # Try to extract text from parts if .text helper failed but parts exist
              try:
@@ -313,6 +445,7 @@ async def chat_endpoint(request: ChatRequest):
                      parts = response.candidates[0].content.parts
                      if parts:
                          ai_text = "".join([p.text for p in parts if hasattr(p, 'text')])
+                         cacheable = bool(ai_text)
                      else:
                          reason = response.candidates[0].finish_reason if hasattr(response.candidates[0], 'finish_reason') else 'Unknown'
                          ai_text = f"No content generated. (Finish Reason: {reason})"
@@ -327,7 +460,9 @@ async def chat_endpoint(request: ChatRequest):
                  print(f"Error parsing fallback: {e}")
                  ai_text = "I'm having trouble processing the AI response structure."
 
-        chat_id = save_chat_interaction(request.query, ai_text)
+        chat_id = await asyncio.to_thread(save_chat_interaction, request.query, ai_text)
+        if cacheable:
+            await asyncio.to_thread(chat_cache.put, request.query, context_version, ai_text)
         return {"response": ai_text, "chat_id": chat_id}
 
     except Exception as e:
@@ -340,6 +475,80 @@ async def chat_endpoint(request: ChatRequest):
         else:
              return {"response": f"I encountered an error: {error_msg}. Please try again.", "chat_id": 0}
 
+@app.post("/api/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    """
+    Same as /api/chat, but tokens are forwarded over SSE as Gemini produces them.
+    Events: default `data: {"text": ...}` chunks, then `event: done` with the chat_id,
+    or `event: error` with {"message", "partial", "retryable"}. Failures before the
+    first token are retried like /api/chat. After an error nothing is saved, and
+    streamed text is not an answer: on a retryable error the client asks /api/chat.
+    """
+    client = get_genai_client()
+    if not client:
+         raise HTTPException(status_code=500, detail="AI Service Config Missing")
+
+    context_version, cached = await asyncio.to_thread(lookup_cached_answer, request.query)
+
+    async def events():
+        if cached is not None:
+            chat_id = await asyncio.to_thread(save_chat_interaction, request.query, cached)
+            yield sse_event({"text": cached})
+            yield sse_event({"chat_id": chat_id, "cached": True}, event="done")
+            return
+
+        full_prompt = await asyncio.to_thread(build_chat_prompt, request.query)
+        parts, blocked = [], None
+        for attempt in range(1, GEMINI_ATTEMPTS + 1):
+            try:
+                # The slot is held for the whole stream: that's how long the model is busy
+                async with gemini_limiter.slot():
+                    stream = await client.aio.models.generate_content_stream(
+                        model='gemini-1.5-flash',
+                        contents=full_prompt
+                    )
+                    async for chunk in stream:
+                        blocked = blocked or _stream_block_message(chunk)
+                        text = getattr(chunk, 'text', None)
+                        if text:
+                            parts.append(text)
+                            yield sse_event({"text": text})
+                break
+            except Exception as e:
+                print(f"Gemini Stream Error (attempt {attempt}): {e}")
+                if not parts and attempt < GEMINI_ATTEMPTS:
+                    # Nothing sent yet, so the client can't tell: back off and retry
+                    await asyncio.sleep(_gemini_retry_wait(attempt))
+                    continue
+                error_msg = str(e)
+                if parts:
+                    message = "The answer was interrupted."
+                elif "429" in error_msg:
+                    message = "I'm currently receiving too many requests. Please try again in a minute."
+                else:
+                    message = f"I encountered an error: {error_msg}. Please try again."
+                # Cut off mid-answer: worth one more try through /api/chat. Failed from the
+                # start: already retried here, so the message is final.
+                yield sse_event({"message": message, "partial": bool(parts), "retryable": bool(parts)}, event="error")
+                return
+
+        ai_text = "".join(parts)
+        if blocked or not ai_text:
+            message = blocked or "Empty response from AI service."
+            yield sse_event({"message": message, "partial": bool(parts), "retryable": False}, event="error")
+            return
+
+        # Finalise once the stream completes: persist, cache, hand back the chat_id
+        chat_id = await asyncio.to_thread(save_chat_interaction, request.query, ai_text)
+        await asyncio.to_thread(chat_cache.put, request.query, context_version, ai_text)
+        yield sse_event({"chat_id": chat_id}, event="done")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @app.post("/api/feedback")
 def feedback_endpoint(request: RatingRequest):
     update_chat_rating(request.chat_id, request.rating)
@@ -348,19 +557,24 @@ def feedback_endpoint(request: RatingRequest):
 # --- Analytics Endpoints ---
 
 @app.post("/api/analytics/heartbeat")
-def heartbeat(request: AnalyticsHeartbeat, req: Request):
+def heartbeat(request: AnalyticsHeartbeat, req: Request, background_tasks: BackgroundTasks):
     ip = req.client.host
     user_agent = req.headers.get('user-agent')
-    # Resolve location
-    location, lat, lon = get_location_from_ip(ip)
 
-    create_session(request.session_id, ip, user_agent, location, lat, lon)
-    update_session_heartbeat(request.session_id)
+    # Buffered in memory; written to user_sessions in batches by session_tracker.run()
+    is_new = session_tracker.touch(request.session_id, ip, user_agent)
+    if is_new:
+        # Resolve location once per session, after the response is sent
+        background_tasks.add_task(resolve_session_location, request.session_id, ip)
     return {"status": "ok"}
 
 @app.post("/api/analytics/event")
 def track_event(request: AnalyticsEvent):
-    log_analytics_event(request.session_id, request.event_type, request.details)
+    # Queued; written in batches by event_pipeline.run()
+    if not event_pipeline.enqueue(request.session_id, request.event_type, request.details):
+        raise HTTPException(status_code=503, detail="Analytics queue full, retry later")
+    # Latest event per session lands on user_sessions with the next heartbeat flush
+    session_tracker.note_event(request.session_id, request.event_type)
     return {"status": "ok"}
 
 @app.get("/api/admin/stats")
@@ -371,6 +585,31 @@ def get_stats(username: str = Depends(verify_admin)):
     # Merge dicts
     return {**daily, **advanced, "recent_chats": chats}
 
+@app.get("/api/admin/metrics")
+def get_metrics(username: str = Depends(verify_admin)):
+    return {
+        "db_pool": get_pool_stats(),
+        "heartbeats": session_tracker.get_stats(),
+        "ip_geo_cache": ip_location_cache.get_stats(),
+        "events": event_pipeline.get_stats(),
+        "rep_context": rep_context.get_stats(),
+        "chat_cache": chat_cache.get_stats(),
+        "gemini": gemini_limiter.get_stats(),
+        "local_reps_cache": local_reps_cache.get_stats(),
+        "startup": startup_report.get_stats(),
+        "scheduler": scheduler_leader.get_stats(),
+    }
+
+@app.patch("/api/admin/representatives/{rep_id}")
+def patch_representative(rep_id: int, update: RepresentativeUpdate, username: str = Depends(verify_admin)):
+    try:
+        updated = update_representative(rep_id, update.model_dump(exclude_unset=True))
+    except DuplicateRepresentative:
+        raise HTTPException(status_code=409, detail="Another representative already has this name and constituency")
+    if not updated:
+        raise HTTPException(status_code=404, detail="Representative not found or nothing to update")
+    return {"status": "success"}
+
 @app.post("/api/admin/login")
 def login(username: str = Depends(verify_admin)):
     return {"status": "logged_in", "username": username}
@@ -386,6 +625,26 @@ async def test_email_endpoint():
         return {"status": "success", "message": "Email sent"}
     return {"status": "error", "message": "Failed to send email"}
 
+def find_mp_by_address(district, state):
+    # Simple heuristic mapping: Try to find MP by district or state
+    # Fallback for coordinates the constituency locator can't place.
+    mp_info = None
+    
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+    
+        # 1. Search by district name as constituency
+        if district:
+             district_clean = district.replace("District", "").strip()
+             cur.execute("SELECT * FROM representatives WHERE constituency ILIKE %s", (f"%{district_clean}%",))
+             mp_info = cur.fetchone()
+         
+        # 2. If not found, just return state info
+        if not mp_info and state:
+             cur.execute("SELECT * FROM representatives WHERE state ILIKE %s LIMIT 1", (f"%{state}%",))
+             mp_info = cur.fetchone()
+    return mp_info
+
 @app.post("/api/detect-location")
 async def detect_location(request: Request):
     data = await request.json()
@@ -396,37 +655,34 @@ async def detect_location(request: Request):
         return {"status": "error", "message": "Missing coordinates"}
         
     try:
-        # Reverse geocode to get address
-        location = geolocator.reverse((lat, lon), language='en')
-        address = location.raw.get('address', {})
-        state = address.get('state', '')
+        lat, lon = float(lat), float(lon)
+
+        # 1. Coordinates -> constituency -> MP, all in memory
+        mp_info = None
+        located = constituency_locator.locate(lat, lon)
+        if located:
+            # Off the event loop: before warm-up or after an invalidation this rebuilds from the DB
+            mp_info = await asyncio.to_thread(rep_context.by_constituency, located[0])
+
+        # Reverse geocoding is only needed for the display string (and the local reps lookup)
+        try:
+            location = await asyncio.to_thread(get_geolocator().reverse, (lat, lon), language='en')
+        except Exception as e:
+            if not mp_info:
+                raise
+            print(f"Reverse geocode failed, using located constituency: {e}")
+            location = None
+        address = location.raw.get('address', {}) if location else {}
+        state = address.get('state', '') or (located[1] if located else '')
         district = address.get('state_district', '') or address.get('county', '')
         location_str = f"{district}, {state}"
         
-        # Simple heuristic mapping: Try to find MP by district or state
-        # In a real app, we need a shapefile mapper. For now, we search the DB.
-        
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        # Try finding constituency matches (fuzzy or direct)
-        mp_info = None
-        
-        # 1. Search by district name as constituency
-        if district:
-             district_clean = district.replace("District", "").strip()
-             cur.execute("SELECT * FROM representatives WHERE constituency ILIKE %s", (f"%{district_clean}%",))
-             mp_info = cur.fetchone()
-             
-        # 2. If not found, just return state info
-        if not mp_info and state:
-             cur.execute("SELECT * FROM representatives WHERE state ILIKE %s LIMIT 1", (f"%{state}%",))
-             mp_info = cur.fetchone()
-             
-        conn.close()
+        # 2. Not covered by the spatial index: heuristic search by district/state
+        if not mp_info:
+            mp_info = await asyncio.to_thread(find_mp_by_address, district, state)
         
-        # Dynamic Fetch for MLA/Councillor
-        local_reps = fetch_dynamic_local_reps(location_str)
+        # Dynamic Fetch for MLA/Councillor (cached per district; model call only on a miss)
+        local_reps = await local_reps_cache.get(location_str, fetch_dynamic_local_reps)
         
         if mp_info:
             response_data = {
@@ -467,4 +723,5 @@ async def read_admin():
 from database import init_db
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,45 @@
+import argparse
+import os
+import sys
+from dotenv import load_dotenv
+from database import get_db_connection
+from migrations import apply_migrations, discover, applied_versions
+from migrations.checks import check_indexes
+
+# Applies pending schema migrations (init_db does the same on startup).
+#
+#   python migrate.py           apply pending migrations
+#   python migrate.py --status  list migrations and whether each is applied
+#   python migrate.py --check   verify with EXPLAIN that the hot queries use their indexes
+
+load_dotenv()
+
+def main():
+    parser = argparse.ArgumentParser(description="CitizenConnect schema migrations")
+    parser.add_argument("--status", action="store_true", help="list migrations without applying")
+    parser.add_argument("--check", action="store_true", help="run the EXPLAIN index checks")
+    args = parser.parse_args()
+    is_postgres = os.getenv("DATABASE_URL") is not None
+
+    with get_db_connection() as conn:
+        if args.status:
+            applied = applied_versions(conn)
+            for version, name, _ in discover():
+                print(f"[{'x' if version in applied else ' '}] {name}")
+            return 0
+
+        if args.check:
+            failed = 0
+            for index, query, passed, plan in check_indexes(conn, is_postgres):
+                print(f"{'ok  ' if passed else 'FAIL'} {index}: {' '.join(query.split())}")
+                if not passed:
+                    failed += 1
+                    print("     " + plan.replace("\n", "\n     "))
+            return 1 if failed else 0
+
+        applied = apply_migrations(conn, is_postgres)
+        print(f"Applied {len(applied)} migration(s)." if applied else "Schema is up to date.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""Representatives, chat history and analytics tables as they were first shipped."""
+
+def up(cursor, is_postgres):
+    pk_type = "SERIAL PRIMARY KEY" if is_postgres else "INTEGER PRIMARY KEY AUTOINCREMENT"
+
+    cursor.execute(f'''
+    CREATE TABLE IF NOT EXISTS representatives (
+        id {pk_type},
+        name TEXT NOT NULL,
+        role TEXT NOT NULL,
+        party TEXT,
+        constituency TEXT,
+        state TEXT,
+        bio TEXT,
+        years_in_office INTEGER,
+        funds_spent_crores REAL,
+        funds_total_crores REAL,
+        attendance_percentage INTEGER
+    )
+    ''')
+
+    cursor.execute(f'''
+    CREATE TABLE IF NOT EXISTS chat_history (
+        id {pk_type},
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        user_query TEXT,
+        ai_response TEXT,
+        rating INTEGER
+    )
+    ''')
+
+    # session_id matches client-side UUID
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS user_sessions (
+        session_id TEXT PRIMARY KEY,
+        start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        last_heartbeat TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        duration_seconds REAL DEFAULT 0,
+        ip_address TEXT,
+        user_agent TEXT,
+        location TEXT,
+        latitude REAL,
+        longitude REAL
+    )
+    ''')
+
+    cursor.execute(f'''
+    CREATE TABLE IF NOT EXISTS analytics_events (
+        id {pk_type},
+        session_id TEXT,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        event_type TEXT,
+        details TEXT
+    )
+    ''')
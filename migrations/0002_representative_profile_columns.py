@@ -0,0 +1,16 @@
+"""Profile columns that init_db used to add with a try/except ALTER on every boot."""
+from migrations import add_column
+
+COLUMNS = [
+    ("achievements", "TEXT"),
+    ("image_url", "TEXT"),
+    ("news", "TEXT"),
+    ("sources", "TEXT"),
+    ("funds_spent_crores", "REAL"),
+    ("funds_total_crores", "REAL"),
+    ("attendance_percentage", "INTEGER"),
+]
+
+def up(cursor, is_postgres):
+    for column, ddl_type in COLUMNS:
+        add_column(cursor, "representatives", column, ddl_type, is_postgres)
@@ -0,0 +1,53 @@
+"""Lookup and cache tables: IP geolocation, data versions, chat answers, local reps, PIN codes."""
+
+def up(cursor, is_postgres):
+    # IP Geolocation Cache (survives restarts; resolved_at is epoch seconds)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS ip_locations (
+        ip_address TEXT PRIMARY KEY,
+        location TEXT,
+        latitude REAL,
+        longitude REAL,
+        success INTEGER DEFAULT 1,
+        resolved_at REAL
+    )
+    ''')
+
+    # Data Versions (bumped whenever a cached table changes, so caches in
+    # every process know when to rebuild)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS data_versions (
+        name TEXT PRIMARY KEY,
+        version INTEGER DEFAULT 0
+    )
+    ''')
+
+    # Chat Answer Cache (persisted tier; created_at is epoch seconds)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS chat_cache (
+        cache_key TEXT PRIMARY KEY,
+        response TEXT,
+        created_at REAL
+    )
+    ''')
+
+    # Local MLA/Councillor Cache (Gemini-derived; fetched_at is epoch seconds)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS local_reps_cache (
+        location_key TEXT PRIMARY KEY,
+        data TEXT,
+        fetched_at REAL
+    )
+    ''')
+
+    # PIN Codes (loaded offline by ingest_pincodes.py)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS pincodes (
+        pincode TEXT PRIMARY KEY,
+        district TEXT,
+        state TEXT,
+        constituency TEXT,
+        latitude REAL,
+        longitude REAL
+    )
+    ''')
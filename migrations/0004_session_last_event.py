@@ -0,0 +1,23 @@
+"""Last analytics event per session (drop-off analysis), backfilled from analytics_events."""
+from migrations import add_column
+
+def up(cursor, is_postgres):
+    added = add_column(cursor, "user_sessions", "last_event_type", "TEXT", is_postgres)
+    add_column(cursor, "user_sessions", "last_event_at", "TIMESTAMP", is_postgres)
+    if not added:
+        return
+    cursor.execute('''
+        UPDATE user_sessions SET
+            last_event_type = (
+                SELECT e.event_type FROM analytics_events e
+                WHERE e.session_id = user_sessions.session_id
+                ORDER BY e.timestamp DESC, e.id DESC LIMIT 1
+            ),
+            last_event_at = (
+                SELECT MAX(e.timestamp) FROM analytics_events e
+                WHERE e.session_id = user_sessions.session_id
+            )
+        WHERE EXISTS (SELECT 1 FROM analytics_events e WHERE e.session_id = user_sessions.session_id)
+    ''')
+    if cursor.rowcount and cursor.rowcount > 0:
+        print(f"Backfilled last event for {cursor.rowcount} sessions.")
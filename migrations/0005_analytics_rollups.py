@@ -0,0 +1,61 @@
+"""
+Rollups behind the admin dashboard, maintained as events and heartbeats are written.
+Keys are UTC text buckets: hour = 'YYYY-MM-DD HH', day = 'YYYY-MM-DD'.
+"""
+
+def up(cursor, is_postgres):
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS rollup_events_hourly (
+        hour TEXT NOT NULL,
+        event_type TEXT NOT NULL,
+        events INTEGER DEFAULT 0,
+        PRIMARY KEY (hour, event_type)
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS rollup_sessions_daily (
+        day TEXT PRIMARY KEY,
+        sessions INTEGER DEFAULT 0,
+        duration_seconds REAL DEFAULT 0
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS rollup_locations_daily (
+        day TEXT NOT NULL,
+        location TEXT NOT NULL,
+        latitude REAL,
+        longitude REAL,
+        sessions INTEGER DEFAULT 0,
+        PRIMARY KEY (day, location)
+    )
+    ''')
+    # Existing history: build the rollups from it once. Written out here rather than
+    # calling database._rebuild_analytics_rollups, so later changes to that helper
+    # can't change what this migration does.
+    if is_postgres:
+        hour_expr = "TO_CHAR(timestamp, 'YYYY-MM-DD HH24')"
+        day_expr = "TO_CHAR(start_time, 'YYYY-MM-DD')"
+    else:
+        hour_expr = "strftime('%Y-%m-%d %H', timestamp)"
+        day_expr = "strftime('%Y-%m-%d', start_time)"
+
+    for table in ("rollup_events_hourly", "rollup_sessions_daily", "rollup_locations_daily"):
+        cursor.execute(f"DELETE FROM {table}")
+    cursor.execute(f'''
+        INSERT INTO rollup_events_hourly (hour, event_type, events)
+        SELECT {hour_expr}, COALESCE(event_type, ''), COUNT(*) FROM analytics_events
+        WHERE timestamp IS NOT NULL
+        GROUP BY {hour_expr}, COALESCE(event_type, '')
+    ''')
+    cursor.execute(f'''
+        INSERT INTO rollup_sessions_daily (day, sessions, duration_seconds)
+        SELECT {day_expr}, COUNT(*), COALESCE(SUM(duration_seconds), 0) FROM user_sessions
+        WHERE start_time IS NOT NULL
+        GROUP BY {day_expr}
+    ''')
+    cursor.execute(f'''
+        INSERT INTO rollup_locations_daily (day, location, latitude, longitude, sessions)
+        SELECT {day_expr}, location, MAX(latitude), MAX(longitude), COUNT(*) FROM user_sessions
+        WHERE start_time IS NOT NULL AND location IS NOT NULL
+        GROUP BY {day_expr}, location
+    ''')
@@ -0,0 +1,47 @@
+"""
+Indexes behind search.search_representatives:
+- Postgres: pg_trgm GIN indexes (maintained by Postgres itself)
+- SQLite: FTS5 trigram table kept in sync with triggers
+Optional: where the extension or FTS5 isn't available, search falls back to LIKE.
+"""
+
+OPTIONAL = True
+
+def up(cursor, is_postgres):
+    if is_postgres:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for column in ("name", "constituency", "state", "party"):
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_representatives_{column}_trgm ON representatives USING gin ({column} gin_trgm_ops)")
+        return
+
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'representatives_fts'")
+    exists = cursor.fetchone() is not None
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS representatives_fts USING fts5(
+            name, constituency, state, party,
+            content='representatives', content_rowid='id', tokenize='trigram'
+        )
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS representatives_fts_ai AFTER INSERT ON representatives BEGIN
+            INSERT INTO representatives_fts(rowid, name, constituency, state, party)
+            VALUES (new.id, new.name, new.constituency, new.state, new.party);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS representatives_fts_ad AFTER DELETE ON representatives BEGIN
+            INSERT INTO representatives_fts(representatives_fts, rowid, name, constituency, state, party)
+            VALUES ('delete', old.id, old.name, old.constituency, old.state, old.party);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS representatives_fts_au AFTER UPDATE ON representatives BEGIN
+            INSERT INTO representatives_fts(representatives_fts, rowid, name, constituency, state, party)
+            VALUES ('delete', old.id, old.name, old.constituency, old.state, old.party);
+            INSERT INTO representatives_fts(rowid, name, constituency, state, party)
+            VALUES (new.id, new.name, new.constituency, new.state, new.party);
+        END
+    ''')
+    if not exists:
+        # Index rows that predate the FTS table
+        cursor.execute("INSERT INTO representatives_fts(representatives_fts) VALUES ('rebuild')")
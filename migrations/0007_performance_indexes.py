@@ -0,0 +1,33 @@
+"""
+Secondary indexes for the hot queries (see migrations/checks.py for the query each
+one serves). The unique (name, constituency) key also serves lookups by name, as
+its leading column, so there is no separate name index.
+"""
+
+INDEXES = [
+    ("idx_analytics_events_timestamp", "analytics_events (timestamp)"),
+    ("idx_analytics_events_session_timestamp", "analytics_events (session_id, timestamp)"),
+    ("idx_chat_history_rating_id", "chat_history (rating, id)"),
+    ("idx_chat_history_timestamp", "chat_history (timestamp)"),
+    ("idx_user_sessions_start_time", "user_sessions (start_time)"),
+    ("idx_representatives_constituency", "representatives (constituency)"),
+    ("idx_representatives_state", "representatives (state)"),
+]
+
+def up(cursor, is_postgres):
+    for name, target in INDEXES:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+
+    # Duplicates would block the unique key; keep the oldest row of each
+    # (rows without a constituency never collide, NULLs are distinct)
+    cursor.execute('''
+        DELETE FROM representatives
+        WHERE constituency IS NOT NULL AND id NOT IN (
+            SELECT MIN(id) FROM representatives
+            WHERE constituency IS NOT NULL
+            GROUP BY name, constituency
+        )
+    ''')
+    if cursor.rowcount and cursor.rowcount > 0:
+        print(f"Removed {cursor.rowcount} duplicate representatives before adding the unique key.")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS uq_representatives_name_constituency ON representatives (name, constituency)")
@@ -0,0 +1,10 @@
+"""Small key/value table for one-off application state (e.g. which seed has been applied)."""
+
+def up(cursor, is_postgres):
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS app_state (
+        key TEXT PRIMARY KEY,
+        value TEXT,
+        updated_at REAL
+    )
+    ''')
@@ -0,0 +1,14 @@
+"""Fetch state of external sources (revision, ETag, Last-Modified) for conditional re-ingestion."""
+
+def up(cursor, is_postgres):
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS ingest_sources (
+        source TEXT PRIMARY KEY,
+        url TEXT,
+        revision_id BIGINT,
+        etag TEXT,
+        last_modified TEXT,
+        checked_at REAL,
+        changed_at REAL
+    )
+    ''')
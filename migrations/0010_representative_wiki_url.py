@@ -0,0 +1,6 @@
+"""Link to each scraped MP's Wikipedia article, for profile enrichment (enrich_mps.py)."""
+
+from migrations import add_column
+
+def up(cursor, is_postgres):
+    add_column(cursor, "representatives", "wiki_url", "TEXT", is_postgres)
@@ -0,0 +1,93 @@
+import importlib
+import pkgutil
+
+# --- Schema Migrations ---
+# Numbered modules in this package (NNNN_description.py) each define
+# up(cursor, is_postgres) and are applied in order, once, recorded in schema_version.
+# Every migration runs in its own transaction (BEGIN IMMEDIATE on SQLite, plus an
+# advisory lock on Postgres) so workers booting together don't race. A module with
+# OPTIONAL = True may fail without blocking startup and is retried on the next boot.
+# Migrations stay idempotent (IF NOT EXISTS, column checks): databases from before
+# schema_version already have part of the schema.
+
+MIGRATION_LOCK_ID = 7316001  # Postgres advisory lock key
+
+def discover():
+    """[(version, name, module)] in version order."""
+    found = []
+    for info in pkgutil.iter_modules(__path__):
+        prefix = info.name.split("_", 1)[0]
+        if prefix.isdigit():
+            found.append((int(prefix), info.name, importlib.import_module(f"{__name__}.{info.name}")))
+    return sorted(found, key=lambda item: item[0])
+
+def column_exists(cursor, table, column, is_postgres):
+    if is_postgres:
+        cursor.execute("SELECT 1 FROM information_schema.columns WHERE table_name = ? AND column_name = ?", (table, column))
+        return cursor.fetchone() is not None
+    cursor.execute(f"PRAGMA table_info({table})")
+    return any(row['name'] == column for row in cursor.fetchall())
+
+def add_column(cursor, table, column, ddl_type, is_postgres):
+    """ALTER TABLE ... ADD COLUMN unless it is already there. Returns True if added."""
+    if column_exists(cursor, table, column, is_postgres):
+        return False
+    cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}")
+    return True
+
+def _ensure_version_table(conn):
+    cursor = conn.cursor()
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        name TEXT,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    conn.commit()
+
+def applied_versions(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT version FROM schema_version")
+    except Exception:
+        # First run: no DDL on the usual boot where the table already exists
+        conn.rollback()
+        _ensure_version_table(conn)
+        cursor = conn.cursor()
+        cursor.execute("SELECT version FROM schema_version")
+    versions = {row['version'] for row in cursor.fetchall()}
+    conn.commit()
+    return versions
+
+def pending_migrations(conn):
+    applied = applied_versions(conn)
+    return [(version, name, module) for version, name, module in discover() if version not in applied]
+
+def apply_migrations(conn, is_postgres):
+    """Applies pending migrations. Returns the names of those applied."""
+    applied = []
+    for version, name, module in pending_migrations(conn):
+        cursor = conn.cursor()
+        try:
+            if is_postgres:
+                cursor.execute("SELECT pg_advisory_xact_lock(?)", (MIGRATION_LOCK_ID,))
+            else:
+                cursor.execute("BEGIN IMMEDIATE")
+            # Another worker may have applied it while we waited for the lock
+            cursor.execute("SELECT 1 FROM schema_version WHERE version = ?", (version,))
+            if cursor.fetchone():
+                conn.rollback()
+                continue
+            module.up(cursor, is_postgres)
+            cursor.execute("INSERT INTO schema_version (version, name) VALUES (?, ?)", (version, name))
+            conn.commit()
+            applied.append(name)
+            print(f"Applied migration {name}")
+        except Exception as e:
+            conn.rollback()
+            if getattr(module, "OPTIONAL", False):
+                print(f"Optional migration {name} skipped ({e}); will retry on next start.")
+                continue
+            raise
+    return applied
@@ -0,0 +1,61 @@
+"""
+EXPLAIN checks: each index from the migrations paired with a query the app
+actually runs, so a dropped index or a rewritten query that stops using it
+shows up in `python migrate.py --check` rather than as a slow dashboard.
+"""
+
+SINCE = "2000-01-01 00:00:00"
+
+# (index, query, params)
+INDEX_CHECKS = [
+    # Daily report: activity since yesterday (email_service.get_daily_stats)
+    ("idx_analytics_events_timestamp",
+     "SELECT COUNT(DISTINCT session_id) FROM analytics_events WHERE timestamp > ?", (SINCE,)),
+    # A session's event trail, newest first (last-event backfill, drop-off analysis)
+    ("idx_analytics_events_session_timestamp",
+     "SELECT event_type FROM analytics_events WHERE session_id = ? ORDER BY timestamp DESC LIMIT 1", ("check",)),
+    # Few-shot examples for the chat prompt (get_high_quality_chats)
+    ("idx_chat_history_rating_id",
+     "SELECT user_query, ai_response FROM chat_history WHERE rating = 5 ORDER BY id DESC LIMIT 5", ()),
+    # Admin dashboard (get_recent_chats)
+    ("idx_chat_history_timestamp",
+     "SELECT timestamp, user_query, ai_response, rating FROM chat_history ORDER BY timestamp DESC LIMIT ?", (10,)),
+    ("idx_chat_history_timestamp",
+     "SELECT COUNT(*) FROM chat_history WHERE timestamp > ?", (SINCE,)),
+    # Rollup rebuilds and date-range reports
+    ("idx_user_sessions_start_time",
+     "SELECT COUNT(*) FROM user_sessions WHERE start_time >= ? AND start_time < ?", (SINCE, "2100-01-01 00:00:00")),
+    # Pincode lookup (get_representatives_by_pincode)
+    ("idx_representatives_constituency",
+     "SELECT * FROM representatives WHERE constituency = ?", ("Varanasi",)),
+    ("idx_representatives_state",
+     "SELECT * FROM representatives WHERE state = ?", ("Kerala",)),
+    # Core rep patch in init_db; name is the leading column of the unique key
+    ("uq_representatives_name_constituency",
+     "SELECT id, image_url, news, sources FROM representatives WHERE name = ?", ("Narendra Modi",)),
+    ("uq_representatives_name_constituency",
+     "SELECT id FROM representatives WHERE name = ? AND constituency = ?", ("Narendra Modi", "Varanasi")),
+]
+
+def explain(cursor, query, params, is_postgres):
+    """Query plan as one string."""
+    if is_postgres:
+        cursor.execute("EXPLAIN " + query, params)
+        return "\n".join(row['QUERY PLAN'] for row in cursor.fetchall())
+    cursor.execute("EXPLAIN QUERY PLAN " + query, params)
+    return "\n".join(row['detail'] for row in cursor.fetchall())
+
+def check_indexes(conn, is_postgres):
+    """[(index, query, passed, plan)] for every INDEX_CHECKS entry."""
+    cursor = conn.cursor()
+    results = []
+    try:
+        if is_postgres:
+            # Tiny dev tables are cheaper to scan; ask whether the index *can* serve the query
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        for index, query, params in INDEX_CHECKS:
+            plan = explain(cursor, query, params, is_postgres)
+            results.append((index, query, index in plan, plan))
+    finally:
+        conn.rollback()
+    return results
@@ -0,0 +1,18 @@
+from dotenv import load_dotenv
+from database import init_db, rebuild_analytics_rollups
+
+# Rebuilds the analytics rollup tables (rollup_events_hourly, rollup_sessions_daily,
+# rollup_locations_daily) from the raw analytics_events and user_sessions history.
+# The app keeps them up to date on its own; run this after importing old data,
+# deleting raw rows, or if the dashboard ever looks off.
+#
+#   python rebuild_rollups.py
+
+load_dotenv()
+
+if __name__ == "__main__":
+    print("Initializing Database Schema...")
+    init_db()
+    counts = rebuild_analytics_rollups()
+    for table, rows in counts.items():
+        print(f"{table}: {rows} rows")
@@ -0,0 +1,152 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import threading
+from database import get_all_representatives, get_data_version, on_data_changed
+from retrieval import RepresentativeIndex, estimate_tokens
+
+# --- Representatives Prompt Context ---
+# The "Reps:" block of the chat prompt only changes when the representatives table
+# does, so it is rendered once and reused. Writers in this process invalidate it
+# through on_data_changed(); writes from other processes (ingest_mps_wiki, other
+# workers) are picked up by watch(), which polls data_versions.
+#
+# The same build also pre-serialises the table for GET /api/representatives: JSON
+# bytes, a gzip copy and an ETag, so serving the list is a lookup, not a query.
+
+REPS_VERSION_CHECK_SECONDS = float(os.getenv("REPS_VERSION_CHECK_SECONDS", 60))
+# Per-query retrieval: only the top-k relevant reps (within a token budget) go into
+# the prompt. CHAT_CONTEXT_TOP_K=0 sends the full list instead.
+CHAT_CONTEXT_TOP_K = int(os.getenv("CHAT_CONTEXT_TOP_K", 15))
+CHAT_CONTEXT_TOKEN_BUDGET = int(os.getenv("CHAT_CONTEXT_TOKEN_BUDGET", 2000))
+SNAPSHOT_GZIP_LEVEL = 6
+
+def render_rep_line(rep):
+    return f"- {rep['name']} ({rep['role']}, {rep['party']}) from {rep['constituency']}, {rep['state']}. Bio: {rep['bio']}\n"
+
+class RepresentativesContext:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._block = None
+        self._reps = []
+        self._by_constituency = {}
+        self.db_version = None    # data_versions row the cache was built from
+        self.content_hash = None  # Hash of the rendered block, used as a cache key downstream
+        self._snapshot = None     # {"etag", "body", "gzip"} for the API
+        self.index = RepresentativeIndex()
+        self.stats = {"builds": 0, "invalidations": 0}
+
+    def refresh(self):
+        # Single flight: readers that find the block invalidated all land here, and
+        # only the first rebuilds; the rest wait for it and reuse its result
+        with self._refresh_lock:
+            db_version = get_data_version("representatives")
+            if self._block is not None and db_version == self.db_version:
+                return self._block
+            return self._rebuild(db_version)
+
+    def _rebuild(self, db_version):
+        reps = get_all_representatives()
+        block = "Reps:\n" + "".join(render_rep_line(rep) for rep in reps)
+        changes = self.index.sync(reps)
+        body = json.dumps(reps, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        snapshot = {
+            "etag": '"' + hashlib.sha256(body).hexdigest()[:16] + '"',
+            "body": body,
+            "gzip": gzip.compress(body, compresslevel=SNAPSHOT_GZIP_LEVEL),
+        }
+        with self._lock:
+            self._reps = reps
+            self._by_constituency = {}
+            for rep in reps:
+                if rep.get('constituency'):
+                    self._by_constituency.setdefault(rep['constituency'].strip().lower(), rep)
+            self._block = block
+            self._snapshot = snapshot
+            self.db_version = db_version
+            self.content_hash = hashlib.sha256(block.encode("utf-8")).hexdigest()[:16]
+            self.stats["builds"] += 1
+        print(f"Built representatives context: {len(reps)} reps, hash {self.content_hash}, "
+              f"snapshot {len(body)} bytes ({len(snapshot['gzip'])} gzipped), index {changes}")
+        return block
+
+    def invalidate(self):
+        with self._lock:
+            self._block = None
+            self.stats["invalidations"] += 1
+
+    def get(self):
+        block = self._block
+        if block is None:
+            block = self.refresh()
+        return block
+
+    def version(self):
+        """Content hash of the current block; changes whenever the representatives do."""
+        if self._block is None:
+            self.refresh()
+        return self.content_hash
+
+    def for_query(self, query, k=CHAT_CONTEXT_TOP_K, token_budget=CHAT_CONTEXT_TOKEN_BUDGET):
+        """The "Reps:" block restricted to the reps relevant to `query`."""
+        if k <= 0:
+            return self.get()
+        if self._block is None:
+            self.refresh()
+        block = "Reps:\n"
+        used = estimate_tokens(block)
+        for _, rep in self.index.search(query, k):
+            line = render_rep_line(rep)
+            cost = estimate_tokens(line)
+            if used + cost > token_budget:
+                break
+            block += line
+            used += cost
+        return block
+
+    def snapshot(self):
+        """The full representatives list as {"etag", "body", "gzip"} (JSON bytes)."""
+        if self._block is None:
+            self.refresh()
+        return self._snapshot
+
+    def by_constituency(self, constituency):
+        if self._block is None:
+            self.refresh()
+        return self._by_constituency.get((constituency or "").strip().lower())
+
+    def get_reps(self):
+        if self._block is None:
+            self.refresh()
+        return self._reps
+
+    def check_version(self):
+        if get_data_version("representatives") != self.db_version:
+            self.invalidate()
+            self.refresh()
+
+    async def watch(self, interval=REPS_VERSION_CHECK_SECONDS):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.check_version)
+            except Exception as e:
+                print(f"Representatives version check failed: {e}")
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats["reps"] = len(self._reps)
+            stats["db_version"] = self.db_version
+            stats["content_hash"] = self.content_hash
+            if self._snapshot:
+                stats["snapshot_etag"] = self._snapshot["etag"]
+                stats["snapshot_bytes"] = len(self._snapshot["body"])
+                stats["snapshot_gzip_bytes"] = len(self._snapshot["gzip"])
+        return stats
+
+rep_context = RepresentativesContext()
+on_data_changed("representatives", rep_context.invalidate)
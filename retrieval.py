@@ -0,0 +1,170 @@
+import math
+import re
+import threading
+from collections import Counter
+
+# --- Representative Retrieval Index ---
+# BM25 over name, role, party, constituency, state and bio, so the chat prompt only
+# carries the representatives relevant to the question instead of all ~543 MPs.
+# Documents are keyed by representative id and re-indexed only when their fields
+# change, so sync() after an ingest touches just the rows that moved.
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Repeating a field's tokens is a cheap way to weight it (BM25F-style)
+FIELD_WEIGHTS = {
+    "name": 3,
+    "constituency": 3,
+    "state": 2,
+    "party": 2,
+    "role": 1,
+    "bio": 1,
+}
+
+STOPWORDS = {
+    "a", "an", "the", "of", "in", "on", "at", "for", "to", "from", "and", "or", "is", "are",
+    "was", "were", "be", "who", "what", "which", "where", "when", "how", "my", "our", "me",
+    "i", "you", "your", "tell", "about", "please", "can", "do", "does", "did", "this", "that",
+    "with", "by", "current", "mp", "mps", "member", "representative", "representatives",
+}
+
+# Old/alternate spellings of Indian places -> the form used in the representatives table
+PLACE_ALIASES = {
+    "bombay": "mumbai",
+    "calcutta": "kolkata",
+    "madras": "chennai",
+    "bangalore": "bengaluru",
+    "banglore": "bengaluru",
+    "trivandrum": "thiruvananthapuram",
+    "benares": "varanasi",
+    "banaras": "varanasi",
+    "kashi": "varanasi",
+    "gurgaon": "gurugram",
+    "poona": "pune",
+    "allahabad": "prayagraj",
+    "orissa": "odisha",
+    "pondicherry": "puducherry",
+    "baroda": "vadodara",
+    "cawnpore": "kanpur",
+    "simla": "shimla",
+    "mysore": "mysuru",
+    "mangalore": "mangaluru",
+    "belgaum": "belagavi",
+    "gulbarga": "kalaburagi",
+    "cochin": "kochi",
+    "calicut": "kozhikode",
+    "trichy": "tiruchirappalli",
+    "vizag": "visakhapatnam",
+    "waltair": "visakhapatnam",
+    "gauhati": "guwahati",
+    "raebareli": "rae bareli",
+    "rae-bareli": "rae bareli",
+    "tn": "tamil nadu",
+    "wb": "west bengal",
+    "ap": "andhra pradesh",
+    "hp": "himachal pradesh",
+    "j&k": "jammu kashmir",
+    "jk": "jammu kashmir",
+    "ncr": "delhi",
+    "pm": "prime minister",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9&]+(?:-[a-z0-9]+)*")
+
+def tokenize(text):
+    tokens = []
+    for token in _TOKEN_RE.findall((text or "").lower()):
+        alias = PLACE_ALIASES.get(token)
+        if alias:
+            tokens.extend(alias.split())
+            continue
+        for part in token.split("-"):
+            if part and part not in STOPWORDS:
+                tokens.append(part)
+    return tokens
+
+def estimate_tokens(text):
+    # Rough LLM token estimate (~4 characters per token)
+    return len(text) // 4 + 1
+
+class RepresentativeIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._docs = {}       # rep id -> {"tf": Counter, "length": int, "signature": tuple, "rep": dict}
+        self._postings = {}   # term -> {rep id: tf}
+        self._total_length = 0
+
+    def _signature(self, rep):
+        return tuple(rep.get(field) for field in FIELD_WEIGHTS)
+
+    def _add(self, rep_id, rep, signature):
+        tf = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(rep.get(field)):
+                tf[token] += weight
+        length = sum(tf.values())
+        self._docs[rep_id] = {"tf": tf, "length": length, "signature": signature, "rep": rep}
+        self._total_length += length
+        for term, count in tf.items():
+            self._postings.setdefault(term, {})[rep_id] = count
+
+    def _remove(self, rep_id):
+        doc = self._docs.pop(rep_id)
+        self._total_length -= doc["length"]
+        for term in doc["tf"]:
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(rep_id, None)
+                if not posting:
+                    del self._postings[term]
+
+    def sync(self, reps):
+        """Brings the index in line with `reps`, re-indexing only added/changed/removed rows."""
+        added = updated = removed = 0
+        with self._lock:
+            seen = set()
+            for rep in reps:
+                rep_id = rep["id"]
+                seen.add(rep_id)
+                signature = self._signature(rep)
+                doc = self._docs.get(rep_id)
+                if doc is None:
+                    self._add(rep_id, rep, signature)
+                    added += 1
+                elif doc["signature"] != signature:
+                    self._remove(rep_id)
+                    self._add(rep_id, rep, signature)
+                    updated += 1
+                else:
+                    doc["rep"] = rep
+            for rep_id in [rid for rid in self._docs if rid not in seen]:
+                self._remove(rep_id)
+                removed += 1
+        return {"added": added, "updated": updated, "removed": removed}
+
+    def search(self, query, k=20):
+        """Returns up to k (score, rep) pairs, best first."""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        with self._lock:
+            n_docs = len(self._docs)
+            if not n_docs:
+                return []
+            avg_length = self._total_length / n_docs
+            scores = {}
+            for term in terms:
+                posting = self._postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+                for rep_id, tf in posting.items():
+                    length = self._docs[rep_id]["length"]
+                    norm = tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length))
+                    scores[rep_id] = scores.get(rep_id, 0.0) + idf * norm
+            best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+            return [(score, self._docs[rep_id]["rep"]) for rep_id, score in best]
+
+    def __len__(self):
+        return len(self._docs)
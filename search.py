@@ -0,0 +1,319 @@
+import functools
+import heapq
+import os
+import re
+import threading
+from collections import Counter
+from database import get_db_connection
+from rep_context import rep_context
+
+# --- Representative Search ---
+# Ranked, typo-tolerant search across name, constituency, state and party.
+# Postgres: pg_trgm word similarity (GIN-indexed). SQLite: the lexicon below,
+# an in-memory index of the table's distinct values built from rep_context, with
+# the FTS5 trigram table for words it can't place. Both fall back to LIKE when
+# the index isn't available.
+#
+# Each query word is spell-corrected on its own against the lexicon of distinct
+# words in the table (a few thousand). Rows are then ranked per distinct value,
+# not per row: a state or party shared by thousands of rows is one similarity
+# computation, and its rows are kept sorted by name, so a page reads at most
+# offset + limit rows of each rank tier. Full rows are loaded for the returned
+# page only.
+
+SEARCH_CANDIDATES = 100  # FTS and LIKE arms: rows fetched for re-ranking
+SEARCH_MIN_SCORE = 0.6   # Same threshold as pg_trgm's word_similarity default
+SEARCH_MAX_CORRECTIONS = 5
+FIELD_WEIGHTS = {"name": 1.0, "constituency": 1.0, "state": 0.7, "party": 0.6}
+LOAD_BATCH = 500  # IDs per "WHERE id IN (...)"
+
+_backend = None
+_WORD_RE = re.compile(r"[^\W_]{3,}")
+
+def get_search_backend():
+    global _backend
+    if _backend is None:
+        is_postgres = os.getenv("DATABASE_URL") is not None
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            if is_postgres:
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                _backend = "pg_trgm" if cursor.fetchone() else "like"
+            else:
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'representatives_fts'")
+                _backend = "fts5" if cursor.fetchone() else "like"
+    return _backend
+
+@functools.lru_cache(maxsize=100000)
+def trigrams(text):
+    # Same padding idea as pg_trgm: word boundaries count as trigram characters.
+    # Cached: names, states and parties repeat across thousands of rows.
+    grams = set()
+    for word in (text or "").lower().split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+def similarity(query_grams, text):
+    # pg_trgm-style word similarity: share of the query's trigrams present in text
+    if not query_grams or not text:
+        return 0.0
+    return len(query_grams & trigrams(text)) / len(query_grams)
+
+def score(rep, query_grams, memo=None):
+    """(best raw similarity, field-weighted rank score)"""
+    best = rank = 0.0
+    for field, weight in FIELD_WEIGHTS.items():
+        text = rep.get(field)
+        if memo is None:
+            sim = similarity(query_grams, text)
+        else:
+            # Within one query, states and parties repeat across most candidates
+            sim = memo.get(text)
+            if sim is None:
+                sim = memo[text] = similarity(query_grams, text)
+        best = max(best, sim)
+        rank = max(rank, weight * sim)
+    return best, rank
+
+def max_edits(word):
+    # Edits allowed when correcting `word`: none for words too short to tell apart
+    return 0 if len(word) < 5 else 1 if len(word) < 9 else 2
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance (transpositions count as one edit), or limit + 1 once over."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+def _quote(term):
+    # FTS5 string literal: matched as a plain substring, never as syntax
+    return '"' + term.replace('"', '""') + '"'
+
+class Lexicon:
+    """
+    Distinct words and values of the searchable columns: a trigram index over the
+    words for spelling correction, and each value's rows sorted by name for ranking.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._words = {}     # word -> {(field, value) containing it}
+        self._postings = {}  # trigram -> {word}
+        self._rows = {}      # (field, value) -> [rep ID], by name then ID
+        self._reps = {}      # rep ID -> rep
+        self.version = None  # rep_context content hash it was built from
+
+    def build(self, reps, version=None):
+        words, rows, by_id = {}, {}, {}
+        for rep in reps:
+            by_id[rep['id']] = rep
+            for field in FIELD_WEIGHTS:
+                value = rep.get(field)
+                if not value:
+                    continue
+                key = (field, value)
+                if key not in rows:
+                    rows[key] = []
+                    for word in set(_WORD_RE.findall(value.lower())):
+                        words.setdefault(word, set()).add(key)
+                rows[key].append(rep['id'])
+        for ids in rows.values():
+            ids.sort(key=lambda rep_id: (by_id[rep_id].get('name') or "", rep_id))
+        postings = {}
+        for word in words:
+            for gram in trigrams(word):
+                postings.setdefault(gram, set()).add(word)
+        with self._lock:
+            self._words, self._postings, self._rows, self._reps = words, postings, rows, by_id
+            self.version = version
+        return len(words)
+
+    def ensure_current(self):
+        reps = rep_context.get_reps()
+        version = rep_context.content_hash
+        if self.version != version:
+            # One rebuild per change, however many searches notice it at once
+            with self._build_lock:
+                if self.version != version:
+                    self.build(reps, version)
+
+    def corrections(self, word, limit=SEARCH_MAX_CORRECTIONS):
+        """Known words close to `word`, closest first."""
+        with self._lock:
+            if word in self._words:
+                return [word]
+            grams = trigrams(word)
+            shared = Counter()
+            for gram in grams:
+                shared.update(self._postings.get(gram, ()))
+        # Close: sharing SEARCH_MIN_SCORE of the query's trigrams (as pg_trgm's
+        # word_similarity). Fewest edits first, then by trigram similarity so words
+        # of a similar length come first.
+        edits = max_edits(word)
+        needed = SEARCH_MIN_SCORE * len(grams)
+        similar = lambda w, count: -count / (len(grams) + len(trigrams(w)) - count)
+        close = [(edit_distance(word, w, edits) if edits else 1, similar(w, count), w)
+                 for w, count in shared.items() if count >= needed]
+        if edits and not any(distance <= edits for distance, _, _ in close):
+            # A typo can break more trigrams than that (a transposed letter breaks up
+            # to four): words that still share some, within max_edits() of the word
+            needed_for_edits = max(1, len(grams) - 4 * edits)
+            for w, count in shared.items():
+                if needed_for_edits <= count < needed and abs(len(w) - len(word)) <= edits:
+                    distance = edit_distance(word, w, edits)
+                    if distance <= edits:
+                        close.append((distance, similar(w, count), w))
+        close.sort()
+        return [w for _, _, w in close[:limit]]
+
+    def rank(self, words, query, top=None):
+        """
+        IDs of the reps with a name, constituency, state or party containing one of
+        `words` and within SEARCH_MIN_SCORE of `query`, best first (the first `top`).
+        """
+        query_grams = trigrams(query)
+        with self._lock:
+            index, rows, reps = self._words, self._rows, self._reps
+        tiers = {}
+        for key in set().union(*(index.get(word, ()) for word in words)):
+            field, value = key
+            sim = similarity(query_grams, value)
+            if sim >= SEARCH_MIN_SCORE:
+                tiers.setdefault(FIELD_WEIGHTS[field] * sim, []).append(rows[key])
+
+        by_name = lambda rep_id: (reps[rep_id].get('name') or "", rep_id)
+        ranked, seen, memo = [], set(), {}
+        for tier in sorted(tiers, reverse=True):
+            if top is not None and len(ranked) >= top and -ranked[-1][0] > tier:
+                break  # Nothing from here down can make the page
+            # Equally ranked values (e.g. 30 people called "... Banerjee"): their rows
+            # in name order, so only the first `top` of the tier are read
+            lists = tiers[tier]
+            taken = 0
+            for rep_id in heapq.merge(*lists, key=by_name) if len(lists) > 1 else lists[0]:
+                if top is not None and taken >= top:
+                    break
+                if rep_id in seen:
+                    continue
+                seen.add(rep_id)
+                taken += 1
+                rep = reps[rep_id]
+                # A row's best field is usually this tier, but score it in full
+                _, rank = score(rep, query_grams, memo)
+                ranked.append((-rank, rep.get('name') or "", rep_id))
+            ranked = heapq.nsmallest(top, ranked) if top is not None else sorted(ranked)
+        return [rep_id for _, _, rep_id in ranked]
+
+    def __len__(self):
+        return len(self._words)
+
+lexicon = Lexicon()
+
+def _correct(query):
+    """([(word, its known spellings)], the query with each word replaced by its closest spelling)"""
+    words, corrected = [], []
+    for word in query.lower().split():
+        if not _WORD_RE.fullmatch(word):
+            corrected.append(word)  # Short or punctuated: left to the re-ranking
+            continue
+        alternatives = lexicon.corrections(word)
+        corrected.append(alternatives[0] if alternatives else word)
+        words.append((word, alternatives))
+    return words, " ".join(corrected)
+
+def _rank(candidates, query, top=None):
+    """The `top` best-ranked candidates, best first."""
+    query_grams = trigrams(query)
+    memo, scored = {}, []
+    for rep in candidates:
+        _, rank = score(rep, query_grams, memo)
+        scored.append((-rank, rep.get('name') or "", rep['id'], rep))
+    if top is None:
+        return [item[3] for item in sorted(scored, key=lambda item: item[:3])]
+    # Partial sort: only the requested page and the ones before it are ordered
+    return [item[3] for item in heapq.nsmallest(top, scored, key=lambda item: item[:3])]
+
+def _load(ids):
+    """Full rows for `ids`, in that order."""
+    if not ids:
+        return []
+    rows = {}
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        for start in range(0, len(ids), LOAD_BATCH):
+            batch = ids[start:start + LOAD_BATCH]
+            cursor.execute(f"SELECT * FROM representatives WHERE id IN ({','.join('?' * len(batch))})", batch)
+            rows.update((row['id'], dict(row)) for row in cursor.fetchall())
+    return [rows[rep_id] for rep_id in ids if rep_id in rows]
+
+def search_representatives(query, limit=None, offset=0):
+    """Reps matching `query`, best first: `limit` of them from `offset`, or all with limit=None."""
+    query = " ".join((query or "").split())
+    if not query:
+        return []
+    top = offset + limit if limit is not None else None
+    backend = get_search_backend()
+
+    if backend == "pg_trgm":
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT * FROM representatives
+                WHERE %(q)s <%% name OR %(q)s <%% constituency OR %(q)s <%% state OR %(q)s <%% party
+                ORDER BY GREATEST(
+                    word_similarity(%(q)s, name),
+                    word_similarity(%(q)s, constituency),
+                    0.7 * word_similarity(%(q)s, state),
+                    0.6 * word_similarity(%(q)s, party)
+                ) DESC, name, id
+                LIMIT %(limit)s OFFSET %(offset)s
+            ''', {"q": query, "limit": limit, "offset": offset})  # LIMIT NULL: no limit
+            rows = cursor.fetchall()
+        return [dict(row) for row in rows]
+
+    words = []
+    if backend == "fts5":
+        # May refresh rep_context from the DB; done before this search holds a pooled
+        # connection, so concurrent searches can't exhaust the pool waiting on each other
+        lexicon.ensure_current()
+        words, corrected = _correct(query)
+        if words and all(alternatives for _, alternatives in words):
+            spellings = {a for _, alternatives in words for a in alternatives}
+            return _load(lexicon.rank(spellings, corrected, top)[offset:])
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        if words:
+            # A word the lexicon can't place (a fragment, a code): substring match
+            # through the FTS index, the most relevant rows by bm25() re-ranked here
+            match = " AND ".join(
+                "(" + " OR ".join(_quote(t) for t in [word] + [a for a in alternatives if a != word]) + ")"
+                for word, alternatives in words)
+            cursor.execute('''
+                SELECT r.* FROM representatives_fts JOIN representatives r ON r.id = representatives_fts.rowid
+                WHERE representatives_fts MATCH ?
+                ORDER BY bm25(representatives_fts) LIMIT ?
+            ''', (match, max(SEARCH_CANDIDATES, top) if top is not None else -1))
+            query = corrected
+        else:
+            # No index (or no word long enough for one): plain case-insensitive LIKE
+            like = f"%{query.lower()}%"
+            cursor.execute('''
+                SELECT * FROM representatives
+                WHERE LOWER(name) LIKE ? OR LOWER(constituency) LIKE ? OR LOWER(state) LIKE ? OR LOWER(party) LIKE ?
+                LIMIT ?
+            ''', (like, like, like, like, max(SEARCH_CANDIDATES, top) if top is not None else -1))
+        candidates = [dict(row) for row in cursor.fetchall()]
+    return _rank(candidates, query, top)[offset:]
@@ -1,5 +1,4 @@
 import os
-from cryptography.fernet import Fernet
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -13,6 +12,7 @@ def get_encryption_key():
 
 def encrypt_value(value: str) -> str:
     if not value: return ""
+    from cryptography.fernet import Fernet  # Deferred: most secrets are plaintext
     key = get_encryption_key()
     f = Fernet(key)
     return f.encrypt(value.encode()).decode()
@@ -20,6 +20,7 @@ def encrypt_value(value: str) -> str:
 def decrypt_value(token: str) -> str:
     if not token: return ""
     try:
+        from cryptography.fernet import Fernet
         key = get_encryption_key()
         f = Fernet(key)
         return f.decrypt(token.encode()).decode()
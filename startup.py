@@ -0,0 +1,66 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from geo import constituency_locator
+from llm import get_genai_client
+from rep_context import rep_context
+from search import lexicon
+
+# --- Startup ---
+# Only what requests can't do without (schema, seed check) runs before the
+# server accepts connections. The in-memory caches are warmed afterwards in the
+# background; until then they build lazily on first use (the constituency locator
+# just answers None, so /api/detect-location takes its geocoding fallback).
+# The Gemini client (a slow import) is built here too, so the first chat doesn't pay
+# for it. Every phase is timed and reported in the log and under /api/admin/metrics.
+
+class StartupReport:
+    def __init__(self):
+        self._origin = time.perf_counter()
+        self.phases = {}  # phase -> ms
+        self.ready_ms = None  # Accepting requests
+        self.warm_ms = None   # Background warm-up finished
+
+    def record(self, name, ms):
+        self.phases[name] = round(ms, 1)
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - started) * 1000)
+
+    def _since_origin(self):
+        return round((time.perf_counter() - self._origin) * 1000, 1)
+
+    def mark_ready(self):
+        self.ready_ms = self._since_origin()
+        print(f"Startup: ready in {self.ready_ms} ms ({self._format()})")
+
+    def _format(self):
+        return ", ".join(f"{name} {ms} ms" for name, ms in self.phases.items())
+
+    def get_stats(self):
+        return {"phases_ms": dict(self.phases), "ready_ms": self.ready_ms, "warm_ms": self.warm_ms}
+
+    def _warm(self):
+        for name, warm in (
+            ("warm_rep_context", rep_context.refresh),
+            ("warm_constituency_locator", constituency_locator.load),
+            ("warm_search_lexicon", lexicon.ensure_current),
+            ("warm_genai_client", get_genai_client),
+        ):
+            try:
+                with self.phase(name):
+                    warm()
+            except Exception as e:
+                print(f"Startup: {name} failed ({e}); it will build on first use.")
+
+    async def warm_caches(self):
+        await asyncio.to_thread(self._warm)
+        self.warm_ms = self._since_origin()
+        print(f"Startup: caches warm after {self.warm_ms} ms ({self._format()})")
+
+startup_report = StartupReport()
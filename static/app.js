@@ -318,6 +318,16 @@ function handleEnter(e) {
     if (e.key === 'Enter') sendMessage();
 }
 
+async function fetchChatAnswer(text) {
+    // One-shot endpoint: retries on the server, and always saves the interaction
+    const res = await fetch('/api/chat', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ query: text })
+    });
+    return res.json();
+}
+
 async function sendMessage(textOverride = null) {
     const text = textOverride || chatInput.value.trim();
     if (!text) return;
@@ -328,26 +338,89 @@ async function sendMessage(textOverride = null) {
 
     trackEvent('chat_query', text);
 
-    // Loading State
-    const loadingId = addMessage('Thinking...', 'ai');
+    // Loading State (tokens stream into this bubble)
+    const loadingEl = addMessage('Thinking...', 'ai');
 
     try {
-        const res = await fetch('/api/chat', {
+        const res = await fetch('/api/chat/stream', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ query: text })
         });
-        const data = await res.json();
 
-        // Remove Loading interaction
-        const loadingEl = document.querySelector(`[data-msg-id="${loadingId}"]`);
-        if (loadingEl) loadingEl.remove();
+        // Render tokens as they arrive, then swap in the final message (rating + chips)
+        let answer = '';
+        let chatId = null;
+        let error = null;
+        if (res.ok && res.body) {
+            try {
+                await readSSE(res.body, (event, data) => {
+                    if (event === 'done') {
+                        chatId = data.chat_id;
+                    } else if (event === 'error') {
+                        error = data;
+                    } else if (data.text) {
+                        answer += data.text;
+                        loadingEl.innerText = answer.split('SUGGESTIONS:')[0];
+                        chatMsgs.scrollTop = chatMsgs.scrollHeight;
+                    }
+                });
+            } catch (e) {
+                console.error(e);
+                error = { retryable: true };  // Connection dropped mid-stream
+            }
+        }
+
+        if (chatId !== null) {
+            loadingEl.remove();
+            addMessage(answer, 'ai', chatId);
+            return;
+        }
+        if (error && !error.retryable) {
+            // Blocked, rate limited, or failed before any text: asking again won't help
+            loadingEl.remove();
+            addMessage(error.message, 'ai').classList.add('failed');
+            return;
+        }
 
+        // Streaming unavailable, cut off, or ended without a result: partial text is
+        // not the answer. Ask the one-shot endpoint instead.
+        loadingEl.innerText = answer ? 'The answer was interrupted. Retrying...' : 'Thinking...';
+        const data = await fetchChatAnswer(text);
+        loadingEl.remove();
         addMessage(data.response, 'ai', data.chat_id);
 
     } catch (e) {
         console.error(e);
-        addMessage("Sorry, something went wrong.", 'ai');
+        loadingEl.remove();
+        addMessage("Sorry, something went wrong.", 'ai').classList.add('failed');
+    }
+}
+
+// Minimal Server-Sent Events reader for a fetch() body (EventSource can't POST)
+async function readSSE(body, onEvent) {
+    const reader = body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let sep;
+        while ((sep = buffer.indexOf('\n\n')) !== -1) {
+            const frame = buffer.slice(0, sep);
+            buffer = buffer.slice(sep + 2);
+
+            let event = 'message';
+            let data = '';
+            frame.split('\n').forEach(line => {
+                if (line.startsWith('event: ')) event = line.slice(7);
+                else if (line.startsWith('data: ')) data += line.slice(6);
+            });
+            if (data) onEvent(event, JSON.parse(data));
+        }
     }
 }
 
@@ -369,10 +442,6 @@ function addMessage(text, type, chatId = null) {
 
     msgDiv.innerText = displayText;
 
-    // Add unique ID for removal if needed
-    const tempId = Date.now();
-    msgDiv.setAttribute('data-msg-id', tempId);
-
     if (type === 'ai') {
         // Rating
         if (chatId) {
@@ -406,7 +475,7 @@ function addMessage(text, type, chatId = null) {
 
     chatMsgs.appendChild(msgDiv);
     chatMsgs.scrollTop = chatMsgs.scrollHeight;
-    return tempId;
+    return msgDiv;
 }
 
 async function rateChat(chatId, rating, starEl) {
@@ -0,0 +1,82 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, "tests", "fixtures")
+sys.path.insert(0, ROOT)
+
+# Tests run against SQLite, never a configured Postgres
+os.environ.pop("DATABASE_URL", None)
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A fresh, migrated SQLite database in a temporary working directory."""
+    import database
+    monkeypatch.chdir(tmp_path)  # citizenconnect.db is created in the working directory
+    database.close_pool()
+    database._pool = None
+    database.init_db()
+    yield database
+    database.close_pool()
+    database._pool = None
+
+class FixtureServer:
+    """
+    Local HTTP stand-in for Wikipedia. `routes` maps a path to a handler taking the
+    request (path, query, headers) and returning (status, headers, body).
+    Every request is recorded in `requests`.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                request = SimpleNamespace(path=parts.path, headers=self.headers,
+                                          query={k: v[0] for k, v in parse_qs(parts.query).items()})
+                server.requests.append(request)
+                handler = server.routes.get(parts.path)
+                status, headers, body = handler(request) if handler else (404, {}, "")
+                body = body.encode("utf-8") if isinstance(body, str) else body
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def hits(self, path):
+        return [r for r in self.requests if r.path == path]
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+@pytest.fixture
+def fixture_server():
+    with FixtureServer() as server:
+        yield server
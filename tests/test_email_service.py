@@ -0,0 +1,136 @@
+import asyncio
+import contextlib
+import socketserver
+import threading
+import time
+
+import pytest
+
+import email_service
+
+class SMTPStandIn:
+    """
+    Minimal in-process SMTP server. Records each connection and the (recipient,
+    message) pairs it accepted; addresses in `refused` get a 550 at RCPT. With
+    hang=True it accepts connections but never sends its greeting.
+    """
+
+    def __init__(self, hang=False):
+        self.refused = set()
+        self.connections = 0
+        self.delivered = []
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line):
+                self.wfile.write(line.encode() + b"\r\n")
+
+            def handle(self):
+                server.connections += 1
+                if hang:
+                    self.request.recv(1)  # Until the client gives up
+                    return
+                self.reply("220 localhost stand-in")
+                recipients = []
+                while True:
+                    line = self.rfile.readline().decode().strip()
+                    command = line[:4].upper()
+                    if not line or command == "QUIT":
+                        self.reply("221 bye")
+                        return
+                    if command in ("EHLO", "HELO"):
+                        self.reply("250 localhost")
+                    elif command == "MAIL":
+                        recipients = []
+                        self.reply("250 OK")
+                    elif command == "RCPT":
+                        address = line.split(":", 1)[1].strip().strip("<>")
+                        if address in server.refused:
+                            self.reply("550 5.1.1 No such user")
+                        else:
+                            recipients.append(address)
+                            self.reply("250 OK")
+                    elif command == "DATA":
+                        self.reply("354 End data with <CR><LF>.<CR><LF>")
+                        data = []
+                        for raw in self.rfile:
+                            if raw == b".\r\n":
+                                break
+                            data.append(raw.decode())
+                        server.delivered.extend((to, "".join(data)) for to in recipients)
+                        self.reply("250 Queued")
+                    elif command in ("RSET", "NOOP"):
+                        self.reply("250 OK")
+                    else:
+                        self.reply("502 Not implemented")
+
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+RECIPIENTS = ["asha@example.org", "bhaskar@example.org", "chitra@example.org"]
+
+@pytest.fixture
+def smtp(db, monkeypatch):
+    """Points the report at a running stand-in. Yields a function that starts one."""
+    stack = contextlib.ExitStack()
+
+    def start(hang=False):
+        server = stack.enter_context(SMTPStandIn(hang=hang))
+        monkeypatch.setattr(email_service, "SMTP_SERVER", "127.0.0.1")
+        monkeypatch.setattr(email_service, "SMTP_PORT", server.port)
+        return server
+
+    monkeypatch.setattr(email_service, "SMTP_STARTTLS", False)
+    monkeypatch.setattr(email_service, "SMTP_USER", "reports@example.org")
+    monkeypatch.setattr(email_service, "SMTP_PASSWORD", None)
+    monkeypatch.setattr(email_service, "TARGET_EMAIL", ", ".join(RECIPIENTS))
+    with stack:
+        yield start
+
+def test_report_reaches_every_recipient_over_one_connection(smtp):
+    server = smtp()
+
+    assert asyncio.run(email_service.send_daily_report()) is True
+
+    assert server.connections == 1
+    assert [to for to, _ in server.delivered] == RECIPIENTS
+    for to, message in server.delivered:
+        assert f"To: {to}" in message  # One message each: recipients don't see each other
+        assert "CitizenConnect Daily Report" in message
+
+def test_refused_address_does_not_stop_the_rest(smtp):
+    server = smtp()
+    server.refused.add("bhaskar@example.org")
+
+    assert asyncio.run(email_service.send_daily_report()) is True
+
+    assert server.connections == 1
+    assert [to for to, _ in server.delivered] == ["asha@example.org", "chitra@example.org"]
+
+def test_deliver_counts_only_accepted_messages(smtp):
+    server = smtp()
+    server.refused.update(RECIPIENTS)
+    messages = email_service.build_messages(email_service.get_daily_stats())
+
+    assert email_service.deliver(messages, time.monotonic() + 10) == 0
+    assert server.delivered == []
+
+def test_silent_server_fails_at_the_report_budget(smtp, monkeypatch):
+    smtp(hang=True)
+    monkeypatch.setattr(email_service, "REPORT_TIMEOUT", 1.0)  # SMTP_TIMEOUT stays at its 30 s default
+
+    started = time.monotonic()
+    assert asyncio.run(email_service.send_daily_report()) is False
+    elapsed = time.monotonic() - started
+
+    assert 0.9 <= elapsed < 3.0
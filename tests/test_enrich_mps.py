@@ -0,0 +1,139 @@
+import asyncio
+import json
+
+import pytest
+
+import enrich_mps
+from conftest import read_fixture
+
+API_PATH = "/w/api.php"
+
+@pytest.fixture
+def wiki_api(fixture_server, monkeypatch, tmp_path):
+    """
+    MediaWiki API stand-in serving `articles` ({title: (revision ID, HTML)}). The first
+    `throttle` parse requests are answered 429 with Retry-After: 0.
+    """
+    api = type("WikiApi", (), {"articles": {}, "throttle": 0})()
+
+    def handler(request):
+        if request.query.get("action") == "query":
+            pages = []
+            for title in request.query["titles"].split("|"):
+                if title in api.articles:
+                    pages.append({"title": title, "revisions": [{"revid": api.articles[title][0]}]})
+                else:
+                    pages.append({"title": title, "missing": True})
+            return 200, {"Content-Type": "application/json"}, json.dumps({"query": {"pages": pages}})
+        if api.throttle:
+            api.throttle -= 1
+            return 429, {"Retry-After": "0"}, ""
+        oldid = int(request.query["oldid"])
+        text = next(html for revid, html in api.articles.values() if revid == oldid)
+        return 200, {"Content-Type": "application/json"}, json.dumps({"parse": {"text": text}})
+
+    fixture_server.routes[API_PATH] = handler
+    monkeypatch.setattr(enrich_mps, "ENRICH_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(enrich_mps, "ENRICH_HOST_RPS", 0)  # No spacing against a local server
+    api.server = fixture_server
+    api.url = lambda title: f"{fixture_server.url}/wiki/{title.replace(' ', '_')}"
+    return api
+
+def parse_hits(api):
+    return [r for r in api.server.hits(API_PATH) if r.query.get("action") == "parse"]
+
+# --- extract_profile ---
+
+def test_extract_profile_reads_bio_image_and_lok_sabha_years():
+    profile = enrich_mps.extract_profile(read_fixture("mp_article.html"), current_year=2026)
+    # First real paragraph, without the reference marker
+    assert profile["bio"] == ("Asha Rao (born 12 March 1975) is an Indian politician who represents Araku "
+                              "in the 18th Lok Sabha. She previously served in the 16th Lok Sabha.")
+    # Protocol-relative infobox image; the party flag icon is ignored
+    assert profile["image_url"] == ("https://upload.wikimedia.org/wikipedia/commons/thumb/a/ab/"
+                                    "Asha_Rao_2024.jpg/220px-Asha_Rao_2024.jpg")
+    # 2014-2019 plus 2024-present; the state assembly term doesn't count
+    assert profile["years_in_office"] == 7
+
+def test_extract_profile_without_infobox():
+    profile = enrich_mps.extract_profile("<div><p>Too short.</p></div>")
+    assert profile == {"bio": None, "image_url": None, "years_in_office": None}
+
+def test_extract_profile_cuts_long_bio_at_a_sentence():
+    sentence = "Asha Rao has served on the standing committee on rural development for years. "
+    profile = enrich_mps.extract_profile(f"<div><p>{sentence * 10}</p></div>")
+    assert len(profile["bio"]) <= enrich_mps.BIO_MAX_CHARS
+    assert profile["bio"].endswith("years.")
+
+# --- crawl ---
+
+def test_crawl_retries_after_429(wiki_api):
+    wiki_api.articles["Asha Rao"] = (501, read_fixture("mp_article.html"))
+    wiki_api.throttle = 1
+
+    profiles, stats = asyncio.run(enrich_mps.crawl([wiki_api.url("Asha Rao")]))
+
+    assert len(parse_hits(wiki_api)) == 2
+    assert profiles[wiki_api.url("Asha Rao")]["image_url"].startswith("https://upload.wikimedia.org/")
+    assert (stats["fetched"], stats["failed"]) == (1, 0)
+
+def test_crawl_gives_up_after_repeated_429(wiki_api):
+    wiki_api.articles["Asha Rao"] = (501, read_fixture("mp_article.html"))
+    wiki_api.throttle = enrich_mps.ENRICH_RETRIES
+
+    profiles, stats = asyncio.run(enrich_mps.crawl([wiki_api.url("Asha Rao")]))
+
+    assert len(parse_hits(wiki_api)) == enrich_mps.ENRICH_RETRIES
+    assert profiles == {}
+    assert stats["failed"] == 1
+
+def test_second_crawl_reads_unchanged_revisions_from_disk(wiki_api):
+    wiki_api.articles["Asha Rao"] = (501, read_fixture("mp_article.html"))
+    wiki_api.articles["Gita Menon"] = (502, "<div><p>Gita Menon is an Indian politician from Wayanad, Kerala.</p></div>")
+    urls = [wiki_api.url("Asha Rao"), wiki_api.url("Gita Menon"), wiki_api.url("No Such Article")]
+
+    first, stats = asyncio.run(enrich_mps.crawl(urls))
+    assert (stats["fetched"], stats["cached"], stats["failed"]) == (2, 0, 1)
+
+    second, stats = asyncio.run(enrich_mps.crawl(urls))
+    assert (stats["fetched"], stats["cached"], stats["failed"]) == (0, 2, 1)
+    assert len(parse_hits(wiki_api)) == 2  # Only the first crawl parsed
+    assert second == first
+
+    # A new revision misses the cache
+    wiki_api.articles["Gita Menon"] = (503, "<div><p>Gita Menon is an Indian politician who represents Wayanad.</p></div>")
+    third, stats = asyncio.run(enrich_mps.crawl(urls))
+    assert (stats["fetched"], stats["cached"]) == (1, 1)
+    assert third[wiki_api.url("Gita Menon")]["bio"] == "Gita Menon is an Indian politician who represents Wayanad."
+
+# --- enrich_representatives ---
+
+def test_enrich_representatives_keeps_curated_values(wiki_api, db):
+    wiki_api.articles["Asha Rao"] = (501, read_fixture("mp_article.html"))
+    wiki_api.articles["Gita Menon"] = (502, "<div><p>Gita Menon is an Indian politician from Wayanad, Kerala.</p></div>")
+    with db.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany('''
+            INSERT INTO representatives (name, role, constituency, state, party, bio, image_url, wiki_url)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            ("Asha Rao", enrich_mps.MP_ROLE, "Araku", "Andhra Pradesh", "BJP", enrich_mps.MP_BIO, None,
+             wiki_api.url("Asha Rao")),
+            ("Gita Menon", enrich_mps.MP_ROLE, "Wayanad", "Kerala", "INC", "Curated biography.", "https://example.org/g.jpg",
+             wiki_api.url("Gita Menon")),
+        ])
+        conn.commit()
+
+    stats = enrich_mps.enrich_representatives()
+
+    assert stats["updated"] == 1  # Gita Menon's article adds nothing over the curated row
+    with db.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT name, bio, image_url, years_in_office FROM representatives WHERE role = ?",
+                       (enrich_mps.MP_ROLE,))
+        rows = {row['name']: dict(row) for row in cursor.fetchall()}
+    assert rows["Asha Rao"]["bio"].startswith("Asha Rao (born 12 March 1975)")
+    assert rows["Asha Rao"]["image_url"].endswith("220px-Asha_Rao_2024.jpg")
+    assert rows["Asha Rao"]["years_in_office"] >= 7
+    assert rows["Gita Menon"]["bio"] == "Curated biography."
+    assert rows["Gita Menon"]["image_url"] == "https://example.org/g.jpg"
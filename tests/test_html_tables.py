@@ -0,0 +1,113 @@
+from lxml import html as lxml_html
+
+from conftest import read_fixture
+from html_tables import iter_rows, iter_tables
+from ingest_mps_wiki import iter_members
+
+def table(markup):
+    return lxml_html.fromstring(markup)
+
+def rows(markup, **kwargs):
+    return [(cells, is_header) for cells, is_header in iter_rows(table(markup), **kwargs)]
+
+# --- iter_rows ---
+
+def test_rowspan_repeats_cell_into_following_rows():
+    got = rows("""<table>
+        <tr><td>1</td><td rowspan="3">BJP</td><td>a</td></tr>
+        <tr><td>2</td><td>b</td></tr>
+        <tr><td>3</td><td>c</td></tr>
+        <tr><td>4</td><td>INC</td><td>d</td></tr>
+    </table>""")
+    assert [cells for cells, _ in got] == [
+        ["1", "BJP", "a"], ["2", "BJP", "b"], ["3", "BJP", "c"], ["4", "INC", "d"],
+    ]
+
+def test_rowspan_in_last_column_fills_after_shorter_rows():
+    got = rows("""<table>
+        <tr><td>1</td><td>x</td><td rowspan="2">NDA</td></tr>
+        <tr><td>2</td><td>y</td></tr>
+    </table>""")
+    assert [cells for cells, _ in got] == [["1", "x", "NDA"], ["2", "y", "NDA"]]
+
+def test_colspan_header_over_two_row_header():
+    got = rows("""<table>
+        <tr><th colspan="2">Constituency</th><th rowspan="2">Name</th><th colspan="2" rowspan="2">Party</th></tr>
+        <tr><th>No.</th><th>Name</th></tr>
+        <tr><td>1</td><th scope="row">Araku</th><td>Asha Rao</td><td></td><td>BJP</td></tr>
+    </table>""")
+    assert got == [
+        (["Constituency", "Constituency", "Name", "Party", "Party"], True),
+        (["No.", "Name", "Name", "Party", "Party"], True),
+        (["1", "Araku", "Asha Rao", "", "BJP"], False),  # A row header doesn't make a header row
+    ]
+
+def test_invalid_and_zero_spans_count_as_one():
+    got = rows("""<table>
+        <tr><td rowspan="0">a</td><td colspan="x">b</td><td rowspan="-2">c</td></tr>
+        <tr><td>d</td><td>e</td><td>f</td></tr>
+    </table>""")
+    assert [cells for cells, _ in got] == [["a", "b", "c"], ["d", "e", "f"]]
+
+def test_nested_table_rows_belong_to_the_nested_table():
+    got = rows("""<table><tbody>
+        <tr><td>outer</td><td><table><tr><td>inner</td></tr></table></td></tr>
+    </tbody></table>""")
+    assert [cells for cells, _ in got] == [["outer", "inner"]]
+
+def test_cell_text_skips_references_sortkeys_and_hidden_text():
+    got = rows("""<table><tr>
+        <td><span class="sortkey">Rao, Asha</span>Asha<br>Rao<sup class="reference">[1]</sup>
+            <span style="display: none">hidden</span></td>
+    </tr></table>""")
+    assert got[0][0] == ["Asha Rao"]
+
+def test_links_mode_pairs_text_with_first_real_link():
+    got = rows("""<table><tr>
+        <td><sup class="reference"><a href="#cite_note-1">[1]</a></sup><a href="/wiki/Asha_Rao">Asha Rao</a></td>
+        <td><a class="new" href="/w/index.php?title=X&amp;redlink=1">Red link</a></td>
+        <td rowspan="2">plain</td>
+    </tr><tr><td>a</td><td>b</td></tr></table>""", links=True)
+    assert got[0][0] == [("Asha Rao", "/wiki/Asha_Rao"), ("Red link", None), ("plain", None)]
+    assert got[1][0][2] == ("plain", None)
+
+# --- iter_tables ---
+
+def test_iter_tables_pairs_tables_with_preceding_heading():
+    markup = read_fixture("lok_sabha_list.html")
+    headings = [heading for heading, _ in iter_tables(markup)]
+    assert headings == ["", "Andhra Pradesh", "Kerala"]  # Summary table sits before any heading
+
+# --- iter_members on the saved list page ---
+
+def test_iter_members_reads_rowspan_party_cells():
+    members = {mp["name"]: mp for mp in iter_members(read_fixture("lok_sabha_list.html"))}
+    assert members["Asha Rao"]["party"] == "Bharatiya Janata Party"
+    assert members["Bhaskar Naidu"]["party"] == "Bharatiya Janata Party"  # Party cell spans from the row above
+    assert members["Chitra Reddy"]["party"] == "Telugu Desam Party"       # Alliance still spanned; party isn't
+    assert members["Faisal Khan"]["party"] == "Indian National Congress"
+    assert members["Bhaskar Naidu"]["constituency"] == "Srikakulam"
+
+def test_iter_members_states_names_and_links():
+    members = list(iter_members(read_fixture("lok_sabha_list.html")))
+    assert [(mp["state"], mp["constituency"], mp["name"]) for mp in members] == [
+        ("Andhra Pradesh", "Araku", "Asha Rao"),
+        ("Andhra Pradesh", "Srikakulam", "Bhaskar Naidu"),
+        ("Andhra Pradesh", "Vizianagaram", "Chitra Reddy"),
+        ("Andhra Pradesh", "Visakhapatnam", "Deepak Varma"),
+        ("Kerala", "Kasaragod", "Elena Thomas"),
+        ("Kerala", "Kannur", "Faisal Khan"),
+        ("Kerala", "Wayanad", "Gita Menon"),
+    ]
+    by_name = {mp["name"]: mp for mp in members}
+    assert by_name["Asha Rao"]["wiki_url"] == "https://en.wikipedia.org/wiki/Asha_Rao"
+    assert by_name["Deepak Varma"]["wiki_url"] is None  # Red link: no article yet
+    assert all(mp["role"] == "MP (Lok Sabha)" for mp in members)
+
+def test_iter_members_skips_vacant_seat():
+    members = list(iter_members(read_fixture("lok_sabha_list.html")))
+    assert "Vadakara" not in {mp["constituency"] for mp in members}
+    assert not any(mp["name"].lower().startswith("vacant") for mp in members)
+    # The vacant row spans no rows, so the seat after it is read normally
+    wayanad = next(mp for mp in members if mp["constituency"] == "Wayanad")
+    assert (wayanad["name"], wayanad["party"]) == ("Gita Menon", "Indian National Congress")
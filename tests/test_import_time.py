@@ -0,0 +1,25 @@
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.bench_import import DEFERRED
+from conftest import ROOT
+
+def loaded_after(statement):
+    """Module names in sys.modules after running `statement` in a fresh interpreter."""
+    env = {k: v for k, v in os.environ.items() if k != "DATABASE_URL"}
+    result = subprocess.run([sys.executable, "-c", f"{statement}; import json, sys; print(json.dumps(list(sys.modules)))"],
+                            cwd=ROOT, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr[-2000:]
+    return json.loads(result.stdout.splitlines()[-1])
+
+def deferred_in(modules):
+    return sorted(m for m in modules if any(m == d or m.startswith(d + ".") for d in DEFERRED))
+
+def test_import_main_leaves_deferred_modules_unloaded():
+    # google.genai, geopy, cryptography and the rest load on first use, not on worker spawn
+    assert deferred_in(loaded_after("import main")) == []
+
+def test_probe_sees_a_deferred_import():
+    assert "geopy" in deferred_in(loaded_after("import main, geopy"))
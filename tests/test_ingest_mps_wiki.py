@@ -0,0 +1,111 @@
+import re
+
+import pytest
+
+import ingest_mps_wiki
+from conftest import read_fixture
+
+PAGE_PATH = "/wiki/List_of_members_of_the_18th_Lok_Sabha"
+FIRST_REVISION = 1250000001
+
+def page(revision=FIRST_REVISION, update=False, insert=False, delete=()):
+    """The saved list page, optionally edited the way a later revision would be."""
+    html = read_fixture("lok_sabha_list.html").replace(str(FIRST_REVISION), str(revision))
+    if update:
+        html = html.replace('<a href="/wiki/Telugu_Desam_Party">Telugu Desam Party</a>', 'Jana Sena Party')
+    if insert:
+        html = re.sub(r'<td colspan="4"[^>]*><i>Vacant</i>.*?</td>',
+                      '<td><a href="/wiki/Hari_Das">Hari Das</a></td><td></td><td>Communist Party of India (Marxist)</td><td>LDF</td>',
+                      html)
+    for constituency in delete:
+        html = re.sub(rf'<tr>\s*<td>\d+</td>\s*<th scope="row"><a href="/wiki/{constituency}_Lok_Sabha_constituency">.*?</tr>',
+                      "", html, flags=re.S)
+    return html
+
+@pytest.fixture
+def wiki(fixture_server, monkeypatch, db):
+    """Serves `wiki.html` with ETag `wiki.etag`, answering 304 to a matching If-None-Match."""
+    state = type("WikiPage", (), {"html": page(), "etag": '"v1"'})()
+
+    def list_page(request):
+        if request.headers.get("If-None-Match") == state.etag:
+            return 304, {"ETag": state.etag}, ""
+        return 200, {"Content-Type": "text/html; charset=UTF-8", "ETag": state.etag,
+                     "Last-Modified": "Tue, 04 Jun 2024 12:00:00 GMT"}, state.html
+
+    fixture_server.routes[PAGE_PATH] = list_page
+    monkeypatch.setattr(ingest_mps_wiki, "LOK_SABHA_URL", fixture_server.url + PAGE_PATH)
+    state.server = fixture_server
+    return state
+
+def scraped_mps(db):
+    with db.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT name, constituency, party, state, wiki_url FROM representatives WHERE role = ?",
+                       (ingest_mps_wiki.MP_ROLE,))
+        return {row['constituency']: dict(row) for row in cursor.fetchall()}
+
+def test_first_sync_inserts_every_member(wiki, db):
+    result = ingest_mps_wiki.sync_from_wikipedia()
+
+    assert result["status"] == "synced"
+    assert result["revision_id"] == FIRST_REVISION
+    assert (result["inserted"], result["updated"], result["deleted"]) == (7, 0, 0)
+    mps = scraped_mps(db)
+    assert len(mps) == 7
+    assert mps["Srikakulam"]["party"] == "Bharatiya Janata Party"
+    assert mps["Araku"]["wiki_url"] == wiki.server.url + "/wiki/Asha_Rao"
+    state = ingest_mps_wiki.get_source_state()
+    assert (state["revision_id"], state["etag"]) == (FIRST_REVISION, '"v1"')
+
+def test_not_modified_sends_validators_and_writes_nothing(wiki, db):
+    ingest_mps_wiki.sync_from_wikipedia()
+    version = db.get_data_version("representatives")
+
+    result = ingest_mps_wiki.sync_from_wikipedia()
+
+    assert result == {"status": "not_modified"}
+    second = wiki.server.hits(PAGE_PATH)[-1]
+    assert second.headers.get("If-None-Match") == '"v1"'
+    assert second.headers.get("If-Modified-Since") == "Tue, 04 Jun 2024 12:00:00 GMT"
+    assert db.get_data_version("representatives") == version
+
+def test_same_revision_with_new_etag_is_not_reparsed(wiki, db, monkeypatch):
+    ingest_mps_wiki.sync_from_wikipedia()
+    wiki.etag = '"v1-rerendered"'  # Same revision, re-rendered (e.g. a template changed)
+    monkeypatch.setattr(ingest_mps_wiki, "sync_data", lambda mps: pytest.fail("unchanged revision was re-applied"))
+
+    result = ingest_mps_wiki.sync_from_wikipedia()
+
+    assert result == {"status": "same_revision"}
+    assert ingest_mps_wiki.get_source_state()["etag"] == '"v1-rerendered"'
+
+def test_new_revision_applies_insert_update_and_delete(wiki, db, monkeypatch):
+    ingest_mps_wiki.sync_from_wikipedia()
+    # One delete out of 8 owned rows is over the default 10% guard; allow it here
+    monkeypatch.setattr(ingest_mps_wiki, "SYNC_MAX_DELETE_FRACTION", 0.2)
+    wiki.html, wiki.etag = page(FIRST_REVISION + 1, update=True, insert=True, delete=["Wayanad"]), '"v2"'
+
+    result = ingest_mps_wiki.sync_from_wikipedia()
+
+    assert result["status"] == "synced"
+    assert result["revision_id"] == FIRST_REVISION + 1
+    assert (result["inserted"], result["updated"], result["deleted"], result["unchanged"]) == (1, 1, 1, 5)
+    mps = scraped_mps(db)
+    assert mps["Vizianagaram"]["party"] == "Jana Sena Party"
+    assert mps["Vadakara"]["name"] == "Hari Das"
+    assert "Wayanad" not in mps
+    assert ingest_mps_wiki.get_source_state()["revision_id"] == FIRST_REVISION + 1
+
+def test_delete_guard_keeps_rows_when_too_many_disappear(wiki, db):
+    ingest_mps_wiki.sync_from_wikipedia()
+    # 2 of 7 members gone (29%): more likely a parser problem than a changed House
+    wiki.html, wiki.etag = page(FIRST_REVISION + 1, update=True, delete=["Wayanad", "Kannur"]), '"v2"'
+
+    result = ingest_mps_wiki.sync_from_wikipedia()
+
+    assert result["status"] == "synced"
+    assert (result["inserted"], result["updated"], result["deleted"]) == (0, 1, 0)
+    mps = scraped_mps(db)
+    assert {"Wayanad", "Kannur"} <= set(mps)
+    assert mps["Vizianagaram"]["party"] == "Jana Sena Party"  # Updates still apply
@@ -0,0 +1,23 @@
+import asyncio
+
+from local_reps import LocalRepsCache
+
+def test_memory_tier_is_bounded_and_falls_back_to_the_table(db):
+    cache = LocalRepsCache(max_size=2)
+    calls = []
+
+    async def fetch(location):
+        calls.append(location)
+        return {"mla": f"MLA for {location}"}
+
+    async def run():
+        for place in ("Araku, Andhra Pradesh", "Kannur, Kerala", "Wayanad, Kerala"):
+            await cache.get(place, fetch)
+        await cache.get("Kannur, Kerala", fetch)  # Most recently used now
+        await cache.get("Pune, Maharashtra", fetch)
+        return await cache.get("Araku, Andhra Pradesh", fetch)
+
+    assert asyncio.run(run()) == {"mla": "MLA for Araku, Andhra Pradesh"}
+    assert len(calls) == 4  # Araku's second look-up came from the table, not the model
+    assert list(cache._entries) == ["pune, maharashtra", "araku, andhra pradesh"]
+    assert cache.get_stats()["db_hits"] == 1
@@ -0,0 +1,26 @@
+import pytest
+
+from main import accepts_gzip, etag_matches
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", True),
+    ("br;q=1.0, gzip;q=0.8", True),
+    ("GZIP", True),
+    ("*", True),
+    ("gzip;q=0", False),
+    ("gzip;q=0.000, deflate", False),
+    ("*;q=0", False),
+    ("deflate, *;q=0.1", True),
+    ("gzip;q=0, *", False),  # Explicit refusal wins over the wildcard
+    ("identity", False),
+    ("", False),
+    (None, False),
+])
+def test_accepts_gzip_honours_q_values(header, expected):
+    assert accepts_gzip(header) is expected
+
+def test_etag_matches_weak_and_wildcard():
+    assert etag_matches('W/"abc", "def"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
+    assert not etag_matches(None, '"abc"')
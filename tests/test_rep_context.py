@@ -0,0 +1,31 @@
+import threading
+
+from rep_context import rep_context
+
+def test_concurrent_readers_after_invalidate_rebuild_once(db):
+    rep_context.refresh()
+    db.bump_data_version("representatives")  # Invalidates, as a write in this process does
+    builds = rep_context.stats["builds"]
+
+    barrier = threading.Barrier(8)
+    blocks = []
+    def read():
+        barrier.wait()
+        blocks.append(rep_context.get())
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert rep_context.stats["builds"] == builds + 1
+    assert len(set(blocks)) == 1
+
+def test_refresh_skips_rebuild_when_version_is_unchanged(db):
+    rep_context.refresh()
+    builds = rep_context.stats["builds"]
+    rep_context.refresh()
+    assert rep_context.stats["builds"] == builds
+    rep_context.invalidate()
+    rep_context.refresh()
+    assert rep_context.stats["builds"] == builds + 1
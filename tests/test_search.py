@@ -0,0 +1,143 @@
+import pytest
+
+import search
+
+FIRST = ["Anil", "Bina", "Chetan", "Divya", "Farhan", "Gauri", "Hemant", "Indira", "Jatin", "Kamala"]
+
+@pytest.fixture
+def reps(db):
+    """Inserts reps as (name, constituency, state, party); the lexicon picks them up on the next search."""
+    def insert(*rows):
+        with db.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
+                "INSERT INTO representatives (name, role, constituency, state, party) VALUES (?, 'MLA', ?, ?, ?)", rows)
+            conn.commit()
+        db.bump_data_version("representatives")  # Invalidates rep_context, which the lexicon follows
+    return insert
+
+def names(results):
+    return [rep['name'] for rep in results]
+
+def fts_rowids(db, term):
+    with db.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT rowid FROM representatives_fts WHERE representatives_fts MATCH ?", (search._quote(term),))
+        return [row[0] for row in cursor.fetchall()]
+
+# --- Index maintenance ---
+
+def test_fts_triggers_follow_insert_update_and_delete(db, reps):
+    reps(("Zoravar Quixley", "Elsewhere", "Gondwana", "Test Party"))
+    with db.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM representatives WHERE name = 'Zoravar Quixley'")
+        rep_id = cursor.fetchone()['id']
+    assert fts_rowids(db, "quixley") == [rep_id]
+
+    with db.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE representatives SET name = 'Zoravar Pemberly' WHERE id = ?", (rep_id,))
+        conn.commit()
+    assert fts_rowids(db, "quixley") == []
+    assert fts_rowids(db, "pemberly") == [rep_id]
+
+    with db.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM representatives WHERE id = ?", (rep_id,))
+        conn.commit()
+    assert fts_rowids(db, "pemberly") == []
+
+def test_search_follows_data_changes(db, reps):
+    reps(("Zoravar Quixley", "Elsewhere", "Gondwana", "Test Party"))
+    assert names(search.search_representatives("Quixley")) == ["Zoravar Quixley"]
+    with db.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM representatives WHERE name = 'Zoravar Quixley'")
+        conn.commit()
+    db.bump_data_version("representatives")
+    assert search.search_representatives("Quixley") == []
+
+# --- Ranking ---
+
+def test_ranks_name_and_constituency_over_state_over_party(reps):
+    reps(
+        ("Bina Kapoor", "Sundarpur", "Vindhyachal", "Test Party"),        # State: 0.7
+        ("Chetan Rao", "Vindhyachal", "Gondwana", "Test Party"),          # Constituency: 1.0
+        ("Anil Mehra", "Ramgarh", "Gondwana", "Vindhyachal Janata Party"),  # Party: 0.6
+        ("Vindhyachal Prasad", "Ramgarh", "Gondwana", "Test Party"),      # Name: 1.0
+    )
+    assert names(search.search_representatives("vindhyachal")) == [
+        "Chetan Rao", "Vindhyachal Prasad",  # Equal rank: by name
+        "Bina Kapoor", "Anil Mehra",
+    ]
+
+def test_results_have_the_table_columns_only(db, reps):
+    reps(("Chetan Rao", "Vindhyachal", "Gondwana", "Test Party"))
+    with db.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM representatives LIMIT 1")
+        columns = set(dict(cursor.fetchone()))
+    for query in ("vindhyachal", "vindhya", "ch"):  # Lexicon, FTS and LIKE arms
+        results = search.search_representatives(query)
+        assert results and all(set(rep) == columns for rep in results)
+
+# --- Spelling correction ---
+
+def test_misspelled_words_are_corrected_one_by_one(reps):
+    reps(
+        ("Deepak Sharma", "Ramgarh", "Gondwana", "Test Party"),
+        ("Deepak Verma", "Sundarpur", "Gondwana", "Test Party"),
+        ("Kamala Sharma", "Ramgarh", "Gondwana", "Test Party"),
+        ("Jatin Bose", "Nanan", "Gondwana", "Test Party"),
+    )
+    # Transposed letters break most of a short word's trigrams
+    assert names(search.search_representatives("Deeapk Shrama"))[0] == "Deepak Sharma"
+    assert names(search.search_representatives("Nnaan")) == ["Jatin Bose"]
+    assert names(search.search_representatives("Gondwna"))[:2] == ["Deepak Sharma", "Deepak Verma"]
+
+def test_corrections_prefer_fewest_edits(reps):
+    reps(("Anil Mehra", "Sundarpur", "Gondwana", "Test Party"),
+         ("Bina Kapoor", "Sundargarh", "Gondwana", "Test Party"))
+    search.lexicon.ensure_current()
+    assert search.lexicon.corrections("sundarpru")[0] == "sundarpur"
+    assert search.lexicon.corrections("sundarpur") == ["sundarpur"]
+
+def test_edit_distance_counts_a_transposition_once():
+    assert search.edit_distance("deepak", "deeapk", 1) == 1
+    assert search.edit_distance("sharma", "shrama", 1) == 1
+    assert search.edit_distance("sharma", "verma", 1) == 2  # Over the limit: limit + 1
+
+# --- Fallbacks ---
+
+def test_unknown_fragment_is_matched_as_a_substring(reps):
+    reps(("Zoravar Quixley", "Elsewhere", "Gondwana", "Test Party"))
+    # Too far from any word for a correction: FTS substring match
+    assert names(search.search_representatives("uixl")) == ["Zoravar Quixley"]
+
+def test_like_fallback_without_an_index(reps, monkeypatch):
+    reps(("Zoravar Quixley", "Elsewhere", "Gondwana", "Test Party"))
+    monkeypatch.setattr(search, "_backend", "like")
+    assert names(search.search_representatives("quix")) == ["Zoravar Quixley"]
+    assert names(search.search_representatives("ravar qu")) == ["Zoravar Quixley"]
+
+def test_short_query_uses_like(reps):
+    reps(("Zo Qy", "Elsewhere", "Gondwana", "Test Party"))
+    assert names(search.search_representatives("qy")) == ["Zo Qy"]
+
+# --- Paging ---
+
+def test_pages_line_up_with_a_larger_limit(reps):
+    reps(*[(f"{first} {last}", f"Ward {i}", "Gondwana", "Test Party")
+           for i, (first, last) in enumerate((f, l) for f in FIRST for l in ("Iyer", "Joshi", "Khan"))])
+    everything = search.search_representatives("gondwana", limit=25)
+    pages = [search.search_representatives("gondwana", limit=10, offset=offset) for offset in (0, 10, 20)]
+    assert [rep['id'] for page in pages for rep in page][:25] == [rep['id'] for rep in everything]
+    assert len(pages[2]) == 10
+
+def test_no_limit_returns_every_match(reps):
+    reps(*[(f"{first} Iyer", f"Ward {i}", "Gondwana", "Test Party") for i, first in enumerate(FIRST * 3)])
+    results = search.search_representatives("gondwana")
+    assert len(results) == 30
+    assert names(results) == sorted(names(results))  # Equal rank: by name
+    assert search.search_representatives("gondwana", offset=25) == results[25:]